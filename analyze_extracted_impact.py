@@ -5,15 +5,33 @@ Analyze extracted research impact data and generate insights.
 Creates aggregated statistics and visualizations from the extracted impact metrics.
 """
 
+import argparse
+import contextlib
+import hashlib
 import json
+import math
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from collections import defaultdict, Counter
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import csv
 
+from sketches import new_counter
+
+try:
+    import impact_store
+except ImportError:  # pyarrow is only needed for --store
+    impact_store = None
+
 # Configuration
 INPUT_DIR = Path("data/extracted_impact")
 OUTPUT_DIR = Path("data/analysis")
+STORE_DIR = Path("data/impact_store")
+RANGE_BYTES = 64 * 2**20  # With --workers, categories larger than this are split into byte ranges of this size
+STATE_VERSION = 1  # Saved accumulators from another version are discarded
+FINGERPRINT_BYTES = 2**20  # Bytes hashed at each end of the analyzed part of an impact file
 
 
 def setup_output_dir():
@@ -22,296 +40,780 @@ def setup_output_dir():
     print(f"✓ Output directory: {OUTPUT_DIR}")
 
 
-def load_extracted_data(category: str) -> List[Dict]:
-    """Load extracted impact data for a category."""
+def iter_impact_records(input_file: Path, start: int = 0, end: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Yield the records of an impact file whose lines start in [start, end).
+
+    A line belongs to the range it starts in, so ranges that cover the file
+    between them yield every record exactly once.
+    """
+    if not start and end is None:
+        with open(input_file, 'r', encoding='utf-8') as f:
+            yield from parse_records(f)
+        return
+
+    with open(input_file, 'rb') as f:
+        if start:
+            f.seek(start - 1)
+            f.readline()  # The rest of a line that starts before the range
+        yield from parse_records(lines_before(f, end))
+
+
+def lines_before(f, end: Optional[int]) -> Iterator[str]:
+    """Decoded lines of a binary file, from its position on, that start before offset end."""
+    position = f.tell()
+    for line in f:
+        if end is not None and position >= end:
+            return
+        position += len(line)
+        yield line.decode('utf-8')
+
+
+def parse_records(lines: Iterable[str]) -> Iterator[Dict]:
+    """Parse JSON lines, skipping blank and malformed ones."""
+    for line in lines:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def iter_extracted_data(category: str) -> Iterator[Dict]:
+    """Yield the extracted impact records of a category one at a time."""
     input_file = INPUT_DIR / f"{category}_impact.jsonl"
 
     if not input_file.exists():
-        return []
+        return
 
-    papers = []
-    with open(input_file, 'r', encoding='utf-8') as f:
-        for line in f:
-            if line.strip():
-                try:
-                    papers.append(json.loads(line))
-                except json.JSONDecodeError:
-                    continue
+    yield from iter_impact_records(input_file)
 
-    return papers
 
+def load_extracted_data(category: str) -> List[Dict]:
+    """Load extracted impact data for a category."""
+    return list(iter_extracted_data(category))
+
+
+class ExactSum:
+    """
+    A sum of numbers without rounding error, which other sums merge into exactly.
+
+    Integers are added as integers and floats as Shewchuk's non-overlapping
+    partials (as math.fsum keeps them), so the value is the exact total
+    rounded once, whatever order the numbers and partial sums were added in
+    (while the integer part stays below 2**53).
+
+    This is deliberately not the left-to-right float sum the analysis used to
+    take: that sum depends on where a file is split into byte ranges and on
+    how many reruns its records arrived over, and fractional scores such as
+    ten 0.1s differ from the exact total in the last bit.
+    """
+
+    def __init__(self):
+        self.integer = 0
+        self.partials: List[float] = []
+
+    def add(self, value):
+        if type(value) is int:
+            self.integer += value
+            return
+
+        x = float(value)
+        i = 0
+        for y in self.partials:
+            if abs(x) < abs(y):
+                x, y = y, x
+            high = x + y
+            low = y - (high - x)
+            if low:
+                self.partials[i] = low
+                i += 1
+            x = high
+        self.partials[i:] = [x]
+
+    def merge(self, other: 'ExactSum'):
+        self.integer += other.integer
+        for partial in other.partials:
+            self.add(partial)
+
+    def value(self) -> float:
+        return math.fsum(self.partials + [self.integer]) if self.partials else self.integer
+
+
+def attribution_score(value):
+    """
+    An attribution percentage to add up, or None to leave it out.
+
+    As impact_store stores them: numeric strings count as their number, and
+    anything else that isn't a finite number is left out.
+    """
+    if type(value) is int:
+        return value
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
 
-def analyze_ml_impact_quantification(papers: List[Dict]) -> Dict:
-    """Analyze ML impact quantification across papers."""
-    contribution_levels = Counter()
 
-    papers_with_ml = 0
-    papers_with_acceleration = 0
-    papers_with_efficiency = 0
-    papers_with_new_capability = 0
+# Each analysis is an accumulator: add() takes one paper at a time and
+# result() returns the statistics, so every analysis can share one pass over
+# a category file without holding its papers in memory. merge() folds in an
+# accumulator fed with the papers that follow, so parts of a file can be
+# analyzed in separate processes. Sections the model returned as null count
+# as empty.
 
-    attribution_scores = []
+class MLImpactAccumulator:
+    """ML impact quantification across papers."""
 
-    for paper in papers:
-        ml_quant = paper.get('ml_impact_quantification', {})
+    def __init__(self):
+        self.total = 0
+        self.contribution_levels = Counter()
+        self.papers_with_ml = 0
+        self.papers_with_acceleration = 0
+        self.papers_with_efficiency = 0
+        self.papers_with_new_capability = 0
+        self.attribution_sum = ExactSum()
+        self.attribution_count = 0
+
+    def add(self, paper: Dict):
+        self.total += 1
+        ml_quant = paper.get('ml_impact_quantification') or {}
 
         if ml_quant.get('has_ml_usage'):
-            papers_with_ml += 1
+            self.papers_with_ml += 1
 
         level = ml_quant.get('ml_contribution_level', 'none')
-        contribution_levels[level] += 1
+        self.contribution_levels[level] += 1
 
         # Attribution scoring
-        attribution = ml_quant.get('attribution_scoring', {})
-        ml_percent = attribution.get('ml_contribution_percent')
+        attribution = ml_quant.get('attribution_scoring') or {}
+        ml_percent = attribution_score(attribution.get('ml_contribution_percent'))
         if ml_percent is not None:
-            attribution_scores.append(ml_percent)
+            self.attribution_sum.add(ml_percent)
+            self.attribution_count += 1
 
         # Acceleration metrics
-        acceleration = ml_quant.get('acceleration_metrics', {})
+        acceleration = ml_quant.get('acceleration_metrics') or {}
         if acceleration.get('provides_acceleration'):
-            papers_with_acceleration += 1
+            self.papers_with_acceleration += 1
 
         # Efficiency measures
-        efficiency = ml_quant.get('efficiency_measures', {})
+        efficiency = ml_quant.get('efficiency_measures') or {}
         if efficiency.get('improves_efficiency'):
-            papers_with_efficiency += 1
+            self.papers_with_efficiency += 1
 
         # Breakthrough analysis
-        breakthrough = ml_quant.get('breakthrough_analysis', {})
+        breakthrough = ml_quant.get('breakthrough_analysis') or {}
         if breakthrough.get('enables_new_capability'):
-            papers_with_new_capability += 1
-
-    total = len(papers)
-
-    return {
-        'total_papers': total,
-        'papers_with_ml_usage': papers_with_ml,
-        'ml_usage_rate': papers_with_ml / total if total else 0,
-        'contribution_level_distribution': dict(contribution_levels.most_common()),
-        'papers_with_acceleration': papers_with_acceleration,
-        'acceleration_rate': papers_with_acceleration / total if total else 0,
-        'papers_with_efficiency': papers_with_efficiency,
-        'efficiency_rate': papers_with_efficiency / total if total else 0,
-        'papers_with_new_capability': papers_with_new_capability,
-        'new_capability_rate': papers_with_new_capability / total if total else 0,
-        'average_ml_attribution': sum(attribution_scores) / len(attribution_scores) if attribution_scores else 0,
-        'attribution_scores_count': len(attribution_scores)
-    }
-
-
-def analyze_reproducibility(papers: List[Dict]) -> Dict:
-    """Analyze reproducibility indicators."""
-    code_available = 0
-    data_available = 0
-    has_supplementary = 0
-    mentions_replication = 0
-    code_urls = []
-    data_urls = []
-
-    for paper in papers:
-        repro = paper.get('reproducibility', {})
+            self.papers_with_new_capability += 1
+
+    def merge(self, other: 'MLImpactAccumulator'):
+        self.total += other.total
+        self.contribution_levels.update(other.contribution_levels)
+        self.papers_with_ml += other.papers_with_ml
+        self.papers_with_acceleration += other.papers_with_acceleration
+        self.papers_with_efficiency += other.papers_with_efficiency
+        self.papers_with_new_capability += other.papers_with_new_capability
+        self.attribution_sum.merge(other.attribution_sum)
+        self.attribution_count += other.attribution_count
+
+    def result(self) -> Dict:
+        total = self.total
+
+        return {
+            'total_papers': total,
+            'papers_with_ml_usage': self.papers_with_ml,
+            'ml_usage_rate': self.papers_with_ml / total if total else 0,
+            'contribution_level_distribution': dict(self.contribution_levels.most_common()),
+            'papers_with_acceleration': self.papers_with_acceleration,
+            'acceleration_rate': self.papers_with_acceleration / total if total else 0,
+            'papers_with_efficiency': self.papers_with_efficiency,
+            'efficiency_rate': self.papers_with_efficiency / total if total else 0,
+            'papers_with_new_capability': self.papers_with_new_capability,
+            'new_capability_rate': self.papers_with_new_capability / total if total else 0,
+            'average_ml_attribution': self.attribution_sum.value() / self.attribution_count if self.attribution_count else 0,
+            'attribution_scores_count': self.attribution_count
+        }
+
+
+class ReproducibilityAccumulator:
+    """Reproducibility indicators."""
+
+    def __init__(self):
+        self.total = 0
+        self.code_available = 0
+        self.data_available = 0
+        self.has_supplementary = 0
+        self.mentions_replication = 0
+        self.code_urls = 0
+        self.data_urls = 0
+
+    def add(self, paper: Dict):
+        self.total += 1
+        repro = paper.get('reproducibility') or {}
 
         if repro.get('code_available'):
-            code_available += 1
+            self.code_available += 1
             if repro.get('code_url'):
-                code_urls.append(repro['code_url'])
+                self.code_urls += 1
 
         if repro.get('data_available'):
-            data_available += 1
+            self.data_available += 1
             if repro.get('data_url'):
-                data_urls.append(repro['data_url'])
+                self.data_urls += 1
 
         if repro.get('has_supplementary'):
-            has_supplementary += 1
+            self.has_supplementary += 1
 
         if repro.get('mentions_replication'):
-            mentions_replication += 1
-
-    total = len(papers)
-
-    return {
-        'code_availability_rate': code_available / total if total else 0,
-        'data_availability_rate': data_available / total if total else 0,
-        'supplementary_rate': has_supplementary / total if total else 0,
-        'replication_mention_rate': mentions_replication / total if total else 0,
-        'papers_with_code': code_available,
-        'papers_with_data': data_available,
-        'papers_with_supplementary': has_supplementary,
-        'papers_mentioning_replication': mentions_replication,
-        'total_papers': total,
-        'code_urls_found': len(code_urls),
-        'data_urls_found': len(data_urls)
-    }
-
-
-def analyze_research_outcomes(papers: List[Dict]) -> Dict:
-    """Analyze research outcomes."""
-    clinical_trials = 0
-    patents = 0
-    retractions = 0
-    corrections = 0
-    clinical_trial_ids = []
-    patent_numbers = []
-
-    for paper in papers:
-        outcomes = paper.get('research_outcomes', {})
+            self.mentions_replication += 1
+
+    def merge(self, other: 'ReproducibilityAccumulator'):
+        self.total += other.total
+        self.code_available += other.code_available
+        self.data_available += other.data_available
+        self.has_supplementary += other.has_supplementary
+        self.mentions_replication += other.mentions_replication
+        self.code_urls += other.code_urls
+        self.data_urls += other.data_urls
+
+    def result(self) -> Dict:
+        total = self.total
+
+        return {
+            'code_availability_rate': self.code_available / total if total else 0,
+            'data_availability_rate': self.data_available / total if total else 0,
+            'supplementary_rate': self.has_supplementary / total if total else 0,
+            'replication_mention_rate': self.mentions_replication / total if total else 0,
+            'papers_with_code': self.code_available,
+            'papers_with_data': self.data_available,
+            'papers_with_supplementary': self.has_supplementary,
+            'papers_mentioning_replication': self.mentions_replication,
+            'total_papers': total,
+            'code_urls_found': self.code_urls,
+            'data_urls_found': self.data_urls
+        }
+
+
+class ResearchOutcomesAccumulator:
+    """Research outcomes."""
+
+    def __init__(self):
+        self.total = 0
+        self.clinical_trials = 0
+        self.patents = 0
+        self.retractions = 0
+        self.corrections = 0
+        self.clinical_trial_ids = 0
+        self.patent_numbers = 0
+
+    def add(self, paper: Dict):
+        self.total += 1
+        outcomes = paper.get('research_outcomes') or {}
 
         if outcomes.get('has_clinical_trial'):
-            clinical_trials += 1
-            trial_ids = outcomes.get('clinical_trial_ids', [])
-            clinical_trial_ids.extend([tid for tid in trial_ids if tid])
+            self.clinical_trials += 1
+            self.clinical_trial_ids += sum(1 for tid in outcomes.get('clinical_trial_ids') or [] if tid)
 
         if outcomes.get('has_patent'):
-            patents += 1
-            pat_nums = outcomes.get('patent_numbers', [])
-            patent_numbers.extend([pn for pn in pat_nums if pn])
+            self.patents += 1
+            self.patent_numbers += sum(1 for pn in outcomes.get('patent_numbers') or [] if pn)
 
         if outcomes.get('mentions_retraction'):
-            retractions += 1
+            self.retractions += 1
 
         if outcomes.get('mentions_correction'):
-            corrections += 1
+            self.corrections += 1
+
+    def merge(self, other: 'ResearchOutcomesAccumulator'):
+        self.total += other.total
+        self.clinical_trials += other.clinical_trials
+        self.patents += other.patents
+        self.retractions += other.retractions
+        self.corrections += other.corrections
+        self.clinical_trial_ids += other.clinical_trial_ids
+        self.patent_numbers += other.patent_numbers
+
+    def result(self) -> Dict:
+        total = self.total
+
+        return {
+            'clinical_trial_rate': self.clinical_trials / total if total else 0,
+            'patent_rate': self.patents / total if total else 0,
+            'retraction_rate': self.retractions / total if total else 0,
+            'correction_rate': self.corrections / total if total else 0,
+            'papers_with_clinical_trials': self.clinical_trials,
+            'papers_with_patents': self.patents,
+            'papers_with_retractions': self.retractions,
+            'papers_with_corrections': self.corrections,
+            'total_papers': total,
+            'clinical_trial_ids_found': self.clinical_trial_ids,
+            'patent_numbers_found': self.patent_numbers
+        }
+
+
+def check_same_counting(accumulator, other):
+    """Raise ValueError if one of two accumulators counts exactly and the other with a capacity."""
+    if (accumulator.capacity is None) != (other.capacity is None):
+        def counting(capacity):
+            return 'exactly' if capacity is None else f'with capacity {capacity}'
+        raise ValueError(f"Can't merge a {type(other).__name__} counted {counting(other.capacity)}"
+                         f" into one counted {counting(accumulator.capacity)}")
+
+
+class ImpactIndicatorsAccumulator:
+    """
+    Impact indicators.
+
+    With a `capacity`, applications are counted in a sketches.SketchCounter
+    of that size instead of an exact Counter: the top applications are then
+    estimates, in bounded memory, and the result adds an estimate of the
+    number of distinct ones. Without a capacity the result has the same keys
+    as before sketches existed. Only accumulators that count the same way
+    merge.
+
+    The capacity is for library use: the category analyses main() writes
+    don't include this section.
+    """
+
+    def __init__(self, capacity: Optional[int] = None):
+        self.capacity = capacity
+        self.total = 0
+        self.media_coverage = 0
+        self.policy_influence = 0
+        self.industry_adoption = 0
+        self.real_world_apps = new_counter(capacity)
+
+    def add(self, paper: Dict):
+        self.total += 1
+        impact = paper.get('impact_indicators') or {}
+
+        if impact.get('mentions_media_coverage'):
+            self.media_coverage += 1
 
-    total = len(papers)
+        if impact.get('mentions_policy_influence'):
+            self.policy_influence += 1
 
+        if impact.get('mentions_industry_adoption'):
+            self.industry_adoption += 1
+
+        self.real_world_apps.update(app for app in impact.get('real_world_applications') or [] if app)
+
+    def merge(self, other: 'ImpactIndicatorsAccumulator'):
+        check_same_counting(self, other)
+        self.total += other.total
+        self.media_coverage += other.media_coverage
+        self.policy_influence += other.policy_influence
+        self.industry_adoption += other.industry_adoption
+        self.real_world_apps.update(other.real_world_apps)
+
+    def result(self) -> Dict:
+        total = self.total
+
+        result = {
+            'media_coverage_rate': self.media_coverage / total if total else 0,
+            'policy_influence_rate': self.policy_influence / total if total else 0,
+            'industry_adoption_rate': self.industry_adoption / total if total else 0,
+            'papers_with_media_coverage': self.media_coverage,
+            'papers_with_policy_influence': self.policy_influence,
+            'papers_with_industry_adoption': self.industry_adoption,
+            'top_real_world_applications': dict(self.real_world_apps.most_common(20)),
+            'total_papers': total
+        }
+        if self.capacity is not None:
+            result['distinct_real_world_applications'] = len(self.real_world_apps)
+        return result
+
+
+class AdditionalInfoAccumulator:
+    """Funding sources, collaborations and keywords; `capacity` as for ImpactIndicatorsAccumulator."""
+
+    def __init__(self, capacity: Optional[int] = None):
+        self.capacity = capacity
+        self.total = 0
+        self.funding_sources = new_counter(capacity)
+        self.collaborations = new_counter(capacity)
+        self.keywords = new_counter(capacity)
+
+    def add(self, paper: Dict):
+        self.total += 1
+        additional = paper.get('additional_info') or {}
+
+        self.funding_sources.update(funding for funding in additional.get('funding_sources') or [] if funding)
+        self.collaborations.update(collab for collab in additional.get('collaborations') or [] if collab)
+        self.keywords.update(keyword for keyword in additional.get('keywords') or [] if keyword)
+
+    def merge(self, other: 'AdditionalInfoAccumulator'):
+        check_same_counting(self, other)
+        self.total += other.total
+        self.funding_sources.update(other.funding_sources)
+        self.collaborations.update(other.collaborations)
+        self.keywords.update(other.keywords)
+
+    def result(self) -> Dict:
+        result = {
+            'top_funding_sources': dict(self.funding_sources.most_common(20)),
+            'top_collaborations': dict(self.collaborations.most_common(20)),
+            'top_keywords': dict(self.keywords.most_common(50)),
+            'total_papers': self.total
+        }
+        if self.capacity is not None:
+            result['distinct_funding_sources'] = len(self.funding_sources)
+            result['distinct_collaborations'] = len(self.collaborations)
+            result['distinct_keywords'] = len(self.keywords)
+        return result
+
+
+def year_counts() -> Dict[str, int]:
     return {
-        'clinical_trial_rate': clinical_trials / total if total else 0,
-        'patent_rate': patents / total if total else 0,
-        'retraction_rate': retractions / total if total else 0,
-        'correction_rate': corrections / total if total else 0,
-        'papers_with_clinical_trials': clinical_trials,
-        'papers_with_patents': patents,
-        'papers_with_retractions': retractions,
-        'papers_with_corrections': corrections,
-        'total_papers': total,
-        'clinical_trial_ids_found': len(clinical_trial_ids),
-        'patent_numbers_found': len(patent_numbers)
+        'count': 0,
+        'code_available': 0,
+        'data_available': 0,
+        'ml_adoption': 0,
+        'clinical_trials': 0,
+        'patents': 0
     }
 
 
-def analyze_impact_indicators(papers: List[Dict]) -> Dict:
-    """Analyze impact indicators."""
-    media_coverage = 0
-    policy_influence = 0
-    industry_adoption = 0
-    real_world_apps = Counter()
+class TemporalTrendsAccumulator:
+    """Trends over time."""
 
-    for paper in papers:
-        impact = paper.get('impact_indicators', {})
+    def __init__(self):
+        self.by_year = defaultdict(year_counts)  # A named factory, so the accumulator pickles
 
-        if impact.get('mentions_media_coverage'):
-            media_coverage += 1
+    def add(self, paper: Dict):
+        year = paper.get('_year', 'unknown')
 
-        if impact.get('mentions_policy_influence'):
-            policy_influence += 1
+        if year != 'unknown':
+            by_year = self.by_year[year]
+            reproducibility = paper.get('reproducibility') or {}
+            outcomes = paper.get('research_outcomes') or {}
+            by_year['count'] += 1
 
-        if impact.get('mentions_industry_adoption'):
-            industry_adoption += 1
+            if reproducibility.get('code_available'):
+                by_year['code_available'] += 1
 
-        for app in impact.get('real_world_applications', []):
-            if app:
-                real_world_apps[app] += 1
+            if reproducibility.get('data_available'):
+                by_year['data_available'] += 1
 
-    total = len(papers)
+            if (paper.get('ml_adoption') or {}).get('frameworks'):
+                by_year['ml_adoption'] += 1
 
-    return {
-        'media_coverage_rate': media_coverage / total if total else 0,
-        'policy_influence_rate': policy_influence / total if total else 0,
-        'industry_adoption_rate': industry_adoption / total if total else 0,
-        'papers_with_media_coverage': media_coverage,
-        'papers_with_policy_influence': policy_influence,
-        'papers_with_industry_adoption': industry_adoption,
-        'top_real_world_applications': dict(real_world_apps.most_common(20)),
-        'total_papers': total
-    }
+            if outcomes.get('has_clinical_trial'):
+                by_year['clinical_trials'] += 1
+
+            if outcomes.get('has_patent'):
+                by_year['patents'] += 1
 
+    def merge(self, other: 'TemporalTrendsAccumulator'):
+        for year, counts in other.by_year.items():
+            by_year = self.by_year[year]
+            for key, count in counts.items():
+                by_year[key] += count
 
-def analyze_additional_info(papers: List[Dict]) -> Dict:
-    """Analyze additional information."""
-    funding_sources = Counter()
-    collaborations = Counter()
-    keywords = Counter()
+    def result(self) -> Dict:
+        return dict(sorted(self.by_year.items()))
 
+
+def feed(papers: Iterable[Dict], accumulators: Dict[str, object]):
+    """Feed every paper to every accumulator in one pass."""
+    adders = [accumulator.add for accumulator in accumulators.values()]
     for paper in papers:
-        additional = paper.get('additional_info', {})
+        for add in adders:
+            add(paper)
 
-        for funding in additional.get('funding_sources', []):
-            if funding:
-                funding_sources[funding] += 1
 
-        for collab in additional.get('collaborations', []):
-            if collab:
-                collaborations[collab] += 1
+def accumulate(papers: Iterable[Dict], accumulators: Dict[str, object]) -> Dict:
+    """Feed every paper to every accumulator in one pass; return their results by name."""
+    feed(papers, accumulators)
+    return {name: accumulator.result() for name, accumulator in accumulators.items()}
 
-        for keyword in additional.get('keywords', []):
-            if keyword:
-                keywords[keyword] += 1
 
-    return {
-        'top_funding_sources': dict(funding_sources.most_common(20)),
-        'top_collaborations': dict(collaborations.most_common(20)),
-        'top_keywords': dict(keywords.most_common(50)),
-        'total_papers': len(papers)
-    }
+def analyze_ml_impact_quantification(papers: Iterable[Dict]) -> Dict:
+    """Analyze ML impact quantification across papers."""
+    return accumulate(papers, {'result': MLImpactAccumulator()})['result']
 
 
-def analyze_temporal_trends(papers: List[Dict]) -> Dict:
-    """Analyze trends over time."""
-    by_year = defaultdict(lambda: {
-        'count': 0,
-        'code_available': 0,
-        'data_available': 0,
-        'ml_adoption': 0,
-        'clinical_trials': 0,
-        'patents': 0
-    })
+def analyze_reproducibility(papers: Iterable[Dict]) -> Dict:
+    """Analyze reproducibility indicators."""
+    return accumulate(papers, {'result': ReproducibilityAccumulator()})['result']
 
-    for paper in papers:
-        year = paper.get('_year', 'unknown')
 
-        if year != 'unknown':
-            by_year[year]['count'] += 1
+def analyze_research_outcomes(papers: Iterable[Dict]) -> Dict:
+    """Analyze research outcomes."""
+    return accumulate(papers, {'result': ResearchOutcomesAccumulator()})['result']
+
 
-            if paper.get('reproducibility', {}).get('code_available'):
-                by_year[year]['code_available'] += 1
+def analyze_impact_indicators(papers: Iterable[Dict], capacity: Optional[int] = None) -> Dict:
+    """Analyze impact indicators; with a capacity, top and distinct applications are sketched."""
+    return accumulate(papers, {'result': ImpactIndicatorsAccumulator(capacity)})['result']
 
-            if paper.get('reproducibility', {}).get('data_available'):
-                by_year[year]['data_available'] += 1
 
-            if paper.get('ml_adoption', {}).get('frameworks'):
-                by_year[year]['ml_adoption'] += 1
+def analyze_additional_info(papers: Iterable[Dict], capacity: Optional[int] = None) -> Dict:
+    """Analyze additional information; with a capacity, top and distinct entries are sketched."""
+    return accumulate(papers, {'result': AdditionalInfoAccumulator(capacity)})['result']
 
-            if paper.get('research_outcomes', {}).get('has_clinical_trial'):
-                by_year[year]['clinical_trials'] += 1
 
-            if paper.get('research_outcomes', {}).get('has_patent'):
-                by_year[year]['patents'] += 1
+def analyze_temporal_trends(papers: Iterable[Dict]) -> Dict:
+    """Analyze trends over time."""
+    return accumulate(papers, {'result': TemporalTrendsAccumulator()})['result']
 
-    return dict(sorted(by_year.items()))
 
+# Sections of a category analysis, computed together in one pass over its file
+CATEGORY_ANALYSES = {
+    'ml_impact_quantification': MLImpactAccumulator,
+}
+
+
+def new_accumulators() -> Dict[str, object]:
+    return {name: accumulator() for name, accumulator in CATEGORY_ANALYSES.items()}
 
-def analyze_category(category: str) -> Dict:
-    """Comprehensive analysis of a category."""
-    print(f"\nAnalyzing {category}...")
 
-    papers = load_extracted_data(category)
+def category_analysis(category: str, accumulators: Dict[str, object]) -> Optional[Dict]:
+    """The analysis of a category from its fed accumulators; None if it has no papers."""
+    total = accumulators['ml_impact_quantification'].total
 
-    if not papers:
+    if not total:
         print(f"  No data found for {category}")
         return None
 
-    print(f"  Loaded {len(papers):,} papers")
+    print(f"  Loaded {total:,} papers")
 
     analysis = {
         'category': category,
-        'total_papers': len(papers),
-        'ml_impact_quantification': analyze_ml_impact_quantification(papers)
+        'total_papers': total,
+        **{name: accumulator.result() for name, accumulator in accumulators.items()}
     }
 
     return analysis
 
 
+def analyze_category(category: str) -> Optional[Dict]:
+    """
+    Comprehensive analysis of a category.
+
+    The impact file is read once, a record at a time, and every record goes
+    to each CATEGORY_ANALYSES accumulator, so memory does not grow with the
+    size of the category.
+    """
+    print(f"\nAnalyzing {category}...")
+
+    accumulators = new_accumulators()
+    feed(iter_extracted_data(category), accumulators)
+    return category_analysis(category, accumulators)
+
+
+def byte_ranges(start: int, end: int, range_bytes: int = RANGE_BYTES) -> List[Tuple[int, int]]:
+    """Split [start, end) into ranges of range_bytes; iter_impact_records keeps each line in one range."""
+    return [(offset, min(offset + range_bytes, end)) for offset in range(start, end, range_bytes)]
+
+
+def analyze_range(input_file: Path, start: int, end: int) -> Dict[str, object]:
+    """CATEGORY_ANALYSES accumulators fed with one byte range of an impact file (run in a worker process)."""
+    accumulators = new_accumulators()
+    feed(iter_impact_records(input_file, start, end), accumulators)
+    return accumulators
+
+
+def complete_length(input_file: Path) -> int:
+    """Length of input_file up to the end of its last complete line."""
+    with open(input_file, 'rb') as f:
+        end = f.seek(0, os.SEEK_END)
+        while end > 0:
+            start = max(0, end - 2**16)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b'\n')
+            if newline >= 0:
+                return start + newline + 1
+            end = start
+    return 0
+
+
+def input_fingerprint(input_file: Path, length: int) -> Optional[str]:
+    """
+    Hash of the first and last FINGERPRINT_BYTES of input_file's first length bytes.
+
+    None if the file is now shorter than that. An impact file that was only
+    appended to keeps the fingerprint of the part analyzed before.
+    """
+    with open(input_file, 'rb') as f:
+        if f.seek(0, os.SEEK_END) < length:
+            return None
+        f.seek(0)
+        digest = hashlib.sha256(f.read(min(length, FINGERPRINT_BYTES)))
+        f.seek(max(0, length - FINGERPRINT_BYTES))
+        digest.update(f.read(length - f.tell()))
+    return digest.hexdigest()
+
+
+def load_state(state_file: Path, input_file: Path) -> Tuple[Dict[str, object], int]:
+    """
+    The accumulators saved in state_file and the length of the impact file they cover.
+
+    Fresh accumulators and 0 if there is no state, it was saved for other
+    CATEGORY_ANALYSES or with other capacities, or the impact file no longer
+    starts with the bytes it was saved for (it was replaced rather than
+    appended to).
+    """
+    fresh = new_accumulators()
+    try:
+        with open(state_file, 'rb') as f:
+            state = pickle.load(f)
+        accumulators, offset = state['accumulators'], state['offset']
+        valid = (state['version'] == STATE_VERSION
+                 and list(accumulators) == list(fresh)
+                 and all(type(accumulators[name]) is type(accumulator)
+                         and getattr(accumulators[name], 'capacity', None) == getattr(accumulator, 'capacity', None)
+                         for name, accumulator in fresh.items())
+                 and state['fingerprint'] == input_fingerprint(input_file, offset))
+    except Exception:  # Missing, unreadable, or written by an older version of this script
+        valid = False
+
+    if not valid:
+        return fresh, 0
+    return accumulators, offset
+
+
+def save_state(state_file: Path, input_file: Path, accumulators: Dict[str, object], offset: int):
+    """Save the accumulators fed with the first offset bytes of input_file, replacing the state atomically."""
+    state = {'version': STATE_VERSION, 'offset': offset, 'fingerprint': input_fingerprint(input_file, offset),
+             'accumulators': accumulators}
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = state_file.with_suffix('.tmp')
+    with open(tmp_file, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, state_file)
+
+
+def update_categories(categories: List[str], workers: int = 1, state_dir: Optional[Path] = None,
+                      full: bool = False, range_bytes: int = RANGE_BYTES) -> Iterator[Tuple[Optional[Dict], bool]]:
+    """
+    Yield (analysis, changed) for each category, in order.
+
+    With a state_dir, each category's accumulators are saved there with the
+    length of the impact file they cover, and the next call feeds them only
+    the records appended since; `full` starts over. A last line without its
+    newline may still be being written, so it is left for the next call.
+    `changed` is False when there was nothing new to read.
+
+    With several workers, every category, and every range_bytes of a large
+    one, is analyzed in a pool of processes. The ranges' accumulators are
+    merged in file order, so counts, attribution sums and the order of ties
+    come out exactly as from one pass.
+    """
+    with contextlib.ExitStack() as stack:
+        pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers)) if workers > 1 else None
+
+        # Everything is submitted up front, so workers move on to the next
+        # category while this one's ranges are merged
+        pending = []
+        for category in categories:
+            input_file = INPUT_DIR / f"{category}_impact.jsonl"
+            state_file = state_dir / f"{category}_state.pickle" if state_dir else None
+            accumulators, start = new_accumulators(), 0
+            if state_file and not full:
+                accumulators, start = load_state(state_file, input_file)
+
+            if not input_file.exists():
+                end = 0
+            elif state_file:
+                end = complete_length(input_file)
+            else:
+                end = input_file.stat().st_size if pool else None
+
+            parts = None
+            if pool:
+                parts = [pool.submit(analyze_range, input_file, range_start, range_end)
+                         for range_start, range_end in byte_ranges(start, end, range_bytes)]
+            pending.append((category, input_file, state_file, accumulators, start, end, parts))
+
+        for category, input_file, state_file, accumulators, start, end, parts in pending:
+            print(f"\nAnalyzing {category}...")
+            changed = end != start
+            if parts is not None:
+                for future in parts:
+                    for name, part in future.result().items():
+                        accumulators[name].merge(part)
+            elif changed:
+                feed(iter_impact_records(input_file, start, end), accumulators)
+
+            if state_file and changed:
+                save_state(state_file, input_file, accumulators, end)
+            elif start:
+                print(f"  ✓ No new records since the last run")
+            yield category_analysis(category, accumulators), changed
+
+
+def analyze_categories(categories: List[str], workers: int = 1,
+                       range_bytes: int = RANGE_BYTES) -> Iterator[Optional[Dict]]:
+    """Yield analyze_category for each category, in order, in a pool of `workers` processes."""
+    for analysis, _ in update_categories(categories, workers, range_bytes=range_bytes):
+        yield analysis
+
+
+ML_IMPACT_FLAGS = {
+    'papers_with_ml_usage': 'has_ml_usage',
+    'papers_with_acceleration': 'provides_acceleration',
+    'papers_with_efficiency': 'improves_efficiency',
+    'papers_with_new_capability': 'enables_new_capability',
+}
+
+
+def analyze_ml_impact_frame(frame) -> Dict:
+    """analyze_ml_impact_quantification over a DataFrame of impact_store columns."""
+    total = len(frame)
+    flags = {key: int(frame[column].sum()) for key, column in ML_IMPACT_FLAGS.items()}
+
+    # Most common first; ties in the order the levels first appear, as Counter.most_common keeps them
+    levels = frame.groupby('ml_contribution_level', dropna=False, sort=False)['row'].agg(['size', 'min'])
+    levels = levels.sort_values(['size', 'min'], ascending=[False, True], kind='stable')
+    distribution = {(level if isinstance(level, str) else None): int(count) for level, count in levels['size'].items()}
+
+    # Added up exactly, as ExactSum adds them in the JSON analysis, so the average matches to the last bit
+    scores = [score for score in frame['ml_contribution_percent'].tolist() if math.isfinite(score)]
+
+    return {
+        'total_papers': total,
+        'papers_with_ml_usage': flags['papers_with_ml_usage'],
+        'ml_usage_rate': flags['papers_with_ml_usage'] / total if total else 0,
+        'contribution_level_distribution': distribution,
+        'papers_with_acceleration': flags['papers_with_acceleration'],
+        'acceleration_rate': flags['papers_with_acceleration'] / total if total else 0,
+        'papers_with_efficiency': flags['papers_with_efficiency'],
+        'efficiency_rate': flags['papers_with_efficiency'] / total if total else 0,
+        'papers_with_new_capability': flags['papers_with_new_capability'],
+        'new_capability_rate': flags['papers_with_new_capability'] / total if total else 0,
+        'average_ml_attribution': math.fsum(scores) / len(scores) if scores else 0,
+        'attribution_scores_count': len(scores)
+    }
+
+
+def analyze_category_store(category: str, store_dir: Path = STORE_DIR) -> Optional[Dict]:
+    """
+    analyze_category over the columnar store written by impact_store.py.
+
+    Only the columns the analysis needs are read, and the counts are pandas
+    aggregations, so no JSON is parsed.
+    """
+    print(f"\nAnalyzing {category}...")
+
+    columns = ['ml_contribution_level', 'ml_contribution_percent', *ML_IMPACT_FLAGS.values()]
+    frame = impact_store.read_category(category, columns, store_dir)
+
+    if frame.empty:
+        print(f"  No data found for {category}")
+        return None
+
+    print(f"  Loaded {len(frame):,} papers")
+
+    return {
+        'category': category,
+        'total_papers': len(frame),
+        'ml_impact_quantification': analyze_ml_impact_frame(frame)
+    }
+
+
 def generate_category_report(analysis: Dict, output_file: Path):
     """Generate a detailed report for a category."""
     category = analysis['category']
@@ -391,36 +893,60 @@ def export_to_csv(all_analyses: List[Dict]):
     print(f"\n✓ Summary CSV saved to {csv_file}")
 
 
-def main():
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Analyze extracted research impact data.")
+    parser.add_argument('--store', type=Path, nargs='?', const=STORE_DIR,
+                        help=f"Read the columnar store written by impact_store.py (default: {STORE_DIR})")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processes that parse impact files; categories larger than "
+                             f"{RANGE_BYTES // 2**20} MB are split between them (default: 1)")
+    parser.add_argument('--full', action='store_true',
+                        help="Reanalyze every record, not only those appended since the last run")
+    args = parser.parse_args(argv)
+
     print("=" * 60)
     print("Research Impact Analysis")
     print("=" * 60)
 
-    setup_output_dir()
+    if args.store and impact_store is None:
+        print("\n✗ --store needs pyarrow and pandas: pip install -r requirements-store.txt")
+        return
 
-    # Find all extracted impact files
-    impact_files = list(INPUT_DIR.glob("*_impact.jsonl"))
+    setup_output_dir()
 
-    if not impact_files:
-        print(f"\n✗ No extracted impact files found in {INPUT_DIR}")
-        print("  Run extract_research_impact.py first")
+    # Find all extracted impact files, or the categories in the store
+    if args.store:
+        categories = impact_store.store_categories(args.store)
+        source = args.store
+    else:
+        categories = [impact_file.stem.replace('_impact', '') for impact_file in INPUT_DIR.glob("*_impact.jsonl")]
+        source = INPUT_DIR
+
+    if not categories:
+        print(f"\n✗ No extracted impact data found in {source}")
+        print("  Run extract_research_impact.py first" + (", then impact_store.py" if args.store else ""))
         return
 
-    print(f"\n✓ Found {len(impact_files)} categories to analyze")
+    print(f"\n✓ Found {len(categories)} categories to analyze")
 
     all_analyses = []
 
     # Analyze each category
-    for impact_file in impact_files:
-        category = impact_file.stem.replace('_impact', '')
-
-        analysis = analyze_category(category)
+    if args.store:
+        analyses = ((analyze_category_store(category, args.store), True) for category in categories)
+    else:
+        analyses = update_categories(categories, args.workers, OUTPUT_DIR / "state", full=args.full)
 
+    for category, (analysis, changed) in zip(categories, analyses):
         if analysis:
             all_analyses.append(analysis)
 
-            # Save detailed JSON
+            # Reports of categories without new records are left as they are
             json_file = OUTPUT_DIR / f"{category}_analysis.json"
+            if not changed and json_file.exists():
+                continue
+
+            # Save detailed JSON
             with open(json_file, 'w') as f:
                 json.dump(analysis, f, indent=2)
             print(f"  ✓ Analysis saved to {json_file}")
@@ -0,0 +1,117 @@
+"""
+Shared async HTTP clients for the Ollama and OpenAlex upstreams.
+
+Each upstream gets one pooled httpx.AsyncClient for the lifetime of the app and
+a semaphore that caps how many requests may be in flight at once, so slow
+generations never block the event loop or starve the other endpoints.
+"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import httpx
+
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://127.0.0.1:11434")
+OPENALEX_BASE_URL = os.getenv("OPENALEX_BASE_URL", "https://api.openalex.org")
+OLLAMA_MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "4"))
+OPENALEX_MAX_CONCURRENCY = int(os.getenv("OPENALEX_MAX_CONCURRENCY", "8"))
+
+
+class UpstreamClient:
+    """A pooled async HTTP client that limits concurrent calls to one upstream."""
+
+    def __init__(self, base_url: str, max_concurrency: int, default_timeout: float):
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.default_timeout = default_timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def start(self):
+        """Open the connection pool. Must run inside the serving event loop."""
+        if self._client is not None:
+            return
+        # Leave headroom above the concurrency cap for unthrottled calls
+        # such as health checks.
+        pool_size = self.max_concurrency + 2
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.default_timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def close(self):
+        """Close the connection pool."""
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._semaphore = None
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        timeout: Optional[float] = None,
+        throttle: bool = True,
+        **kwargs,
+    ) -> httpx.Response:
+        """
+        Send a request to the upstream.
+
+        `timeout` overrides the client default for this call. Set `throttle` to
+        False for cheap probes that must not queue behind long generations.
+        """
+        if self._client is None:
+            raise RuntimeError(f"HTTP client for {self.base_url} has not been started")
+
+        timeout = timeout if timeout is not None else self.default_timeout
+        if not throttle:
+            return await self._client.request(method, path, timeout=timeout, **kwargs)
+
+        async with self._semaphore:
+            return await self._client.request(method, path, timeout=timeout, **kwargs)
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        method: str,
+        path: str,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> AsyncIterator[httpx.Response]:
+        """
+        Open a streaming request to the upstream.
+
+        The concurrency slot is held until the context exits, and exiting the
+        context closes the upstream connection, which aborts the request.
+        """
+        if self._client is None:
+            raise RuntimeError(f"HTTP client for {self.base_url} has not been started")
+
+        timeout = timeout if timeout is not None else self.default_timeout
+        async with self._semaphore:
+            async with self._client.stream(method, path, timeout=timeout, **kwargs) as response:
+                yield response
+
+    async def get(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", path, **kwargs)
+
+
+ollama_client = UpstreamClient(OLLAMA_BASE_URL, OLLAMA_MAX_CONCURRENCY, default_timeout=60)
+openalex_client = UpstreamClient(OPENALEX_BASE_URL, OPENALEX_MAX_CONCURRENCY, default_timeout=30)
+
+
+async def start_http_clients():
+    await ollama_client.start()
+    await openalex_client.start()
+
+
+async def close_http_clients():
+    await ollama_client.close()
+    await openalex_client.close()
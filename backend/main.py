@@ -2,20 +2,53 @@
 FastAPI backend for research paper dataset Q&A using Ollama.
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, Query
+from fastapi import FastAPI, HTTPException, UploadFile, File, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import requests
+import httpx
+import hashlib
 import json
+import logging
+import os
+import sys
 from pathlib import Path
 from typing import Optional, List
-import PyPDF2
-import io
 import re
 from datetime import datetime, timedelta
 
+# Share the PDF extraction utilities with the paper insights service
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from utils.text_extraction import PdfExtractionTimeout, PdfExtractor, PdfSource
+from utils.uploads import UploadLimitMiddleware, upload_sha256, upload_source
+from cache import CoalescingCache, DiskCache, ResponseCache
+from prompt_context import PromptContext
+from openalex import SEARCH_FIELDS, TRENDING_FIELDS, WorkNormalizer, parse_select
+from http_clients import (
+    OLLAMA_BASE_URL,
+    ollama_client,
+    openalex_client,
+    start_http_clients,
+    close_http_clients,
+)
+
+logger = logging.getLogger(__name__)
+
+OLLAMA_MODEL = "llama3.1:8b"
+CHAT_CACHE_SIZE = int(os.getenv("CHAT_CACHE_SIZE", "512"))
+CHAT_CACHE_TTL = float(os.getenv("CHAT_CACHE_TTL", "3600"))  # Seconds
+UPLOAD_CACHE_DIR = Path(os.getenv("UPLOAD_CACHE_DIR", Path(__file__).parent / ".cache" / "uploads"))
+UPLOAD_CACHE_MAX_MB = int(os.getenv("UPLOAD_CACHE_MAX_MB", "256"))
+OPENALEX_CACHE_SIZE = int(os.getenv("OPENALEX_CACHE_SIZE", "256"))
+OPENALEX_CACHE_TTL = float(os.getenv("OPENALEX_CACHE_TTL", "600"))  # Seconds
+OPENALEX_CACHE_STALE_TTL = float(os.getenv("OPENALEX_CACHE_STALE_TTL", "3600"))  # Seconds
+
 app = FastAPI(title="Research Paper Dataset API")
 
+# Refuse oversized uploads before their bodies are parsed
+app.add_middleware(UploadLimitMiddleware, paths=["/api/upload-paper"])
+
 # Configure CORS for Next.js frontend
 app.add_middleware(
     CORSMiddleware,
@@ -28,19 +61,84 @@ app.add_middleware(
 # Load dataset at startup
 DATASET_PATH = Path(__file__).parent.parent / "data" / "validation_metrics_summary.json"
 dataset = None
+prompt_context: Optional[PromptContext] = None
+dataset_signature = None
+dataset_version: Optional[str] = None
 
+# Answers to recent chat questions, keyed by chat_cache_key()
+chat_cache = ResponseCache(maxsize=CHAT_CACHE_SIZE, ttl=CHAT_CACHE_TTL)
 
-@app.on_event("startup")
-async def load_dataset():
-    """Load the validation metrics dataset."""
-    global dataset
+# Extracted text and analyses of uploaded papers, keyed by SHA-256 of the PDF
+upload_cache = DiskCache(UPLOAD_CACHE_DIR, max_bytes=UPLOAD_CACHE_MAX_MB * 1024 * 1024)
+
+# Raw OpenAlex responses, keyed by the normalized query parameters
+openalex_cache = CoalescingCache(
+    maxsize=OPENALEX_CACHE_SIZE,
+    ttl=OPENALEX_CACHE_TTL,
+    stale_ttl=OPENALEX_CACHE_STALE_TTL,
+)
+
+# PDF parsing is CPU-bound, so it runs in a bounded process pool
+pdf_extractor = PdfExtractor()
+
+
+def load_dataset_file():
+    """Load the dataset and render its prompt context."""
+    global dataset, prompt_context, dataset_signature, dataset_version
     try:
-        with open(DATASET_PATH, "r") as f:
-            dataset = json.load(f)
+        stat = DATASET_PATH.stat()
+        with open(DATASET_PATH, "rb") as f:
+            raw = f.read()
+        dataset = json.loads(raw)
+        prompt_context = PromptContext(dataset)
+        dataset_signature = (stat.st_mtime_ns, stat.st_size)
+
+        version = hashlib.sha256(raw).hexdigest()
+        if version != dataset_version:
+            chat_cache.clear()
+        dataset_version = version
         print("✓ Dataset loaded successfully")
     except Exception as e:
         print(f"✗ Error loading dataset: {e}")
         dataset = None
+        prompt_context = None
+        dataset_signature = None
+        dataset_version = None
+        chat_cache.clear()
+
+
+def refresh_dataset():
+    """Reload the dataset if the file has been replaced since it was loaded."""
+    try:
+        stat = DATASET_PATH.stat()
+    except OSError:
+        return
+    if (stat.st_mtime_ns, stat.st_size) != dataset_signature:
+        load_dataset_file()
+
+
+@app.on_event("startup")
+async def load_dataset():
+    """Load the validation metrics dataset."""
+    load_dataset_file()
+
+
+@app.on_event("startup")
+async def open_http_clients():
+    """Open the shared Ollama and OpenAlex connection pools."""
+    await start_http_clients()
+
+
+@app.on_event("shutdown")
+async def shutdown_http_clients():
+    """Close the shared connection pools."""
+    await close_http_clients()
+
+
+@app.on_event("shutdown")
+async def shutdown_pdf_extractor():
+    """Stop the PDF extraction worker processes."""
+    pdf_extractor.shutdown()
 
 
 class ChatRequest(BaseModel):
@@ -51,103 +149,36 @@ class ChatRequest(BaseModel):
 class ChatResponse(BaseModel):
     response: str
     error: Optional[str] = None
+    cached: bool = False
 
 
-def construct_prompt(user_query: str, dataset_data: dict) -> str:
+def chat_cache_key(user_query: str) -> tuple:
     """
-    Construct a prompt for Ollama that includes relevant dataset context.
-    Intelligently detects which field(s) the query is about and prioritizes that data.
+    Key a chat answer on the normalized question text, the dataset fields it
+    mentions and the dataset version, so rephrasings that differ only in case,
+    spacing or punctuation share an entry.
     """
-    # Extract key information from the dataset
-    metadata = dataset_data.get("metadata", {})
-    aggregate = dataset_data.get("aggregate_metrics", {})
-    fields = dataset_data.get("field_analyses", {})
-
-    # Detect which field the user is asking about
-    query_lower = user_query.lower()
-    mentioned_fields = []
-    field_mapping = {
-        "biology": "Biology",
-        "computer science": "ComputerScience",
-        "cs": "ComputerScience",
-        "physics": "Physics",
-        "psychology": "Psychology",
-        "medicine": "Medicine",
-        "engineering": "Engineering",
-        "mathematics": "Mathematics",
-        "math": "Mathematics",
-        "economics": "Economics",
-        "business": "Business",
-        "environmental science": "EnvironmentalScience",
-        "materials science": "MaterialsScience",
-        "agricultural": "AgriculturalAndFoodSciences",
-        "agriculture": "AgriculturalAndFoodSciences",
-    }
-
-    for keyword, field_name in field_mapping.items():
-        if keyword in query_lower and field_name in fields:
-            mentioned_fields.append(field_name)
-
-    # Build a quick reference table for all fields
-    quick_reference = []
-    for field_name, field_data in fields.items():
-        ml_impact = field_data.get("ml_impact", {})
-        reproducibility = field_data.get("reproducibility", {})
-        total_papers = ml_impact.get('total_papers', 0)
-        ml_rate = ml_impact.get('ml_adoption_rate', 0)
-        ml_papers = int(total_papers * ml_rate / 100)
-
-        quick_reference.append(
-            f"  • {field_name}: {total_papers} papers, {ml_papers} with ML ({ml_rate}%), "
-            f"{reproducibility.get('papers_with_code', 0)} with code"
-        )
-
-    # Build detailed data for mentioned fields or all fields if none mentioned
-    detailed_fields = mentioned_fields if mentioned_fields else list(fields.keys())
-
-    detailed_data = []
-    for field_name in detailed_fields:
-        if field_name not in fields:
-            continue
-
-        field_data = fields[field_name]
-        ml_impact = field_data.get("ml_impact", {})
-        reproducibility = field_data.get("reproducibility", {})
-        temporal = field_data.get("temporal", {})
-        methodology = field_data.get("methodology", {})
-
-        total_papers = ml_impact.get('total_papers', 0)
-        ml_rate = ml_impact.get('ml_adoption_rate', 0)
-        ml_papers = int(total_papers * ml_rate / 100)
-
-        detail = f"""
-{field_name}:
-  Total Papers: {total_papers}
-  ML/AI Papers: {ml_papers} papers ({ml_rate}% adoption rate)
-  ML Distribution:
-{json.dumps(ml_impact.get('ml_distribution', {}), indent=4)}
+    normalized = " ".join(re.sub(r"[^\w\s%]", " ", user_query.lower()).split())
+    fields = tuple(sorted(set(prompt_context.detect_fields(user_query))))
+    return normalized, fields, dataset_version
 
-  Code Availability: {reproducibility.get('code_availability_rate', 0)}%
-  Papers with Code: {reproducibility.get('papers_with_code', 0)}
 
-  Statistical Methods Usage: {methodology.get('statistical_methods_usage_rate', 0)}%
-  Year Range: {temporal.get('year_range', 'N/A')}"""
-
-        detailed_data.append(detail)
+def construct_prompt(user_query: str, context: PromptContext) -> str:
+    """
+    Construct a prompt for Ollama that includes relevant dataset context.
+    Intelligently detects which field(s) the query is about and prioritizes that data.
+    """
+    mentioned_fields = context.detect_fields(user_query)
 
     dataset_summary = f"""You are an expert research data analyst. Answer questions about research paper statistics with precision and accuracy.
 
-DATASET OVERVIEW:
-• Total Papers: {metadata.get('total_papers', 'N/A')}
-• Fields Analyzed: {metadata.get('total_fields', 'N/A')}
-• Overall ML Adoption: {aggregate.get('aggregate_ml_adoption_rate', 'N/A')}%
-• Overall Code Availability: {aggregate.get('aggregate_code_availability_rate', 'N/A')}%
+{context.overview}
 
 QUICK REFERENCE - ALL FIELDS:
-{chr(10).join(quick_reference)}
+{context.quick_reference}
 
 DETAILED DATA FOR RELEVANT FIELD(S):
-{chr(10).join(detailed_data)}
+{context.details_for(mentioned_fields)}
 
 USER QUESTION: {user_query}
 
@@ -169,18 +200,24 @@ async def chat(request: ChatRequest):
     """
     Handle chat requests and query Ollama with dataset context.
     """
+    refresh_dataset()
     if dataset is None:
         raise HTTPException(status_code=500, detail="Dataset not loaded")
 
+    cache_key = chat_cache_key(request.message)
+    cached_response = chat_cache.get(cache_key)
+    if cached_response is not None:
+        return ChatResponse(response=cached_response, cached=True)
+
     try:
         # Construct prompt with dataset context
-        prompt = construct_prompt(request.message, dataset)
+        prompt = construct_prompt(request.message, prompt_context)
 
         # Call Ollama API
-        ollama_response = requests.post(
-            "http://127.0.0.1:11434/api/generate",
+        ollama_response = await ollama_client.post(
+            "/api/generate",
             json={
-                "model": "llama3.1:8b",
+                "model": OLLAMA_MODEL,
                 "prompt": prompt,
                 "stream": False,  # Get full response at once
             },
@@ -196,47 +233,138 @@ async def chat(request: ChatRequest):
         # Extract response from Ollama
         ollama_data = ollama_response.json()
         response_text = ollama_data.get("response", "")
+        if response_text:
+            chat_cache.set(cache_key, response_text)
 
         return ChatResponse(response=response_text)
 
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         raise HTTPException(status_code=504, detail="Request to Ollama timed out")
-    except requests.exceptions.ConnectionError:
+    except httpx.TransportError:
         raise HTTPException(
             status_code=503,
-            detail="Cannot connect to Ollama server. Make sure it's running at http://127.0.0.1:11434"
+            detail=f"Cannot connect to Ollama server. Make sure it's running at {OLLAMA_BASE_URL}"
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 
+def ndjson_line(payload: dict) -> str:
+    """Serialize one newline-delimited JSON event."""
+    return json.dumps(payload) + "\n"
+
+
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest, http_request: Request):
+    """
+    Stream the answer to a chat request as newline-delimited JSON.
+
+    Emits one {"token": ...} line per chunk Ollama generates, then {"done": true}.
+    Failures after the stream has started are sent as an {"error": ...} line.
+    When the client disconnects, the Ollama connection is closed, which cancels
+    the generation upstream. Cached answers are sent as a single token.
+    """
+    refresh_dataset()
+    if dataset is None:
+        raise HTTPException(status_code=500, detail="Dataset not loaded")
+
+    cache_key = chat_cache_key(request.message)
+    cached_response = chat_cache.get(cache_key)
+    if cached_response is None:
+        prompt = construct_prompt(request.message, prompt_context)
+
+    async def token_stream():
+        if cached_response is not None:
+            yield ndjson_line({"token": cached_response})
+            yield ndjson_line({"done": True, "cached": True})
+            return
+
+        tokens = []
+        try:
+            async with ollama_client.stream(
+                "POST",
+                "/api/generate",
+                json={
+                    "model": OLLAMA_MODEL,
+                    "prompt": prompt,
+                    "stream": True,
+                },
+                timeout=60,  # Max wait between streamed chunks
+            ) as ollama_response:
+                if ollama_response.status_code != 200:
+                    detail = (await ollama_response.aread()).decode("utf-8", errors="replace")
+                    yield ndjson_line({"error": f"Ollama API error: {detail}"})
+                    return
+
+                async for line in ollama_response.aiter_lines():
+                    if await http_request.is_disconnected():
+                        return
+                    if not line.strip():
+                        continue
+
+                    try:
+                        chunk = json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(
+                            "Malformed line from Ollama after %d tokens: %r; partial response: %r",
+                            len(tokens), line[:200], "".join(tokens),
+                        )
+                        yield ndjson_line({"error": "Ollama sent a malformed response"})
+                        return
+                    if chunk.get("error"):
+                        yield ndjson_line({"error": f"Ollama API error: {chunk['error']}"})
+                        return
+                    if chunk.get("response"):
+                        tokens.append(chunk["response"])
+                        yield ndjson_line({"token": chunk["response"]})
+                    if chunk.get("done"):
+                        break
+
+            if tokens:
+                chat_cache.set(cache_key, "".join(tokens))
+            yield ndjson_line({"done": True})
+
+        except httpx.TimeoutException:
+            yield ndjson_line({"error": "Request to Ollama timed out"})
+        except httpx.TransportError:
+            yield ndjson_line({
+                "error": f"Cannot connect to Ollama server. Make sure it's running at {OLLAMA_BASE_URL}"
+            })
+
+    return StreamingResponse(token_stream(), media_type="application/x-ndjson")
+
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint."""
     return {
         "status": "healthy",
         "dataset_loaded": dataset is not None,
-        "ollama_reachable": check_ollama_connection()
+        "ollama_reachable": await check_ollama_connection(),
+        "chat_cache": chat_cache.stats(),
+        "upload_cache": upload_cache.stats(),
+        "openalex_cache": openalex_cache.stats(),
     }
 
 
-def check_ollama_connection() -> bool:
+async def check_ollama_connection() -> bool:
     """Check if Ollama server is reachable."""
     try:
-        response = requests.get("http://127.0.0.1:11434/api/tags", timeout=2)
+        response = await ollama_client.get("/api/tags", timeout=2, throttle=False)
         return response.status_code == 200
-    except:
+    except Exception:
         return False
 
 
-def extract_text_from_pdf(pdf_file: bytes) -> str:
-    """Extract text content from a PDF file."""
+async def extract_text_from_pdf(pdf_file: PdfSource) -> str:
+    """Extract text content from a PDF file in the extraction process pool."""
     try:
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_file))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text.strip()
+        pages = await pdf_extractor.extract_pages(pdf_file)
+        return "\n".join(pages).strip()
+    except PdfExtractionTimeout:
+        raise HTTPException(status_code=400, detail="PDF text extraction timed out. The file may be too complex.")
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error extracting PDF text: {str(e)}")
 
@@ -284,27 +412,11 @@ def extract_paper_metadata(text: str) -> dict:
     return metadata
 
 
-def construct_paper_analysis_prompt(paper_text: str, paper_metadata: dict, dataset_data: dict) -> str:
+def construct_paper_analysis_prompt(paper_text: str, paper_metadata: dict, context: PromptContext) -> str:
     """
     Construct a specialized prompt for analyzing an uploaded research paper
     and comparing it to the dataset.
     """
-    metadata = dataset_data.get("metadata", {})
-    aggregate = dataset_data.get("aggregate_metrics", {})
-    fields = dataset_data.get("field_analyses", {})
-
-    # Build a concise summary of all fields
-    field_summaries = []
-    for field_name, field_data in fields.items():
-        ml_impact = field_data.get("ml_impact", {})
-        total_papers = ml_impact.get('total_papers', 0)
-        ml_rate = ml_impact.get('ml_adoption_rate', 0)
-        ml_papers = int(total_papers * ml_rate / 100)
-
-        field_summaries.append(
-            f"  • {field_name}: {ml_rate}% ML adoption ({ml_papers}/{total_papers} papers)"
-        )
-
     # Truncate paper text to avoid token limits (use first ~8000 chars)
     truncated_text = paper_text[:8000]
     if len(paper_text) > 8000:
@@ -320,9 +432,9 @@ A user has uploaded their research paper. Your job is to:
 4. Provide insights about how this paper's ML usage compares to peers
 
 DATASET CONTEXT (All Fields ML Adoption Rates):
-{chr(10).join(field_summaries)}
+{context.field_summaries}
 
-Overall ML Adoption Across All Fields: {aggregate.get('aggregate_ml_adoption_rate', 'N/A')}%
+Overall ML Adoption Across All Fields: {context.aggregate_ml_adoption_rate}%
 
 PAPER CONTENT:
 Title: {paper_metadata.get('title', 'Not detected')}
@@ -383,6 +495,7 @@ async def upload_paper(file: UploadFile = File(...)):
     """
     Upload a research paper PDF and get an automatic ML impact analysis.
     """
+    refresh_dataset()
     if dataset is None:
         raise HTTPException(status_code=500, detail="Dataset not loaded")
 
@@ -390,30 +503,42 @@ async def upload_paper(file: UploadFile = File(...)):
     if not file.filename.endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
 
+    # UploadLimitMiddleware has already capped the size of the upload Starlette spooled
     try:
-        # Read the PDF file
-        pdf_content = await file.read()
-
-        # Extract text from PDF
-        paper_text = extract_text_from_pdf(pdf_content)
+        pdf_digest = await upload_sha256(file)
+
+        # The analysis also depends on the dataset the paper is compared against
+        analysis_key = f"analysis-{pdf_digest}-{dataset_version[:16]}"
+        cached_analysis = await upload_cache.aget(analysis_key)
+        if cached_analysis is not None:
+            return ChatResponse(response=cached_analysis["response"], cached=True)
+
+        extracted = await upload_cache.aget(f"text-{pdf_digest}")
+        if extracted is not None:
+            paper_text = extracted["text"]
+            paper_metadata = extracted["metadata"]
+        else:
+            # Extract text from PDF
+            paper_text = await extract_text_from_pdf(upload_source(file))
 
-        if not paper_text or len(paper_text) < 100:
-            raise HTTPException(
-                status_code=400,
-                detail="Could not extract sufficient text from PDF. The file may be image-based or corrupted."
-            )
+            if not paper_text or len(paper_text) < 100:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Could not extract sufficient text from PDF. The file may be image-based or corrupted."
+                )
 
-        # Extract basic metadata
-        paper_metadata = extract_paper_metadata(paper_text)
+            # Extract basic metadata
+            paper_metadata = extract_paper_metadata(paper_text)
+            await upload_cache.aset(f"text-{pdf_digest}", {"text": paper_text, "metadata": paper_metadata})
 
         # Construct analysis prompt
-        prompt = construct_paper_analysis_prompt(paper_text, paper_metadata, dataset)
+        prompt = construct_paper_analysis_prompt(paper_text, paper_metadata, prompt_context)
 
         # Call Ollama API
-        ollama_response = requests.post(
-            "http://127.0.0.1:11434/api/generate",
+        ollama_response = await ollama_client.post(
+            "/api/generate",
             json={
-                "model": "llama3.1:8b",
+                "model": OLLAMA_MODEL,
                 "prompt": prompt,
                 "stream": False,
             },
@@ -429,18 +554,20 @@ async def upload_paper(file: UploadFile = File(...)):
         # Extract response from Ollama
         ollama_data = ollama_response.json()
         response_text = ollama_data.get("response", "")
+        if response_text:
+            await upload_cache.aset(analysis_key, {"response": response_text})
 
         return ChatResponse(response=response_text)
 
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         raise HTTPException(
             status_code=504,
             detail="Analysis timed out. The paper might be too long."
         )
-    except requests.exceptions.ConnectionError:
+    except httpx.TransportError:
         raise HTTPException(
             status_code=503,
-            detail="Cannot connect to Ollama server. Make sure it's running at http://127.0.0.1:11434"
+            detail=f"Cannot connect to Ollama server. Make sure it's running at {OLLAMA_BASE_URL}"
         )
     except HTTPException:
         raise
@@ -557,6 +684,38 @@ def analyze_paper_against_trends(paper: dict, field: Optional[str]) -> dict:
     }
 
 
+def normalize_openalex_params(params: dict) -> dict:
+    """Canonical form of OpenAlex query parameters, used as the cache key."""
+    normalized = {}
+    for name, value in params.items():
+        if name == "search":
+            # OpenAlex search is case-insensitive
+            value = " ".join(str(value).lower().split())
+        normalized[name] = str(value)
+    return dict(sorted(normalized.items()))
+
+
+async def fetch_openalex_works(params: dict) -> dict:
+    """
+    GET /works from OpenAlex through the shared cache.
+
+    Identical concurrent requests share one upstream call. Callers must not
+    modify the returned data.
+    """
+    params = normalize_openalex_params(params)
+
+    async def load() -> dict:
+        response = await openalex_client.get("/works", params=params, timeout=30)
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"OpenAlex API error: {response.text}"
+            )
+        return response.json()
+
+    return await openalex_cache.get_or_load(("/works", tuple(params.items())), load)
+
+
 @app.get("/api/search")
 async def search_papers(
     q: str = Query(..., description="Search query"),
@@ -564,11 +723,17 @@ async def search_papers(
     year: Optional[str] = Query(None, description="Filter by year (e.g., '2023' or '2020-2023')"),
     fields: Optional[str] = Query(None, description="Filter by fields of study (comma-separated)"),
     min_citations: Optional[int] = Query(None, ge=0),
-    open_access: Optional[bool] = Query(None)
+    open_access: Optional[bool] = Query(None),
+    select: Optional[str] = Query(None, description="Result fields to return (comma-separated, default all)")
 ):
     """
     Search for papers using OpenAlex API (free, no key required) and analyze against our dataset trends.
     """
+    try:
+        selected_fields = parse_select(select, SEARCH_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     try:
         # Build OpenAlex API query - completely free!
         filter_parts = []
@@ -597,102 +762,17 @@ async def search_papers(
             params["filter"] = ",".join(filter_parts)
 
         # Call OpenAlex API - free and open!
-        response = requests.get(
-            "https://api.openalex.org/works",
-            params=params,
-            timeout=30
-        )
-
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"OpenAlex API error: {response.text}"
-            )
-
-        data = response.json()
+        data = await fetch_openalex_works(params)
         papers = data.get("results", [])
 
-        # Analyze each paper against our trends
-        results = []
-        for paper in papers:
-            if not paper:
-                continue
-
-            # Extract paper details from OpenAlex format
-            title = paper.get("title", "")
-            paper_id = paper.get("id", "").split("/")[-1] if paper.get("id") else ""
-
-            # Get publication year
-            pub_year = paper.get("publication_year")
-
-            # Get abstract (OpenAlex uses inverted_abstract)
-            abstract = ""
-            inverted_abstract = paper.get("abstract_inverted_index", {})
-            if inverted_abstract:
-                # Reconstruct abstract from inverted index
-                word_positions = []
-                for word, positions in inverted_abstract.items():
-                    for pos in positions:
-                        word_positions.append((pos, word))
-                word_positions.sort()
-                abstract = " ".join([word for _, word in word_positions])
-
-            # Get authors
-            authorships = paper.get("authorships", [])
-            authors = [a.get("author", {}).get("display_name", "Unknown") for a in authorships]
-
-            # Get citations
-            citation_count = paper.get("cited_by_count", 0)
-
-            # Get concepts (fields of study)
-            concepts = paper.get("concepts", [])
-            paper_fields = [c.get("display_name", "") for c in concepts if c.get("level") <= 1]
-
-            # Map fields to our dataset
-            mapped_field = map_field_to_dataset(paper_fields)
-
-            # Analyze against trends
-            trend_analysis = analyze_paper_against_trends({
-                "title": title,
-                "abstract": abstract,
-                "citationCount": citation_count,
-                "year": pub_year
-            }, mapped_field)
-
-            # Get venue/journal
-            venue = ""
-            primary_location = paper.get("primary_location", {})
-            if primary_location:
-                source = primary_location.get("source", {})
-                venue = source.get("display_name", "") if source else ""
-
-            # Get URL
-            paper_url = paper.get("doi", "")
-            if paper_url and not paper_url.startswith("http"):
-                paper_url = f"https://doi.org/{paper_url}"
-            if not paper_url:
-                paper_url = paper.get("id", "")
-
-            # Check if open access
-            is_oa = paper.get("open_access", {}).get("is_oa", False)
-            oa_url = paper.get("open_access", {}).get("oa_url")
-
-            results.append({
-                "id": paper_id,
-                "title": title,
-                "authors": authors[:10],  # Limit to first 10 authors
-                "year": pub_year,
-                "abstract": abstract[:500] if abstract else "",  # Limit abstract length
-                "citations": citation_count,
-                "influentialCitations": citation_count,  # OpenAlex doesn't have this metric
-                "url": paper_url,
-                "venue": venue,
-                "publicationDate": str(pub_year) if pub_year else "",
-                "fieldsOfStudy": paper_fields,
-                "isOpenAccess": is_oa,
-                "openAccessPdf": {"url": oa_url} if oa_url else None,
-                "trendAnalysis": trend_analysis
-            })
+        # Normalize each paper and analyze it against our trends
+        normalizer = WorkNormalizer(
+            SEARCH_FIELDS,
+            map_field=map_field_to_dataset,
+            analyze_trends=analyze_paper_against_trends,
+            select=selected_fields,
+        )
+        results = list(normalizer.iter_results(papers))
 
         return {
             "total": data.get("meta", {}).get("count", 0),
@@ -700,9 +780,9 @@ async def search_papers(
             "query": q
         }
 
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         raise HTTPException(status_code=504, detail="Search request timed out")
-    except requests.exceptions.ConnectionError:
+    except httpx.TransportError:
         raise HTTPException(
             status_code=503,
             detail="Cannot connect to OpenAlex API. Please check your internet connection."
@@ -717,11 +797,17 @@ async def search_papers(
 async def get_trending_papers(
     field: Optional[str] = Query(None, description="Filter by field"),
     days: int = Query(30, ge=1, le=365, description="Papers from last N days"),
-    limit: int = Query(20, ge=1, le=100)
+    limit: int = Query(20, ge=1, le=100),
+    select: Optional[str] = Query(None, description="Result fields to return (comma-separated, default all)")
 ):
     """
     Get trending/recent papers with high citation velocity using OpenAlex (free API).
     """
+    try:
+        selected_fields = parse_select(select, TRENDING_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     try:
         # Calculate date range
         end_date = datetime.now()
@@ -744,112 +830,23 @@ async def get_trending_papers(
             "mailto": "research@example.com"
         }
 
-        response = requests.get(
-            "https://api.openalex.org/works",
-            params=params,
-            timeout=30
-        )
-
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"OpenAlex API error: {response.text}"
-            )
-
-        data = response.json()
+        data = await fetch_openalex_works(params)
         papers = data.get("results", [])
 
         # Analyze and format results
-        results = []
-        for paper in papers:
-            if not paper:
-                continue
-
-            # Extract paper details from OpenAlex format
-            title = paper.get("title", "")
-            paper_id = paper.get("id", "").split("/")[-1] if paper.get("id") else ""
-            pub_year = paper.get("publication_year")
-
-            # Get abstract
-            abstract = ""
-            inverted_abstract = paper.get("abstract_inverted_index", {})
-            if inverted_abstract:
-                word_positions = []
-                for word, positions in inverted_abstract.items():
-                    for pos in positions:
-                        word_positions.append((pos, word))
-                word_positions.sort()
-                abstract = " ".join([word for _, word in word_positions])
-
-            # Get authors
-            authorships = paper.get("authorships", [])
-            authors = [a.get("author", {}).get("display_name", "Unknown") for a in authorships]
-
-            # Get citations
-            citation_count = paper.get("cited_by_count", 0)
-
-            # Get concepts (fields of study)
-            concepts = paper.get("concepts", [])
-            paper_fields = [c.get("display_name", "") for c in concepts if c.get("level") <= 1]
-            mapped_field = map_field_to_dataset(paper_fields)
-
-            # Analyze against trends
-            trend_analysis = analyze_paper_against_trends({
-                "title": title,
-                "abstract": abstract,
-                "citationCount": citation_count,
-                "year": pub_year
-            }, mapped_field)
-
-            # Calculate citation velocity (citations per month since publication)
-            citation_velocity = 0
-            pub_date = paper.get("publication_date")
-            if pub_date:
-                try:
-                    pub_datetime = datetime.strptime(pub_date, "%Y-%m-%d")
-                    months_old = max(1, (datetime.now() - pub_datetime).days / 30)
-                    citation_velocity = citation_count / months_old
-                except:
-                    pass
-
-            # Get venue
-            venue = ""
-            primary_location = paper.get("primary_location", {})
-            if primary_location:
-                source = primary_location.get("source", {})
-                venue = source.get("display_name", "") if source else ""
-
-            # Get URL
-            paper_url = paper.get("doi", "")
-            if paper_url and not paper_url.startswith("http"):
-                paper_url = f"https://doi.org/{paper_url}"
-            if not paper_url:
-                paper_url = paper.get("id", "")
-
-            # Check if open access
-            is_oa = paper.get("open_access", {}).get("is_oa", False)
-            oa_url = paper.get("open_access", {}).get("oa_url")
-
-            results.append({
-                "id": paper_id,
-                "title": title,
-                "authors": authors[:10],
-                "year": pub_year,
-                "abstract": abstract[:500] if abstract else "",
-                "citations": citation_count,
-                "influentialCitations": citation_count,
-                "citationVelocity": round(citation_velocity, 2),
-                "url": paper_url,
-                "venue": venue,
-                "publicationDate": pub_date or (str(pub_year) if pub_year else ""),
-                "fieldsOfStudy": paper_fields,
-                "isOpenAccess": is_oa,
-                "openAccessPdf": {"url": oa_url} if oa_url else None,
-                "trendAnalysis": trend_analysis
-            })
+        normalizer = WorkNormalizer(
+            TRENDING_FIELDS,
+            map_field=map_field_to_dataset,
+            analyze_trends=analyze_paper_against_trends,
+            select=selected_fields,
+            exact_dates=True,
+            now=end_date,
+        )
 
         # Sort by citation velocity
-        results.sort(key=lambda x: x["citationVelocity"], reverse=True)
+        works = [normalizer.wrap(paper) for paper in papers if paper]
+        works.sort(key=lambda work: work.citation_velocity, reverse=True)
+        results = [normalizer.normalize(work) for work in works]
 
         return {
             "papers": results,
@@ -857,9 +854,9 @@ async def get_trending_papers(
             "field": field
         }
 
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         raise HTTPException(status_code=504, detail="Trending papers request timed out")
-    except requests.exceptions.ConnectionError:
+    except httpx.TransportError:
         raise HTTPException(
             status_code=503,
             detail="Cannot connect to OpenAlex API. Please check your internet connection."
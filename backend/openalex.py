@@ -0,0 +1,219 @@
+"""
+Helpers for turning OpenAlex work records into API results.
+"""
+
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+ABSTRACT_PREVIEW_CHARS = 500  # Abstract length returned with each result
+AUTHOR_LIMIT = 10  # Authors returned with each result
+
+
+def _reconstruct_sorted(inverted_index: Dict[str, List[int]]) -> str:
+    word_positions = [(pos, word) for word, positions in inverted_index.items() for pos in positions]
+    word_positions.sort()
+    return " ".join(word for _, word in word_positions)
+
+
+def reconstruct_abstract(inverted_index: Optional[Dict[str, List[int]]]) -> str:
+    """
+    Rebuild an abstract from an OpenAlex abstract_inverted_index.
+
+    Positions normally run 0..n-1 with one word each, so words are placed
+    directly into a preallocated list, with no sort. Indexes with gaps or
+    shared positions fall back to sorting.
+    """
+    if not inverted_index:
+        return ""
+
+    slots: List[Optional[str]] = [None] * sum(map(len, inverted_index.values()))
+    try:
+        for word, positions in inverted_index.items():
+            for pos in positions:
+                slots[pos] = word
+    except IndexError:
+        return _reconstruct_sorted(inverted_index)
+    if None in slots:
+        return _reconstruct_sorted(inverted_index)
+    return " ".join(slots)
+
+
+class _Work:
+    """One OpenAlex work; values used by several result fields are computed once, on first use."""
+
+    __slots__ = ("raw", "now", "title", "year", "citation_count", "_abstract", "_paper_fields", "_citation_velocity")
+
+    def __init__(self, raw: dict, now: datetime):
+        self.raw = raw
+        self.now = now
+        self.title = raw.get("title", "")
+        self.year = raw.get("publication_year")
+        self.citation_count = raw.get("cited_by_count", 0)
+        self._abstract: Optional[str] = None
+        self._paper_fields: Optional[List[str]] = None
+        self._citation_velocity: Optional[float] = None
+
+    @property
+    def abstract(self) -> str:
+        if self._abstract is None:
+            self._abstract = reconstruct_abstract(self.raw.get("abstract_inverted_index"))
+        return self._abstract
+
+    @property
+    def paper_fields(self) -> List[str]:
+        if self._paper_fields is None:
+            concepts = self.raw.get("concepts", [])
+            self._paper_fields = [c.get("display_name", "") for c in concepts if c.get("level") <= 1]
+        return self._paper_fields
+
+    @property
+    def citation_velocity(self) -> float:
+        """Citations per month since publication."""
+        if self._citation_velocity is None:
+            citation_velocity = 0
+            pub_date = self.raw.get("publication_date")
+            if pub_date:
+                try:
+                    pub_datetime = datetime.strptime(pub_date, "%Y-%m-%d")
+                    months_old = max(1, (self.now - pub_datetime).days / 30)
+                    citation_velocity = self.citation_count / months_old
+                except (TypeError, ValueError):
+                    pass
+            self._citation_velocity = round(citation_velocity, 2)
+        return self._citation_velocity
+
+
+def _paper_id(work: _Work) -> str:
+    return work.raw.get("id", "").split("/")[-1] if work.raw.get("id") else ""
+
+
+def _authors(work: _Work) -> List[str]:
+    # Only the first AUTHOR_LIMIT names are returned
+    authorships = work.raw.get("authorships", [])[:AUTHOR_LIMIT]
+    return [a.get("author", {}).get("display_name", "Unknown") for a in authorships]
+
+
+def _url(work: _Work) -> str:
+    paper_url = work.raw.get("doi", "")
+    if paper_url and not paper_url.startswith("http"):
+        paper_url = f"https://doi.org/{paper_url}"
+    if not paper_url:
+        paper_url = work.raw.get("id", "")
+    return paper_url
+
+
+def _venue(work: _Work) -> str:
+    venue = ""
+    primary_location = work.raw.get("primary_location", {})
+    if primary_location:
+        source = primary_location.get("source", {})
+        venue = source.get("display_name", "") if source else ""
+    return venue
+
+
+def _open_access_pdf(work: _Work) -> Optional[dict]:
+    oa_url = work.raw.get("open_access", {}).get("oa_url")
+    return {"url": oa_url} if oa_url else None
+
+
+_FIELD_BUILDERS: Dict[str, Callable[[_Work], Any]] = {
+    "id": _paper_id,
+    "title": lambda work: work.title,
+    "authors": _authors,
+    "year": lambda work: work.year,
+    "abstract": lambda work: work.abstract[:ABSTRACT_PREVIEW_CHARS] if work.abstract else "",
+    "citations": lambda work: work.citation_count,
+    "influentialCitations": lambda work: work.citation_count,  # OpenAlex doesn't have this metric
+    "citationVelocity": lambda work: work.citation_velocity,
+    "url": _url,
+    "venue": _venue,
+    "fieldsOfStudy": lambda work: work.paper_fields,
+    "isOpenAccess": lambda work: work.raw.get("open_access", {}).get("is_oa", False),
+    "openAccessPdf": _open_access_pdf,
+}
+
+# Result fields of /api/search and /api/trending, in response order
+SEARCH_FIELDS = (
+    "id", "title", "authors", "year", "abstract", "citations", "influentialCitations",
+    "url", "venue", "publicationDate", "fieldsOfStudy", "isOpenAccess", "openAccessPdf", "trendAnalysis",
+)
+TRENDING_FIELDS = (
+    "id", "title", "authors", "year", "abstract", "citations", "influentialCitations", "citationVelocity",
+    "url", "venue", "publicationDate", "fieldsOfStudy", "isOpenAccess", "openAccessPdf", "trendAnalysis",
+)
+
+
+def parse_select(select: Optional[str], fields: Sequence[str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated select parameter against the fields an endpoint returns.
+
+    Returns None (all fields) when select is empty. Raises ValueError naming
+    any unknown field.
+    """
+    if not select:
+        return None
+    names = [name.strip() for name in select.split(",") if name.strip()]
+    unknown = [name for name in names if name not in fields]
+    if unknown:
+        raise ValueError(f"Unknown select fields: {', '.join(unknown)}. Available: {', '.join(fields)}")
+    return names
+
+
+class WorkNormalizer:
+    """
+    Turn raw OpenAlex works into /api/search or /api/trending results.
+
+    Only the fields named in select are built, and the per-work values behind
+    them (abstract, concepts, citation velocity) are computed on first use, so
+    a narrow projection skips the abstract rebuild, author lists and trend
+    analysis entirely. map_field and analyze_trends are the backend's dataset
+    lookups. With exact_dates, publicationDate prefers the full publication
+    date over the year.
+    """
+
+    def __init__(
+        self,
+        fields: Sequence[str],
+        map_field: Callable[[List[str]], Optional[str]],
+        analyze_trends: Callable[[dict, Optional[str]], dict],
+        select: Optional[Iterable[str]] = None,
+        exact_dates: bool = False,
+        now: Optional[datetime] = None,
+    ):
+        selected = set(fields if select is None else select)
+        self.fields = [name for name in fields if name in selected]
+        self.map_field = map_field
+        self.analyze_trends = analyze_trends
+        self.exact_dates = exact_dates
+        self.now = now or datetime.now()
+
+        builders = dict(_FIELD_BUILDERS, publicationDate=self._publication_date, trendAnalysis=self._trend_analysis)
+        self._builders = [(name, builders[name]) for name in self.fields]
+
+    def _publication_date(self, work: _Work) -> str:
+        year_text = str(work.year) if work.year else ""
+        if self.exact_dates:
+            return work.raw.get("publication_date") or year_text
+        return year_text
+
+    def _trend_analysis(self, work: _Work) -> dict:
+        return self.analyze_trends({
+            "title": work.title,
+            "abstract": work.abstract,
+            "citationCount": work.citation_count,
+            "year": work.year,
+        }, self.map_field(work.paper_fields))
+
+    def wrap(self, raw: dict) -> _Work:
+        return _Work(raw, self.now)
+
+    def normalize(self, work: Union[dict, _Work]) -> dict:
+        if not isinstance(work, _Work):
+            work = self.wrap(work)
+        return {name: build(work) for name, build in self._builders}
+
+    def iter_results(self, works: Iterable[Optional[dict]]) -> Iterator[dict]:
+        """Normalize works one at a time, skipping empty entries."""
+        for raw in works:
+            if raw:
+                yield self.normalize(raw)
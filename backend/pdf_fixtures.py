@@ -0,0 +1,81 @@
+"""
+Generate small text PDFs for the tests and benchmarks.
+"""
+
+from typing import List
+
+LINES_PER_PAGE = 40
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def build_text_pdf(pages: List[str], padding_bytes: int = 0) -> bytes:
+    """
+    Build a PDF with one page per string, using the built-in Helvetica font.
+
+    padding_bytes adds an unreferenced stream of that size, for large files
+    that are still quick to parse.
+    """
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Page tree, filled in once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    if padding_bytes:
+        objects.append(b"<< /Length %d >>\nstream\n" % padding_bytes + b"0" * padding_bytes + b"\nendstream")
+
+    page_refs = []
+    for page_text in pages:
+        lines = page_text.split("\n")[:LINES_PER_PAGE]
+        commands = ["BT", "/F1 10 Tf", "14 TL", "50 780 Td"]
+        for line in lines:
+            commands.append(f"({_escape(line)}) Tj T*")
+        commands.append("ET")
+        stream = "\n".join(commands).encode("latin-1", errors="replace")
+
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        page_refs.append(len(objects))
+
+    kids = " ".join(f"{ref} 0 R" for ref in page_refs).encode()
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_refs))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+
+    xref_offset = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(out)
+
+
+def build_paper_pdf(num_pages: int, seed: int = 0, padding_bytes: int = 0) -> bytes:
+    """Build a paper-like PDF with a title, an abstract and num_pages of body text."""
+    pages = []
+    for page_number in range(num_pages):
+        lines = []
+        if page_number == 0:
+            lines += [
+                f"Deep Learning for Protein Structure Prediction {seed}",
+                "Abstract",
+                "We apply neural networks to predict protein structures in 2021.",
+                "Introduction",
+            ]
+        while len(lines) < LINES_PER_PAGE:
+            lines.append(
+                f"Page {page_number + 1} line {len(lines) + 1}: the model was trained "
+                f"with a transformer architecture and evaluated on benchmark {seed}."
+            )
+        pages.append("\n".join(lines))
+    return build_text_pdf(pages, padding_bytes=padding_bytes)
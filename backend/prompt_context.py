@@ -0,0 +1,110 @@
+"""
+Pre-rendered dataset context for the Ollama prompts.
+
+The dataset only changes when validation_metrics_summary.json is replaced, so the
+per-field text blocks are rendered once per dataset version and prompts are
+assembled by joining the cached pieces.
+"""
+
+import json
+from typing import Dict, List
+
+# Query keywords that signal a question about a specific field
+QUERY_FIELD_KEYWORDS = {
+    "biology": "Biology",
+    "computer science": "ComputerScience",
+    "cs": "ComputerScience",
+    "physics": "Physics",
+    "psychology": "Psychology",
+    "medicine": "Medicine",
+    "engineering": "Engineering",
+    "mathematics": "Mathematics",
+    "math": "Mathematics",
+    "economics": "Economics",
+    "business": "Business",
+    "environmental science": "EnvironmentalScience",
+    "materials science": "MaterialsScience",
+    "agricultural": "AgriculturalAndFoodSciences",
+    "agriculture": "AgriculturalAndFoodSciences",
+}
+
+
+class PromptContext:
+    """Text fragments rendered from one version of the dataset."""
+
+    def __init__(self, dataset_data: dict):
+        metadata = dataset_data.get("metadata", {})
+        aggregate = dataset_data.get("aggregate_metrics", {})
+        fields = dataset_data.get("field_analyses", {})
+
+        self.field_names: List[str] = list(fields.keys())
+        self.field_details: Dict[str, str] = {
+            field_name: self._render_field_detail(field_name, field_data)
+            for field_name, field_data in fields.items()
+        }
+        self.all_field_details = "\n".join(self.field_details.values())
+
+        quick_reference = []
+        field_summaries = []
+        for field_name, field_data in fields.items():
+            ml_impact = field_data.get("ml_impact", {})
+            reproducibility = field_data.get("reproducibility", {})
+            total_papers = ml_impact.get('total_papers', 0)
+            ml_rate = ml_impact.get('ml_adoption_rate', 0)
+            ml_papers = int(total_papers * ml_rate / 100)
+
+            quick_reference.append(
+                f"  • {field_name}: {total_papers} papers, {ml_papers} with ML ({ml_rate}%), "
+                f"{reproducibility.get('papers_with_code', 0)} with code"
+            )
+            field_summaries.append(
+                f"  • {field_name}: {ml_rate}% ML adoption ({ml_papers}/{total_papers} papers)"
+            )
+
+        self.overview = f"""DATASET OVERVIEW:
+• Total Papers: {metadata.get('total_papers', 'N/A')}
+• Fields Analyzed: {metadata.get('total_fields', 'N/A')}
+• Overall ML Adoption: {aggregate.get('aggregate_ml_adoption_rate', 'N/A')}%
+• Overall Code Availability: {aggregate.get('aggregate_code_availability_rate', 'N/A')}%"""
+        self.quick_reference = "\n".join(quick_reference)
+        self.field_summaries = "\n".join(field_summaries)
+        self.aggregate_ml_adoption_rate = aggregate.get('aggregate_ml_adoption_rate', 'N/A')
+
+    @staticmethod
+    def _render_field_detail(field_name: str, field_data: dict) -> str:
+        ml_impact = field_data.get("ml_impact", {})
+        reproducibility = field_data.get("reproducibility", {})
+        temporal = field_data.get("temporal", {})
+        methodology = field_data.get("methodology", {})
+
+        total_papers = ml_impact.get('total_papers', 0)
+        ml_rate = ml_impact.get('ml_adoption_rate', 0)
+        ml_papers = int(total_papers * ml_rate / 100)
+
+        return f"""
+{field_name}:
+  Total Papers: {total_papers}
+  ML/AI Papers: {ml_papers} papers ({ml_rate}% adoption rate)
+  ML Distribution:
+{json.dumps(ml_impact.get('ml_distribution', {}), indent=4)}
+
+  Code Availability: {reproducibility.get('code_availability_rate', 0)}%
+  Papers with Code: {reproducibility.get('papers_with_code', 0)}
+
+  Statistical Methods Usage: {methodology.get('statistical_methods_usage_rate', 0)}%
+  Year Range: {temporal.get('year_range', 'N/A')}"""
+
+    def detect_fields(self, user_query: str) -> List[str]:
+        """Return the dataset fields a query mentions, in keyword order."""
+        query_lower = user_query.lower()
+        return [
+            field_name
+            for keyword, field_name in QUERY_FIELD_KEYWORDS.items()
+            if keyword in query_lower and field_name in self.field_details
+        ]
+
+    def details_for(self, field_names: List[str]) -> str:
+        """Detailed blocks for the given fields, or for all fields if none given."""
+        if not field_names:
+            return self.all_field_details
+        return "\n".join(self.field_details[name] for name in field_names)
@@ -0,0 +1,330 @@
+"""
+Local stand-ins for the upstream APIs, used by the tests and benchmarks.
+
+Each stub runs a threaded HTTP server on a free localhost port in a background
+thread and counts the requests it receives. AppServer runs the backend itself
+under uvicorn the same way, for tests that need real streaming sockets.
+"""
+
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional, Union
+from urllib.parse import parse_qsl, urlsplit
+
+import uvicorn
+
+
+class _StubServer:
+    """Base class: a ThreadingHTTPServer bound to 127.0.0.1 on a free port."""
+
+    def __init__(self):
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _count_request(self):
+        with self._lock:
+            self.request_count += 1
+
+    def _make_handler(self):
+        raise NotImplementedError
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class FakeOllamaServer(_StubServer):
+    """
+    Minimal Ollama API: /api/tags and /api/generate, streaming or not.
+
+    `response` is either a fixed string or a callable that receives the parsed
+    request body and returns the generated text. Every generation waits `delay`
+    seconds before the first token, which stands in for prompt evaluation, then
+    spends `token_delay` seconds per additional word. Streamed generations emit
+    each word as it is produced.
+
+    Non-streamed answers carry Ollama's token counts and durations, with words
+    standing in for tokens. Like a server with a single slot, the stub keeps
+    the previous prompt: leading words shared with it count as cached and are
+    left out of prompt_eval_count.
+
+    With `malformed_after`, a stream sends that many words and then a
+    truncated JSON line, and ends.
+
+    `max_in_flight` is the most generations the stub has served at once.
+    """
+
+    def __init__(
+        self,
+        delay: float = 0.0,
+        response: Union[str, Callable[[dict], str]] = "stub response",
+        model: str = "llama3.1:8b",
+        token_delay: float = 0.0,
+        malformed_after: Optional[int] = None,
+    ):
+        super().__init__()
+        self.delay = delay
+        self.response = response
+        self.model = model
+        self.token_delay = token_delay
+        self.malformed_after = malformed_after
+        self.completed_streams = 0
+        self.cancelled_streams = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._cached_prompt: List[str] = []
+
+    def _generate(self, body: dict) -> str:
+        if callable(self.response):
+            return self.response(body)
+        return self.response
+
+    def _prompt_eval_count(self, body: dict) -> int:
+        words = (body.get("system", "") + "\n" + body.get("prompt", "")).split()
+        with self._lock:
+            cached = 0
+            for previous, word in zip(self._cached_prompt, words):
+                if previous != word:
+                    break
+                cached += 1
+            self._cached_prompt = words
+        return len(words) - cached
+
+    def _enter(self):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    @staticmethod
+    def _tokenize(text: str) -> List[str]:
+        words = text.split(" ")
+        return [word + " " for word in words[:-1]] + [words[-1]]
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, payload: dict, status: int = 200):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._send_json({"models": [{"name": stub.model}]})
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+
+            def do_POST(self):
+                if self.path != "/api/generate":
+                    self._send_json({"error": "not found"}, status=404)
+                    return
+
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                stub._count_request()
+                stub._enter()
+                try:
+                    self._answer(body)
+                finally:
+                    stub._leave()
+
+            def _answer(self, body: dict):
+                time.sleep(stub.delay)
+                if body.get("stream", True):
+                    self._stream(body)
+                    return
+
+                text = stub._generate(body)
+                tokens = len(stub._tokenize(text))
+                time.sleep(stub.token_delay * (tokens - 1))
+                self._send_json({
+                    "model": body.get("model", stub.model),
+                    "response": text,
+                    "done": True,
+                    "prompt_eval_count": stub._prompt_eval_count(body),
+                    "prompt_eval_duration": int(stub.delay * 1e9),
+                    "eval_count": tokens,
+                    "eval_duration": int(stub.token_delay * (tokens - 1) * 1e9),
+                })
+
+            def _stream(self, body: dict):
+                model = body.get("model", stub.model)
+                self.close_connection = True
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+
+                try:
+                    for i, token in enumerate(stub._tokenize(stub._generate(body))):
+                        if i == stub.malformed_after:
+                            self.wfile.write(b'{"model": "' + model.encode("utf-8") + b'", "respo\n')
+                            self.wfile.flush()
+                            return
+                        if i:
+                            time.sleep(stub.token_delay)
+                        line = json.dumps({"model": model, "response": token, "done": False})
+                        self.wfile.write(line.encode("utf-8") + b"\n")
+                        self.wfile.flush()
+                    line = json.dumps({"model": model, "response": "", "done": True})
+                    self.wfile.write(line.encode("utf-8") + b"\n")
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    with stub._lock:
+                        stub.cancelled_streams += 1
+                    return
+
+                with stub._lock:
+                    stub.completed_streams += 1
+
+        return Handler
+
+
+def build_openalex_work(index: int, abstract_words: int = 120) -> dict:
+    """A synthetic OpenAlex work with the fields the backend reads."""
+    words = [f"word{i % 37}" for i in range(abstract_words)]
+    inverted_index = {}
+    for position, word in enumerate(words):
+        inverted_index.setdefault(word, []).append(position)
+    return {
+        "id": f"https://openalex.org/W{1000 + index}",
+        "title": f"Machine learning for protein folding, part {index}",
+        "publication_year": 2024,
+        "publication_date": "2024-01-15",
+        "abstract_inverted_index": inverted_index,
+        "authorships": [{"author": {"display_name": f"Author {index}-{a}"}} for a in range(3)],
+        "cited_by_count": 50 + index,
+        "concepts": [
+            {"display_name": "Biology", "level": 0},
+            {"display_name": "Machine learning", "level": 1},
+            {"display_name": "Protein folding", "level": 2},
+        ],
+        "primary_location": {"source": {"display_name": "Journal of Examples"}},
+        "doi": f"https://doi.org/10.1234/example.{index}",
+        "open_access": {"is_oa": index % 2 == 0, "oa_url": None},
+    }
+
+
+class FakeOpenAlexServer(_StubServer):
+    """
+    Minimal OpenAlex API: GET /works answers per-page synthetic works after
+    `delay` seconds. The query parameters of each request are kept in
+    `requests`.
+    """
+
+    def __init__(self, delay: float = 0.0, total: int = 1000):
+        super().__init__()
+        self.delay = delay
+        self.total = total
+        self.requests: List[dict] = []
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                if url.path != "/works":
+                    self.send_error(404)
+                    return
+
+                params = dict(parse_qsl(url.query))
+                stub._count_request()
+                with stub._lock:
+                    stub.requests.append(params)
+
+                time.sleep(stub.delay)
+                per_page = int(params.get("per-page", 25))
+                payload = {
+                    "meta": {"count": stub.total},
+                    "results": [build_openalex_work(i) for i in range(per_page)],
+                }
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+class AppServer:
+    """Serve an ASGI app with uvicorn on a free localhost port in a background thread."""
+
+    def __init__(self, app):
+        self.app = app
+        self.port: Optional[int] = None
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, timeout: float = 10.0):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+
+        config = uvicorn.Config(self.app, host="127.0.0.1", port=self.port, log_level="warning")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("App server did not start in time")
+            time.sleep(0.01)
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,68 @@
+"""
+Load test: concurrent /api/chat requests against a local Ollama stub.
+
+Each stubbed generation takes OLLAMA_DELAY seconds. If the handlers blocked the
+event loop, N chats would take about N * OLLAMA_DELAY; with the shared async
+client they overlap and finish in roughly one delay.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import main
+from stub_servers import FakeOllamaServer
+
+CONCURRENT_CHATS = 4
+OLLAMA_DELAY = 0.5
+
+
+async def _run_concurrent_chats():
+    await main.load_dataset()
+    await main.start_http_clients()
+    try:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver", timeout=30) as client:
+            chats = [
+                client.post("/api/chat", json={"message": f"ML adoption in Biology? ({i})"})
+                for i in range(CONCURRENT_CHATS)
+            ]
+
+            start = time.perf_counter()
+            chat_task = asyncio.gather(*chats)
+
+            # The health check must answer while every generation is still pending
+            await asyncio.sleep(OLLAMA_DELAY / 5)
+            health = await client.get("/api/health")
+            health_elapsed = time.perf_counter() - start
+
+            responses = await chat_task
+            total_elapsed = time.perf_counter() - start
+    finally:
+        await main.close_http_clients()
+
+    return responses, health, health_elapsed, total_elapsed
+
+
+def test_concurrent_chats_overlap(monkeypatch):
+    """N concurrent chats complete in about one upstream delay, not N delays."""
+    with FakeOllamaServer(delay=OLLAMA_DELAY, response="Biology has 12% ML adoption.") as stub:
+        monkeypatch.setattr(main.ollama_client, "base_url", stub.base_url)
+        responses, health, health_elapsed, total_elapsed = asyncio.run(_run_concurrent_chats())
+
+    assert all(r.status_code == 200 for r in responses)
+    assert all(r.json()["response"] == "Biology has 12% ML adoption." for r in responses)
+    assert stub.request_count == CONCURRENT_CHATS
+
+    serial_time = CONCURRENT_CHATS * OLLAMA_DELAY
+    print(f"\n  {CONCURRENT_CHATS} chats in {total_elapsed:.2f}s (serial would be {serial_time:.2f}s)")
+    assert total_elapsed < serial_time / 2
+
+    assert health.status_code == 200
+    assert health.json()["ollama_reachable"] is True
+    assert health_elapsed < OLLAMA_DELAY
@@ -0,0 +1,85 @@
+"""
+Tests for the OpenAlex result helpers.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import main
+import openalex
+from openalex import reconstruct_abstract
+from stub_servers import FakeOpenAlexServer
+
+
+def _reconstruct_sorted(inverted_index):
+    word_positions = sorted((pos, word) for word, positions in inverted_index.items() for pos in positions)
+    return " ".join(word for _, word in word_positions)
+
+
+def test_reconstruct_abstract_matches_sorting():
+    cases = [
+        {"Deep": [0], "learning": [1, 4], "for": [2], "proteins": [3]},
+        # Gap at position 2, and a position past the number of words
+        {"a": [0], "b": [1], "c": [3], "d": [9]},
+        # Two words at one position
+        {"x": [0, 1], "y": [1], "z": [2]},
+    ]
+    for index in cases:
+        assert reconstruct_abstract(index) == _reconstruct_sorted(index)
+
+    assert reconstruct_abstract(cases[0]) == "Deep learning for proteins learning"
+    assert reconstruct_abstract(None) == ""
+    assert reconstruct_abstract({}) == ""
+
+
+async def _get(urls):
+    main.openalex_cache.clear()
+    await main.start_http_clients()
+    try:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            return [await client.get(url) for url in urls]
+    finally:
+        await main.close_http_clients()
+
+
+def test_select_builds_only_requested_fields(monkeypatch):
+    main.load_dataset_file()
+    calls = {"abstract": 0, "trends": 0}
+
+    def counting(name, func):
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            return func(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(openalex, "reconstruct_abstract", counting("abstract", openalex.reconstruct_abstract))
+    monkeypatch.setattr(main, "analyze_paper_against_trends", counting("trends", main.analyze_paper_against_trends))
+
+    urls = [
+        "/api/trending?limit=30&select=id,citationVelocity,title",
+        "/api/search?q=proteins&limit=5",
+        "/api/search?q=proteins&select=id,bogus",
+    ]
+    with FakeOpenAlexServer() as stub:
+        monkeypatch.setattr(main.openalex_client, "base_url", stub.base_url)
+        narrow, full, bad = asyncio.run(_get(urls))
+
+    papers = narrow.json()["papers"]
+    assert len(papers) == 30
+    # Response order, not select order
+    assert list(papers[0]) == ["id", "title", "citationVelocity"]
+    velocities = [paper["citationVelocity"] for paper in papers]
+    assert velocities == sorted(velocities, reverse=True)
+
+    # Only the unprojected search rebuilt abstracts and ran trend analysis
+    assert calls == {"abstract": 5, "trends": 5}
+    assert list(full.json()["papers"][0]) == list(openalex.SEARCH_FIELDS)
+
+    assert bad.status_code == 400
+    assert "bogus" in bad.json()["detail"]
@@ -0,0 +1,76 @@
+"""
+Tests for the OpenAlex result cache behind /api/search and /api/trending.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import main
+from cache import CoalescingCache
+from stub_servers import FakeOpenAlexServer
+
+
+async def _get_all(batches):
+    """Issue each batch of GET requests concurrently, one batch after another."""
+    await main.start_http_clients()
+    try:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver", timeout=30) as client:
+            results = []
+            for batch in batches:
+                if isinstance(batch, (int, float)):
+                    await asyncio.sleep(batch)
+                    continue
+                start = time.perf_counter()
+                responses = await asyncio.gather(*(client.get(url) for url in batch))
+                results.append((responses, time.perf_counter() - start))
+    finally:
+        await main.close_http_clients()
+    return results
+
+
+def test_simultaneous_requests_share_one_upstream_call(monkeypatch):
+    monkeypatch.setattr(main, "openalex_cache", CoalescingCache(maxsize=16, ttl=60, stale_ttl=60))
+    main.load_dataset_file()
+
+    visitors = ["/api/trending?limit=20"] * 10
+    searches = ["/api/search?q=Protein%20Folding", "/api/search?q=protein++folding"]
+    with FakeOpenAlexServer(delay=0.3) as stub:
+        monkeypatch.setattr(main.openalex_client, "base_url", stub.base_url)
+        results = asyncio.run(_get_all([visitors, visitors, searches]))
+
+    (first, _), (second, second_time), (search, _) = results
+    assert all(r.status_code == 200 for r in first + second + search)
+    assert len({r.text for r in first + second}) == 1
+    assert len(first[0].json()["papers"]) == 20
+    # One call for all trending visitors, one for both spellings of the query
+    assert stub.request_count == 2
+    assert second_time < 0.3
+    assert main.openalex_cache.coalesced == 10
+    assert main.openalex_cache.hits == 10
+
+
+def test_stale_entry_is_served_while_revalidating(monkeypatch):
+    monkeypatch.setattr(main, "openalex_cache", CoalescingCache(maxsize=16, ttl=0.2, stale_ttl=60))
+    main.load_dataset_file()
+
+    url = ["/api/trending?field=physics"]
+    with FakeOpenAlexServer(delay=0.5) as stub:
+        monkeypatch.setattr(main.openalex_client, "base_url", stub.base_url)
+        # Request, let the entry go stale, request again, then let the refresh finish
+        results = asyncio.run(_get_all([url, 0.3, url, 0.8]))
+
+    (first, first_time), (stale, stale_time) = results
+    assert first[0].status_code == stale[0].status_code == 200
+    assert stale[0].json() == first[0].json()
+    assert first_time >= 0.5
+    assert stale_time < 0.25
+    # The stale hit triggered exactly one background refresh
+    assert stub.request_count == 2
+    assert main.openalex_cache.stale_hits == 1
@@ -0,0 +1,66 @@
+"""
+Tests for PdfExtractor's recovery from a worker process that dies.
+"""
+
+import asyncio
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from utils import text_extraction
+from utils.text_extraction import PdfExtractor, PdfWorkerCrashed
+from pdf_fixtures import build_text_pdf
+
+# A "PDF" that kills whichever worker parses it
+POISON = b"%PDF-poison"
+extract_first_pages = text_extraction._extract_first_pages
+extract_pdf_pages = text_extraction.extract_pdf_pages
+
+
+def first_pages_or_die(source, stop):
+    if source == POISON:
+        time.sleep(0.2)  # Let the other document get going first
+        os.kill(os.getpid(), signal.SIGKILL)
+    return extract_first_pages(source, stop)
+
+
+def slow_pages(source, start, stop):
+    time.sleep(0.1)
+    return extract_pdf_pages(source, start, stop)
+
+
+def test_dead_worker_fails_only_the_document_that_killed_it(monkeypatch):
+    # Workers are forked, so they see the patched functions
+    monkeypatch.setattr(text_extraction, "_extract_first_pages", first_pages_or_die)
+    monkeypatch.setattr(text_extraction, "extract_pdf_pages", slow_pages)
+    pages = [f"Page {i} of the paper" for i in range(6)]
+    pdf = build_text_pdf(pages)
+
+    async def extract_all():
+        extractor = PdfExtractor(max_workers=2, pages_per_task=1, timeout=30)
+        try:
+            first_pool = extractor._get_pool()
+            results = await asyncio.gather(
+                extractor.extract_pages(pdf), extractor.extract_pages(POISON), return_exceptions=True
+            )
+            # The broken pool was replaced, and the next document uses the new one
+            after = await extractor.extract_pages(pdf)
+            return results, after, first_pool, extractor._pool
+        finally:
+            extractor.shutdown()
+
+    (good, poisoned), after, first_pool, pool = asyncio.run(extract_all())
+
+    assert [page.strip() for page in good] == pages
+    assert isinstance(poisoned, PdfWorkerCrashed)
+    assert [page.strip() for page in after] == pages
+    assert pool is not None and pool is not first_pool
+    with pytest.raises(RuntimeError):
+        first_pool.submit(len, "")
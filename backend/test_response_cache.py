@@ -0,0 +1,60 @@
+"""
+Tests for the /api/chat response cache.
+"""
+
+import asyncio
+import shutil
+import sys
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import main
+from stub_servers import FakeOllamaServer
+
+
+async def _ask(questions):
+    await main.start_http_clients()
+    try:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            answers = [(await client.post("/api/chat", json={"message": q})).json() for q in questions]
+            health = (await client.get("/api/health")).json()
+    finally:
+        await main.close_http_clients()
+    return answers, health
+
+
+def test_repeated_question_is_served_from_cache(tmp_path, monkeypatch):
+    """Rephrasings that normalize to the same key reuse one generation."""
+    dataset_copy = tmp_path / "validation_metrics_summary.json"
+    shutil.copy(main.DATASET_PATH, dataset_copy)
+    monkeypatch.setattr(main, "DATASET_PATH", dataset_copy)
+    main.load_dataset_file()
+    main.chat_cache.clear()
+    main.chat_cache.hits = main.chat_cache.misses = 0
+
+    questions = [
+        "What is ML adoption in Biology?",
+        "what is ML adoption in biology",
+        "What is ML adoption in Physics?",
+    ]
+    with FakeOllamaServer(response="answer") as stub:
+        monkeypatch.setattr(main.ollama_client, "base_url", stub.base_url)
+        answers, health = asyncio.run(_ask(questions))
+
+    assert [a["cached"] for a in answers] == [False, True, False]
+    assert stub.request_count == 2
+    assert health["chat_cache"]["hits"] == 1
+    assert health["chat_cache"]["misses"] == 2
+
+    # Replacing the dataset file invalidates every cached answer
+    dataset_copy.write_text(dataset_copy.read_text() + "\n")
+    with FakeOllamaServer(response="answer") as stub:
+        monkeypatch.setattr(main.ollama_client, "base_url", stub.base_url)
+        answers, health = asyncio.run(_ask(questions[:1]))
+
+    assert answers[0]["cached"] is False
+    assert stub.request_count == 1
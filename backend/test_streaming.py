@@ -0,0 +1,79 @@
+"""
+Tests for the /api/chat/stream endpoint against a streaming Ollama stub.
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import main
+from stub_servers import AppServer, FakeOllamaServer
+
+ANSWER = " ".join(f"word{i}" for i in range(40))
+
+
+def test_stream_forwards_tokens_before_generation_finishes(monkeypatch):
+    """The first token arrives long before the full answer is generated."""
+    main.chat_cache.clear()
+    with FakeOllamaServer(delay=0.1, token_delay=0.02, response=ANSWER) as stub:
+        monkeypatch.setattr(main.ollama_client, "base_url", stub.base_url)
+        with AppServer(main.app) as server:
+            start = time.perf_counter()
+            first_token_at = None
+            tokens = []
+            with httpx.stream("POST", f"{server.base_url}/api/chat/stream",
+                              json={"message": "ML adoption in Biology?"}, timeout=30) as response:
+                assert response.status_code == 200
+                events = []
+                for line in response.iter_lines():
+                    event = json.loads(line)
+                    events.append(event)
+                    if "token" in event:
+                        first_token_at = first_token_at or time.perf_counter() - start
+                        tokens.append(event["token"])
+            total = time.perf_counter() - start
+
+    assert "".join(tokens) == ANSWER
+    assert events[-1] == {"done": True}
+    assert first_token_at < total / 2
+
+
+def test_client_disconnect_cancels_upstream_generation(monkeypatch):
+    """Closing the client connection closes the upstream Ollama stream."""
+    main.chat_cache.clear()
+    with FakeOllamaServer(token_delay=0.05, response=ANSWER) as stub:
+        monkeypatch.setattr(main.ollama_client, "base_url", stub.base_url)
+        with AppServer(main.app) as server:
+            with httpx.stream("POST", f"{server.base_url}/api/chat/stream",
+                              json={"message": "ML adoption in Biology?"}, timeout=30) as response:
+                first_line = next(response.iter_lines())
+                assert "token" in json.loads(first_line)
+
+            deadline = time.monotonic() + 5
+            while stub.cancelled_streams == 0 and time.monotonic() < deadline:
+                time.sleep(0.05)
+
+    assert stub.cancelled_streams == 1
+    assert stub.completed_streams == 0
+
+
+def test_malformed_upstream_line_ends_stream_with_error(caplog, monkeypatch):
+    """A line Ollama truncates mid-JSON ends the stream with an error event."""
+    main.chat_cache.clear()
+    with FakeOllamaServer(response=ANSWER, malformed_after=3) as stub:
+        monkeypatch.setattr(main.ollama_client, "base_url", stub.base_url)
+        with AppServer(main.app) as server:
+            with httpx.stream("POST", f"{server.base_url}/api/chat/stream",
+                              json={"message": "ML adoption in Biology?"}, timeout=30) as response:
+                assert response.status_code == 200
+                events = [json.loads(line) for line in response.iter_lines()]
+
+    assert [event["token"] for event in events[:-1]] == ["word0 ", "word1 ", "word2 "]
+    assert events[-1] == {"error": "Ollama sent a malformed response"}
+    assert "partial response: 'word0 word1 word2 '" in caplog.text
+    assert main.chat_cache.get(main.chat_cache_key("ML adoption in Biology?")) is None
@@ -0,0 +1,94 @@
+"""
+Tests for the content-hash cache behind /api/upload-paper.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import main
+from cache import DiskCache
+from pdf_fixtures import build_paper_pdf
+from stub_servers import FakeOllamaServer
+
+
+async def _upload_twice(pdf: bytes):
+    await main.start_http_clients()
+    try:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver", timeout=30) as client:
+            results = []
+            for _ in range(2):
+                start = time.perf_counter()
+                response = await client.post("/api/upload-paper", files={"file": ("paper.pdf", pdf)})
+                results.append((response, time.perf_counter() - start))
+    finally:
+        await main.close_http_clients()
+    return results
+
+
+def test_repeat_upload_is_served_from_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "upload_cache", DiskCache(tmp_path, max_bytes=10 * 1024 * 1024))
+    main.load_dataset_file()
+
+    with FakeOllamaServer(delay=0.3, response="📄 **Paper Overview**") as stub:
+        monkeypatch.setattr(main.ollama_client, "base_url", stub.base_url)
+        (first, first_time), (second, second_time) = asyncio.run(_upload_twice(build_paper_pdf(num_pages=5)))
+
+    assert first.status_code == 200 and second.status_code == 200
+    assert first.json()["cached"] is False
+    assert second.json() == {"response": "📄 **Paper Overview**", "error": None, "cached": True}
+    assert stub.request_count == 1
+    assert second_time < first_time / 5
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=3500)
+    for key in ("a", "b", "c"):
+        cache.set(key, {"payload": "x" * 1000})
+        # Distinct mtimes so the LRU order is unambiguous
+        past = time.time() - 100 + ord(key)
+        os.utime(tmp_path / f"{key}.json", (past, past))
+
+    assert cache.get("a") is not None  # Refreshes "a"
+    cache.set("d", {"payload": "x" * 1000})
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("d") is not None
+
+
+def test_disk_cache_indexes_once_and_does_io_off_the_event_loop(tmp_path, monkeypatch):
+    for i, key in enumerate(("old", "newer")):
+        (tmp_path / f"{key}.json").write_text('{"payload": "' + "x" * 1000 + '"}')
+        past = time.time() - 100 + i
+        os.utime(tmp_path / f"{key}.json", (past, past))
+
+    cache = DiskCache(tmp_path, max_bytes=2500)
+    assert cache.stats()["entries"] == 2 and cache.stats()["bytes"] == 2 * 1015
+
+    # Writes evict from the index, without listing the directory again
+    def no_scan(self, pattern):
+        raise AssertionError("DiskCache rescanned its directory")
+
+    monkeypatch.setattr(Path, "glob", no_scan)
+    threads = []
+    get, set_ = cache.get, cache.set
+    monkeypatch.setattr(cache, "get", lambda key: threads.append(threading.get_ident()) or get(key))
+    monkeypatch.setattr(cache, "set", lambda key, value: threads.append(threading.get_ident()) or set_(key, value))
+
+    async def use_cache():
+        await cache.aset("new", {"payload": "x" * 1000})
+        return await cache.aget("old"), await cache.aget("newer"), threading.get_ident()
+
+    old, newer, loop_thread = asyncio.run(use_cache())
+    assert old is None and newer is not None
+    assert not (tmp_path / "old.json").exists()
+    assert cache.stats()["entries"] == 2 and cache.stats()["bytes"] == 2 * 1015
+    assert len(threads) == 3 and loop_thread not in threads
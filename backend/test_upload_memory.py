@@ -0,0 +1,187 @@
+"""
+Peak memory of concurrent large uploads to /api/upload-paper, and how the
+uploads reach the PDF extractor without being copied.
+
+The uploads run in a fresh interpreter (this file run as a script), so its
+peak RSS reflects only the upload workload and not earlier tests.
+"""
+
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+from pathlib import Path
+
+NUM_UPLOADS = 6
+UPLOAD_MB = 20
+MAX_UPLOAD_MB = 24
+MAX_RSS_GROWTH_MB = 48
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def _upload_all(paths, base_url: str):
+    import httpx
+    import main
+
+    previous_base_url, main.ollama_client.base_url = main.ollama_client.base_url, base_url
+    await main.start_http_clients()
+    try:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver", timeout=60) as client:
+            async def upload(path):
+                with open(path, "rb") as f:
+                    response = await client.post("/api/upload-paper", files={"file": ("paper.pdf", f)})
+                return response.status_code
+
+            return await asyncio.gather(*(upload(path) for path in paths))
+    finally:
+        await main.close_http_clients()
+        main.pdf_extractor.shutdown()
+        main.ollama_client.base_url = previous_base_url
+
+
+def run_uploads(upload_dir: Path):
+    """Upload every PDF in upload_dir at once and print the peak RSS growth."""
+    sys.path.insert(0, str(Path(__file__).parent))
+    import main
+    from stub_servers import FakeOllamaServer
+
+    main.load_dataset_file()
+    paths = sorted(upload_dir.glob("*.pdf"))
+    with FakeOllamaServer(response="📄 **Paper Overview**") as stub:
+        baseline = _peak_rss_mb()
+        statuses = asyncio.run(_upload_all(paths, stub.base_url))
+        peak = _peak_rss_mb()
+
+    print(json.dumps({
+        "statuses": dict(zip((path.name for path in paths), statuses)),
+        "rss_growth_mb": peak - baseline,
+    }))
+
+
+def test_concurrent_large_uploads_have_bounded_memory(tmp_path):
+    from pdf_fixtures import build_paper_pdf
+
+    upload_dir = tmp_path / "uploads"
+    upload_dir.mkdir()
+    for i in range(NUM_UPLOADS):
+        pdf = build_paper_pdf(num_pages=3, seed=i, padding_bytes=UPLOAD_MB * 1024 * 1024)
+        (upload_dir / f"paper-{i}.pdf").write_bytes(pdf)
+        del pdf
+    (upload_dir / "too-large.pdf").write_bytes(
+        build_paper_pdf(num_pages=3, padding_bytes=(MAX_UPLOAD_MB + 1) * 1024 * 1024)
+    )
+
+    env = dict(
+        os.environ,
+        UPLOAD_MAX_MB=str(MAX_UPLOAD_MB),
+        UPLOAD_CACHE_DIR=str(tmp_path / "cache"),
+    )
+    result = subprocess.run(
+        [sys.executable, __file__, str(upload_dir)],
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    statuses = report["statuses"]
+    assert statuses.pop("too-large.pdf") == 413
+    assert set(statuses.values()) == {200}
+    # Reading every upload whole would add well over NUM_UPLOADS * UPLOAD_MB
+    assert report["rss_growth_mb"] < MAX_RSS_GROWTH_MB, report
+
+
+def test_oversized_upload_is_refused_before_parsing():
+    import httpx
+    from fastapi import FastAPI, File, UploadFile
+
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    from utils.uploads import UploadLimitMiddleware
+
+    app = FastAPI()
+    app.add_middleware(UploadLimitMiddleware, paths=["/upload"], max_bytes=1024 * 1024)
+    handled = []
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        handled.append(file.filename)
+        return {"size": len(await file.read())}
+
+    boundary = "limit-test"
+
+    async def body(size: int):
+        yield f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="p.pdf"\r\n\r\n'.encode()
+        for _ in range(size // 65536):
+            yield b"x" * 65536
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    async def post_all():
+        transport = httpx.ASGITransport(app=app)
+        headers = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            small = await client.post("/upload", files={"file": ("p.pdf", b"x" * 65536)})
+            declared = await client.post("/upload", files={"file": ("p.pdf", b"x" * 2 * 1024 * 1024)})
+            # No Content-Length: counted as it arrives
+            streamed = await client.post("/upload", content=body(2 * 1024 * 1024), headers=headers)
+            return small, declared, streamed
+
+    small, declared, streamed = asyncio.run(post_all())
+    assert small.status_code == 200 and small.json() == {"size": 65536}
+    assert declared.status_code == streamed.status_code == 413
+    assert streamed.json() == {"detail": "Upload exceeds the 1 MB limit"}
+    assert handled == ["p.pdf"]
+
+
+def test_predict_hands_the_spooled_upload_to_the_extractor(monkeypatch):
+    import httpx
+    from pdf_fixtures import build_text_pdf
+
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "service"))
+    import paper_insights_service as service
+    from utils import uploads
+
+    sources = []
+    extract_text_from_upload = service.pdf_extractor.extract_text_from_upload
+
+    async def spy(source, content_type=None, suffix=""):
+        text = await extract_text_from_upload(source, content_type, suffix=suffix)
+        sources.append((source if isinstance(source, str) else type(source), text))
+        return text
+
+    monkeypatch.setattr(service.pdf_extractor, "extract_text_from_upload", spy)
+    small = build_text_pdf(["Graph neural networks for protein folding"])
+    # Over Starlette's 1 MB in-memory limit, so the upload rolls over to disk
+    large = build_text_pdf(["Graph neural networks for protein folding"], padding_bytes=2 * 1024 * 1024)
+
+    async def predict_all():
+        transport = httpx.ASGITransport(app=service.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver", timeout=60) as client:
+            return [(await client.post("/predict", files={"file": ("paper.pdf", pdf, "application/pdf")})).status_code
+                    for pdf in (small, large)]
+
+    try:
+        assert asyncio.run(predict_all()) == [200, 200]
+        # Without /proc, the rolled-over upload is handed over as its bytes
+        exists = os.path.exists
+        monkeypatch.setattr(uploads.os.path, "exists", lambda path: not path.startswith("/proc/") and exists(path))
+        assert asyncio.run(predict_all()) == [200, 200]
+    finally:
+        service.pdf_extractor.shutdown()
+
+    [(memory, _), (rolled, _), (memory_again, _), (fallback, _)] = sources
+    assert memory is memory_again is fallback is bytes
+    assert rolled.startswith(f"/proc/{os.getpid()}/fd/")
+    assert all("Graph neural networks for protein folding" in text for _, text in sources)
+
+
+if __name__ == "__main__":
+    run_uploads(Path(sys.argv[1]))
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for rebuilding OpenAlex abstracts from inverted indexes.
+
+"Before" collects (position, word) pairs and sorts them, which is what the
+/api/search and /api/trending handlers used to do for every paper. "After" is
+reconstruct_abstract, which places words by position without sorting.
+"""
+
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from openalex import reconstruct_abstract
+
+# Configuration
+PAGE_SIZE = 100  # Results per OpenAlex page
+ITERATIONS = 50
+ABSTRACT_LENGTHS = [150, 250, 400]  # Words; typical abstracts are 150-300
+VOCABULARY_SIZE = 5000
+
+
+def build_inverted_index(num_words: int, rng: random.Random) -> dict:
+    """An inverted index with a Zipf-like word distribution, like real abstracts."""
+    ranks = range(1, VOCABULARY_SIZE + 1)
+    weights = [1 / rank for rank in ranks]
+    words = rng.choices([f"term{rank}" for rank in ranks], weights=weights, k=num_words)
+    index = {}
+    for position, word in enumerate(words):
+        index.setdefault(word, []).append(position)
+    return index
+
+
+def reconstruct_sorted(inverted_abstract: dict) -> str:
+    word_positions = []
+    for word, positions in inverted_abstract.items():
+        for pos in positions:
+            word_positions.append((pos, word))
+    word_positions.sort()
+    return " ".join([word for _, word in word_positions])
+
+
+def main():
+    print("=" * 60)
+    print("Abstract Reconstruction Micro-benchmark")
+    print("=" * 60)
+    print(f"  Page of {PAGE_SIZE} abstracts, {ITERATIONS} iterations")
+
+    rng = random.Random(0)
+    for num_words in ABSTRACT_LENGTHS:
+        page = [build_inverted_index(num_words, rng) for _ in range(PAGE_SIZE)]
+        assert all(reconstruct_abstract(index) == reconstruct_sorted(index) for index in page)
+
+        timings = {
+            "Before (sort)": lambda: [reconstruct_sorted(index) for index in page],
+            "After (by position)": lambda: [reconstruct_abstract(index) for index in page],
+        }
+        print(f"\n  {num_words}-word abstracts:")
+        before_ms = None
+        for label, run in timings.items():
+            page_ms = timeit.timeit(run, number=ITERATIONS) / ITERATIONS * 1e3
+            before_ms = before_ms or page_ms
+            print(f"    {label:<20} {page_ms:7.2f} ms/page  ({before_ms / page_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
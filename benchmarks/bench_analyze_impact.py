@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Time and peak memory of analyze_category on a synthetic multi-million-record file.
+
+"Before" is the former analyze_category: load_extracted_data read the whole
+impact file into a list, and the analysis walked that list. "After" streams
+the file once through the accumulators. Each run happens in a fresh process,
+so its peak resident memory is its own, and both must produce the same
+analysis JSON.
+
+    python benchmarks/bench_analyze_impact.py --records 500000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import random
+import resource
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import analyze_extracted_impact
+
+LEVELS = ["none", "minimal", "moderate", "substantial", "critical"]
+
+
+def write_impact_file(path: Path, records: int, seed: int = 0):
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(records):
+            level = rng.choice(LEVELS)
+            impact = {"has_ml_usage": level != "none", "ml_contribution_level": level}
+            if level != "none":
+                impact.update({
+                    "attribution_scoring": {"ml_contribution_percent": rng.randint(0, 100),
+                                            "domain_insight_percent": rng.randint(0, 100),
+                                            "explanation": "ML ranked the candidates."},
+                    "acceleration_metrics": {"provides_acceleration": rng.random() < 0.3},
+                    "efficiency_measures": {"improves_efficiency": rng.random() < 0.4},
+                    "breakthrough_analysis": {"enables_new_capability": rng.random() < 0.1},
+                })
+            record = {"ml_impact_quantification": impact, "_paper_id": f"paper-{i}",
+                      "_year": rng.randint(2000, 2024), "_category": "Benchmark"}
+            f.write(json.dumps(record) + '\n')
+
+
+def analyze_category_before(category: str):
+    papers = []
+    with open(analyze_extracted_impact.INPUT_DIR / f"{category}_impact.jsonl", 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                try:
+                    papers.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+
+    contribution_levels = Counter()
+    papers_with_ml = papers_with_acceleration = papers_with_efficiency = papers_with_new_capability = 0
+    attribution_scores = []
+    for paper in papers:
+        ml_quant = paper.get('ml_impact_quantification', {})
+        if ml_quant.get('has_ml_usage'):
+            papers_with_ml += 1
+        contribution_levels[ml_quant.get('ml_contribution_level', 'none')] += 1
+        ml_percent = ml_quant.get('attribution_scoring', {}).get('ml_contribution_percent')
+        if ml_percent is not None:
+            attribution_scores.append(ml_percent)
+        if ml_quant.get('acceleration_metrics', {}).get('provides_acceleration'):
+            papers_with_acceleration += 1
+        if ml_quant.get('efficiency_measures', {}).get('improves_efficiency'):
+            papers_with_efficiency += 1
+        if ml_quant.get('breakthrough_analysis', {}).get('enables_new_capability'):
+            papers_with_new_capability += 1
+
+    total = len(papers)
+    return {
+        'category': category,
+        'total_papers': total,
+        'ml_impact_quantification': {
+            'total_papers': total,
+            'papers_with_ml_usage': papers_with_ml,
+            'ml_usage_rate': papers_with_ml / total if total else 0,
+            'contribution_level_distribution': dict(contribution_levels.most_common()),
+            'papers_with_acceleration': papers_with_acceleration,
+            'acceleration_rate': papers_with_acceleration / total if total else 0,
+            'papers_with_efficiency': papers_with_efficiency,
+            'efficiency_rate': papers_with_efficiency / total if total else 0,
+            'papers_with_new_capability': papers_with_new_capability,
+            'new_capability_rate': papers_with_new_capability / total if total else 0,
+            'average_ml_attribution': sum(attribution_scores) / len(attribution_scores) if attribution_scores else 0,
+            'attribution_scores_count': len(attribution_scores)
+        }
+    }
+
+
+def run(version: str, input_dir: Path):
+    """Analyze in this (fresh) process; return the JSON, seconds and peak RSS in MB."""
+    analyze_extracted_impact.INPUT_DIR = input_dir
+    analyze = analyze_category_before if version == "before" else analyze_extracted_impact.analyze_category
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        analysis = analyze("Benchmark")
+    seconds = time.perf_counter() - start
+    return json.dumps(analysis, indent=2), seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=2_000_000, help="Records in the synthetic impact file")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Impact Analysis Benchmark")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_dir = Path(tmp)
+        impact_file = input_dir / "Benchmark_impact.jsonl"
+        write_impact_file(impact_file, args.records)
+        print(f"  {args.records:,} records, {impact_file.stat().st_size / 2**20:,.0f} MB")
+
+        outputs = {}
+        spawn = multiprocessing.get_context("spawn")
+        for label, version in [("Before (list, then analyze)", "before"), ("After (one streaming pass)", "after")]:
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                outputs[version], seconds, peak_mb = pool.submit(run, version, input_dir).result()
+            print(f"  {label:<28} {seconds:7.2f} s  {args.records / seconds:>10,.0f} records/s"
+                  f"  peak RSS {peak_mb:8,.0f} MB")
+
+        print(f"\n  Identical analysis JSON: {'yes' if outputs['before'] == outputs['after'] else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for packing several papers into one Ollama request.
+
+The fake Ollama charges a fixed overhead per request, prompt evaluation per
+1,000 prompt characters, and generation per output word, which are the costs
+batching trades against each other. Every paper gets the short no-ML answer
+most papers get in triage. Batched papers are also cut to BATCH_TEXT_LENGTH
+instead of MAX_TEXT_LENGTH, so part of the gain comes from shorter prompts.
+
+    python benchmarks/bench_batched_extraction.py --batch-sizes 1 4 8 16
+"""
+
+import argparse
+import contextlib
+import gzip
+import io
+import json
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "backend"))
+
+import extract_info
+from stub_servers import FakeOllamaServer
+
+IMPACT = {
+    "has_ml_usage": False,
+    "ml_contribution_level": "none",
+    "attribution_scoring": None,
+    "acceleration_metrics": None,
+    "efficiency_measures": None,
+    "breakthrough_analysis": None,
+}
+
+
+def write_category_file(path: Path, num_papers: int):
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for i in range(num_papers):
+            paper = {"id": f"paper-{i}", "text": "Introduction. " + "Body text. " * 800, "metadata": {"year": 2021}}
+            f.write(json.dumps(paper) + '\n')
+
+
+def fake_model(eval_seconds_per_kchar: float):
+    def answer(body):
+        time.sleep(len(body["prompt"]) / 1000 * eval_seconds_per_kchar)
+        ids = re.findall(r"### Paper ID: (\S+)", body["prompt"])
+        if not ids:
+            return json.dumps({"ml_impact_quantification": IMPACT})
+        return json.dumps({"papers": [{"paper_id": i, "ml_impact_quantification": IMPACT} for i in ids]})
+    return answer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--papers", type=int, default=64, help="Papers in the category file")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent requests")
+    parser.add_argument("--overhead", type=float, default=0.15, help="Seconds per request")
+    parser.add_argument("--eval", type=float, default=0.01, help="Seconds per 1,000 prompt characters")
+    parser.add_argument("--token-delay", type=float, default=0.002, help="Seconds per output word")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Batched Extraction Throughput Benchmark")
+    print("=" * 60)
+    print(f"  Papers: {args.papers}, workers: {args.workers}")
+    print(f"  Fake Ollama: {args.overhead:.3f}s/request, {args.eval:.3f}s/1k prompt chars,"
+          f" {args.token_delay:.3f}s/output word")
+
+    stub = FakeOllamaServer(delay=args.overhead, response=fake_model(args.eval), token_delay=args.token_delay)
+    with tempfile.TemporaryDirectory() as tmp, stub:
+        tmp = Path(tmp)
+        category_file = tmp / "Benchmark.jsonl.gz"
+        write_category_file(category_file, args.papers)
+        extract_info.OLLAMA_BASE_URL = stub.base_url
+
+        print()
+        baseline = None
+        for batch_size in args.batch_sizes:
+            # Fresh output directory, so nothing is skipped as already processed
+            extract_info.OUTPUT_DIR = tmp / f"out-{batch_size}"
+            extract_info.OUTPUT_DIR.mkdir()
+            (extract_info.OUTPUT_DIR / "progress").mkdir()
+
+            requests_before = stub.request_count
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                extract_info.process_category_file(category_file, "Benchmark", workers=args.workers,
+                                                   papers_per_request=batch_size)
+            rate = args.papers / (time.perf_counter() - start)
+            baseline = baseline or rate
+            requests = stub.request_count - requests_before
+            label = f"{batch_size} per request"
+            print(f"  {label:<18} {rate:7.2f} papers/s  ({rate / baseline:.1f}x, {requests} requests)")
+
+
+if __name__ == "__main__":
+    main()
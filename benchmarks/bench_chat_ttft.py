@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark time-to-first-token for /api/chat vs. /api/chat/stream.
+
+Runs the backend under uvicorn against a fake streaming Ollama server whose
+latency profile (prompt evaluation delay, per-token delay, answer length) is
+configurable below, and reports the median time until the user sees text.
+"""
+
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import main
+from stub_servers import AppServer, FakeOllamaServer
+
+# Configuration
+PROMPT_EVAL_DELAY = 0.3  # Seconds before Ollama emits the first token
+TOKEN_DELAY = 0.02  # Seconds between streamed tokens
+ANSWER_TOKENS = 150
+RUNS = 5
+QUERY = "How many papers in biology implement AI?"
+
+
+def time_blocking_chat(base_url: str) -> float:
+    """Seconds until /api/chat returns the (complete) answer."""
+    start = time.perf_counter()
+    response = httpx.post(f"{base_url}/api/chat", json={"message": QUERY}, timeout=120)
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+def time_streaming_chat(base_url: str) -> tuple:
+    """Seconds until the first token and until the end of /api/chat/stream."""
+    start = time.perf_counter()
+    first_token = None
+    with httpx.stream("POST", f"{base_url}/api/chat/stream", json={"message": QUERY}, timeout=120) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if first_token is None and "token" in json.loads(line):
+                first_token = time.perf_counter() - start
+    return first_token, time.perf_counter() - start
+
+
+def main_benchmark():
+    print("=" * 60)
+    print("Chat Time-to-First-Token Benchmark")
+    print("=" * 60)
+    print(f"  Prompt eval delay: {PROMPT_EVAL_DELAY * 1000:.0f} ms")
+    print(f"  Token delay: {TOKEN_DELAY * 1000:.0f} ms x {ANSWER_TOKENS} tokens")
+    print(f"  Runs: {RUNS}")
+
+    answer = " ".join(f"tok{i}" for i in range(ANSWER_TOKENS))
+
+    # Every run asks the same question; measure generation, not cache hits
+    main.chat_cache.maxsize = 0
+
+    with FakeOllamaServer(delay=PROMPT_EVAL_DELAY, token_delay=TOKEN_DELAY, response=answer) as stub:
+        main.ollama_client.base_url = stub.base_url
+        with AppServer(main.app) as server:
+            blocking = [time_blocking_chat(server.base_url) for _ in range(RUNS)]
+            streaming = [time_streaming_chat(server.base_url) for _ in range(RUNS)]
+
+    blocking_ttft = statistics.median(blocking)
+    streaming_ttft = statistics.median(first for first, _ in streaming)
+    streaming_total = statistics.median(total for _, total in streaming)
+
+    print(f"\n  /api/chat         TTFT (= full answer): {blocking_ttft * 1000:8.1f} ms")
+    print(f"  /api/chat/stream  TTFT:                 {streaming_ttft * 1000:8.1f} ms")
+    print(f"  /api/chat/stream  full answer:          {streaming_total * 1000:8.1f} ms")
+    print(f"\n  ✓ Time-to-first-token improved {blocking_ttft / streaming_ttft:.1f}x")
+
+
+if __name__ == "__main__":
+    main_benchmark()
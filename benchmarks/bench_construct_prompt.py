@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for per-request chat prompt construction.
+
+"Before" renders the dataset context from scratch on every request, which is
+what construct_prompt used to do. "After" reuses the PromptContext rendered
+once when the dataset is loaded.
+"""
+
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from main import DATASET_PATH, construct_prompt
+from prompt_context import PromptContext
+
+# Configuration
+ITERATIONS = 2000
+QUERIES = [
+    "How many papers in biology implement AI?",
+    "What's the ML adoption rate in Computer Science?",
+    "Which field has the highest code availability?",
+]
+
+
+def main():
+    print("=" * 60)
+    print("Prompt Construction Micro-benchmark")
+    print("=" * 60)
+
+    with open(DATASET_PATH, "r") as f:
+        dataset = json.load(f)
+    context = PromptContext(dataset)
+
+    for query in QUERIES:
+        before = timeit.timeit(lambda: construct_prompt(query, PromptContext(dataset)), number=ITERATIONS)
+        after = timeit.timeit(lambda: construct_prompt(query, context), number=ITERATIONS)
+
+        before_us = before / ITERATIONS * 1e6
+        after_us = after / ITERATIONS * 1e6
+        print(f"\n  Query: {query}")
+        print(f"    Before (render per request): {before_us:8.1f} µs")
+        print(f"    After (cached context):      {after_us:8.1f} µs")
+        print(f"    Speedup: {before_us / after_us:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
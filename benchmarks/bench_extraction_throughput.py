@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for extract_info.process_category_file against a fake Ollama.
+
+The stub answers every /api/generate after a fixed latency and serves any
+number of requests at once, so it shows how much of the per-request latency the
+worker pool hides. It does not model a GPU running out of parallel slots; on a
+real server, throughput stops growing once the worker count passes
+OLLAMA_NUM_PARALLEL.
+
+With --servers, it also spreads the papers over an EndpointPool of one to that
+many stub servers, each taking --slots requests at once.
+
+    python benchmarks/bench_extraction_throughput.py --latency 0.5 --papers 64
+    python benchmarks/bench_extraction_throughput.py --servers 3 --slots 2
+"""
+
+import argparse
+import contextlib
+import gzip
+import io
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "backend"))
+
+import extract_info
+from stub_servers import FakeOllamaServer
+
+EXTRACTION = json.dumps({"ml_impact_quantification": {"has_ml_usage": False, "ml_contribution_level": "none"}})
+
+
+def write_category_file(path: Path, num_papers: int):
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for i in range(num_papers):
+            paper = {"id": f"paper-{i}", "text": "Introduction. " + "Body text. " * 400, "metadata": {"year": 2021}}
+            f.write(json.dumps(paper) + '\n')
+
+
+def run_sequential(category_file: Path, category: str):
+    """The loop process_category_file used to run: one paper at a time, then a 0.1 s sleep."""
+    with gzip.open(category_file, 'rt', encoding='utf-8') as f:
+        for line in f:
+            extract_info.extract_paper_info(json.loads(line), category)
+            time.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.25, help="Seconds per fake Ollama request")
+    parser.add_argument("--papers", type=int, default=48, help="Papers in the category file")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--servers", type=int, default=0, help="Most stub servers behind an endpoint pool")
+    parser.add_argument("--slots", type=int, default=2, help="Requests each pooled server takes at once")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Extraction Throughput Benchmark")
+    print("=" * 60)
+    print(f"  Papers: {args.papers}, fake Ollama latency: {args.latency:.2f}s")
+
+    with tempfile.TemporaryDirectory() as tmp, FakeOllamaServer(delay=args.latency, response=EXTRACTION) as stub:
+        tmp = Path(tmp)
+        category_file = tmp / "Benchmark.jsonl.gz"
+        write_category_file(category_file, args.papers)
+        extract_info.OLLAMA_BASE_URL = stub.base_url
+
+        start = time.perf_counter()
+        run_sequential(category_file, "Benchmark")
+        baseline = args.papers / (time.perf_counter() - start)
+        print(f"\n  {'Before (sequential + sleep)':<28} {baseline:7.2f} papers/s")
+
+        for workers in args.workers:
+            # Fresh output directory, so nothing is skipped as already processed
+            extract_info.OUTPUT_DIR = tmp / f"out-{workers}"
+            extract_info.OUTPUT_DIR.mkdir()
+            (extract_info.OUTPUT_DIR / "progress").mkdir()
+
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                extract_info.process_category_file(category_file, "Benchmark", workers=workers)
+            rate = args.papers / (time.perf_counter() - start)
+            print(f"  {f'{workers} workers':<28} {rate:7.2f} papers/s  ({rate / baseline:.1f}x)")
+
+    if args.servers:
+        run_pooled(args)
+
+
+def run_pooled(args):
+    print(f"\n  Endpoint pool, {args.slots} slots per server")
+    stubs = [FakeOllamaServer(delay=args.latency, response=EXTRACTION).start() for _ in range(args.servers)]
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            category_file = tmp / "Benchmark.jsonl.gz"
+            write_category_file(category_file, args.papers)
+
+            single = None
+            for servers in range(1, args.servers + 1):
+                extract_info.OUTPUT_DIR = tmp / f"pool-{servers}"
+                extract_info.OUTPUT_DIR.mkdir()
+                (extract_info.OUTPUT_DIR / "progress").mkdir()
+                pool = extract_info.EndpointPool([(stub.base_url, args.slots) for stub in stubs[:servers]])
+                extract_info.endpoint_pool = pool
+
+                start = time.perf_counter()
+                try:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        extract_info.process_category_file(category_file, "Benchmark", workers=pool.capacity)
+                finally:
+                    pool.close()
+                rate = args.papers / (time.perf_counter() - start)
+                single = single or rate
+                print(f"  {f'{servers} servers':<28} {rate:7.2f} papers/s  ({rate / single:.1f}x)")
+    finally:
+        for stub in stubs:
+            stub.stop()
+
+
+if __name__ == "__main__":
+    main()
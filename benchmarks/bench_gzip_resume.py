@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Time to reach the resume offset of a category file, near its end.
+
+"gzip.open + seek" is what a restart did before: GzipFile.seek decompresses
+everything before the offset. "open_at" starts at the gzip member holding
+the offset: for a file written by gzip, one member, that is the same work;
+after seekable_gzip.repack, only part of one MEMBER_BYTES member is
+decompressed. Every method must read the same line at the offset.
+
+    python benchmarks/bench_gzip_resume.py --papers 200000 --resume-at 0.9
+"""
+
+import argparse
+import gzip
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import seekable_gzip
+
+
+def write_category_file(path: Path, papers: int, seed: int = 0):
+    rng = random.Random(seed)
+    words = [f"word{i}" for i in range(5000)]
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for i in range(papers):
+            text = " ".join(rng.choices(words, k=rng.randint(150, 600)))
+            f.write(json.dumps({"id": f"paper-{i}", "text": text, "metadata": {"year": 2020}}) + '\n')
+
+
+def line_offset(path: Path, fraction: float) -> int:
+    """Decompressed offset of the first line past fraction of the file."""
+    with gzip.open(path, 'rb') as f:
+        size = f.seek(0, 2)
+        f.seek(int(size * fraction))
+        f.readline()
+        return f.tell()
+
+
+def timed_read(open_stream):
+    start = time.perf_counter()
+    with open_stream() as f:
+        line = f.readline()
+    return line, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--papers", type=int, default=200_000, help="Papers in the category file")
+    parser.add_argument("--resume-at", type=float, default=0.9, help="Resume offset, as a share of the file")
+    parser.add_argument("--member-mb", type=float, default=seekable_gzip.MEMBER_BYTES / 2**20,
+                        help="Decompressed megabytes per member after repacking")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Gzip Resume Benchmark")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "Benchmark.jsonl.gz"
+        write_category_file(path, args.papers)
+        offset = line_offset(path, args.resume_at)
+        single_size = path.stat().st_size
+
+        def gzip_seek():
+            f = gzip.open(path, 'rb')
+            f.seek(offset)
+            return f
+
+        single_members, _ = seekable_gzip.scan(path)
+        baseline, seek_seconds = timed_read(gzip_seek)
+        single, single_seconds = timed_read(lambda: seekable_gzip.open_at(path, offset, single_members))
+
+        start = time.perf_counter()
+        seekable_gzip.repack(path, int(args.member_mb * 2**20))
+        repack_seconds = time.perf_counter() - start
+        members, _ = seekable_gzip.scan(path)
+        repacked, repacked_seconds = timed_read(lambda: seekable_gzip.open_at(path, offset, members))
+        assert baseline == single == repacked
+
+        print(f"  Papers: {args.papers:,}; resume offset {offset / 2**20:,.0f} MB decompressed")
+        print(f"  Compressed: {single_size / 2**20:,.1f} MB as one member,"
+              f" {path.stat().st_size / 2**20:,.1f} MB as {len(members):,} members"
+              f" (repacked in {repack_seconds:.1f}s)")
+        print(f"\n  {'Method':<34} {'Seconds':>8}")
+        print(f"  {'gzip.open + seek':<34} {seek_seconds:>8.3f}")
+        print(f"  {'open_at, one member':<34} {single_seconds:>8.3f}")
+        print(f"  {'open_at, repacked':<34} {repacked_seconds:>8.3f}")
+        print(f"\n  Speedup after repacking: {seek_seconds / repacked_seconds:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
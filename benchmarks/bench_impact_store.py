@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Category analysis from the JSONL impact file versus the columnar store.
+
+"JSONL" is analyze_category, one streaming pass that parses every record.
+"Convert" is impact_store.convert_category, run once per category after
+extraction. "Store" is analyze_category_store, run on every rerun of the
+analysis: it reads four columns from Parquet and aggregates them with pandas.
+Both analyses must produce the same JSON.
+
+Needs pyarrow and pandas.
+
+    python benchmarks/bench_impact_store.py --records 5000000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import analyze_extracted_impact
+import impact_store
+from bench_analyze_impact import write_impact_file
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=1_000_000, help="Records in the synthetic impact file")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Columnar Impact Store Benchmark")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        impact_file = tmp / "Benchmark_impact.jsonl"
+        write_impact_file(impact_file, args.records)
+        analyze_extracted_impact.INPUT_DIR = tmp
+        store_dir = tmp / "store"
+
+        json_analysis, json_seconds = timed(analyze_extracted_impact.analyze_category, "Benchmark")
+        _, convert_seconds = timed(impact_store.convert_category, "Benchmark", tmp, store_dir)
+        store_analysis, store_seconds = timed(analyze_extracted_impact.analyze_category_store, "Benchmark", store_dir)
+        store_mb = sum(path.stat().st_size for path in store_dir.rglob("*.parquet")) / 2**20
+
+        print(f"  {args.records:,} records; JSONL {impact_file.stat().st_size / 2**20:,.0f} MB,"
+              f" store {store_mb:,.0f} MB")
+        print(f"\n  {'JSONL (analyze_category)':<30} {json_seconds:8.2f} s")
+        print(f"  {'Convert (once)':<30} {convert_seconds:8.2f} s")
+        print(f"  {'Store (analyze_category_store)':<30} {store_seconds:8.2f} s  ({json_seconds / store_seconds:.0f}x)")
+        identical = json.dumps(json_analysis) == json.dumps(store_analysis)
+        print(f"\n  Identical analysis JSON: {'yes' if identical else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Hourly rerun of the impact analysis after extraction appended a few records.
+
+"Full" is what every run used to do: analyze the whole impact file again.
+"Incremental" is update_categories with a state directory: it loads the
+accumulators saved by the previous run, checks the fingerprint of the part
+of the file they cover, and feeds them only the records appended since.
+Both must produce the same analysis JSON.
+
+    python benchmarks/bench_incremental_analysis.py --records 2000000 --appended 5000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import analyze_extracted_impact
+from bench_analyze_impact import write_impact_file
+
+
+def timed(function):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=1_000_000, help="Records analyzed by the previous run")
+    parser.add_argument("--appended", type=int, default=5_000, help="Records appended since")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Incremental Impact Analysis Benchmark")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        analyze_extracted_impact.INPUT_DIR = tmp
+        impact_file = tmp / "Benchmark_impact.jsonl"
+        state_dir = tmp / "state"
+        write_impact_file(impact_file, args.records)
+
+        def incremental():
+            [(analysis, _)] = analyze_extracted_impact.update_categories(["Benchmark"], state_dir=state_dir)
+            return analysis
+
+        _, first_seconds = timed(incremental)
+        _, unchanged_seconds = timed(incremental)
+
+        write_impact_file(tmp / "appended.jsonl", args.appended, seed=1)
+        with open(impact_file, 'ab') as f:
+            f.write((tmp / "appended.jsonl").read_bytes())
+        incremental_analysis, incremental_seconds = timed(incremental)
+        full_analysis, full_seconds = timed(lambda: analyze_extracted_impact.analyze_category("Benchmark"))
+
+        print(f"  {args.records:,} records analyzed before, {args.appended:,} appended;"
+              f" {impact_file.stat().st_size / 2**20:,.0f} MB")
+        print(f"\n  {'First run (saves state)':<30} {first_seconds:8.2f} s")
+        print(f"  {'Rerun, nothing appended':<30} {unchanged_seconds:8.2f} s")
+        print(f"  {'Full rerun':<30} {full_seconds:8.2f} s")
+        print(f"  {'Incremental rerun':<30} {incremental_seconds:8.2f} s  ({full_seconds / incremental_seconds:.0f}x)")
+        identical = json.dumps(full_analysis) == json.dumps(incremental_analysis)
+        print(f"\n  Identical analysis JSON: {'yes' if identical else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for turning a 100-result OpenAlex page into /api/search results.
+
+"Before" is the per-paper loop /api/search used to run, which built every
+field of every result. "After" is WorkNormalizer with the full field set and
+with the narrower projections a client can ask for with select=.
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import main
+from openalex import SEARCH_FIELDS, WorkNormalizer, parse_select, reconstruct_abstract
+from stub_servers import build_openalex_work
+
+# Configuration
+PAGE_SIZE = 100
+ABSTRACT_WORDS = 220
+ITERATIONS = 20
+REPEATS = 5  # Best of, to damp scheduler noise
+PROJECTIONS = [
+    None,
+    "id,title,year,citations,url",
+    "id,title,authors,abstract",
+    "id,title,trendAnalysis",
+]
+
+
+def normalize_page_inline(papers):
+    """The former /api/search loop."""
+    results = []
+    for paper in papers:
+        if not paper:
+            continue
+
+        title = paper.get("title", "")
+        paper_id = paper.get("id", "").split("/")[-1] if paper.get("id") else ""
+        pub_year = paper.get("publication_year")
+        abstract = reconstruct_abstract(paper.get("abstract_inverted_index"))
+
+        authorships = paper.get("authorships", [])
+        authors = [a.get("author", {}).get("display_name", "Unknown") for a in authorships]
+        citation_count = paper.get("cited_by_count", 0)
+        concepts = paper.get("concepts", [])
+        paper_fields = [c.get("display_name", "") for c in concepts if c.get("level") <= 1]
+        mapped_field = main.map_field_to_dataset(paper_fields)
+
+        trend_analysis = main.analyze_paper_against_trends({
+            "title": title,
+            "abstract": abstract,
+            "citationCount": citation_count,
+            "year": pub_year
+        }, mapped_field)
+
+        venue = ""
+        primary_location = paper.get("primary_location", {})
+        if primary_location:
+            source = primary_location.get("source", {})
+            venue = source.get("display_name", "") if source else ""
+
+        paper_url = paper.get("doi", "")
+        if paper_url and not paper_url.startswith("http"):
+            paper_url = f"https://doi.org/{paper_url}"
+        if not paper_url:
+            paper_url = paper.get("id", "")
+
+        is_oa = paper.get("open_access", {}).get("is_oa", False)
+        oa_url = paper.get("open_access", {}).get("oa_url")
+
+        results.append({
+            "id": paper_id,
+            "title": title,
+            "authors": authors[:10],
+            "year": pub_year,
+            "abstract": abstract[:500] if abstract else "",
+            "citations": citation_count,
+            "influentialCitations": citation_count,
+            "url": paper_url,
+            "venue": venue,
+            "publicationDate": str(pub_year) if pub_year else "",
+            "fieldsOfStudy": paper_fields,
+            "isOpenAccess": is_oa,
+            "openAccessPdf": {"url": oa_url} if oa_url else None,
+            "trendAnalysis": trend_analysis
+        })
+    return results
+
+
+def normalize_page(papers, select):
+    normalizer = WorkNormalizer(
+        SEARCH_FIELDS,
+        map_field=main.map_field_to_dataset,
+        analyze_trends=main.analyze_paper_against_trends,
+        select=parse_select(select, SEARCH_FIELDS),
+    )
+    return list(normalizer.iter_results(papers))
+
+
+def main_benchmark():
+    print("=" * 60)
+    print("OpenAlex Result Normalization Micro-benchmark")
+    print("=" * 60)
+    print(f"  Page of {PAGE_SIZE} works, {ABSTRACT_WORDS}-word abstracts, best of {REPEATS}x{ITERATIONS}")
+
+    main.load_dataset_file()
+    papers = [build_openalex_work(i, abstract_words=ABSTRACT_WORDS) for i in range(PAGE_SIZE)]
+    for paper in papers:
+        paper["authorships"] = paper["authorships"] * 5
+    assert normalize_page(papers, None) == normalize_page_inline(papers)
+
+    def page_ms(run):
+        return min(timeit.repeat(run, number=ITERATIONS, repeat=REPEATS)) / ITERATIONS * 1e3
+
+    before = page_ms(lambda: normalize_page_inline(papers))
+    print(f"\n  {'Before (inline loop)':<36} {before:7.2f} ms/page")
+    for select in PROJECTIONS:
+        label = f"select={select}" if select else "All fields"
+        after = page_ms(lambda: normalize_page(papers, select))
+        print(f"  {label:<36} {after:7.2f} ms/page  ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main_benchmark()
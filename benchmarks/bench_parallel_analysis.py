@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Scaling of analyze_extracted_impact --workers with the number of processes.
+
+Analyzes several synthetic categories, one of them as large as all the
+others together, first one after another (--workers 1) and then with
+analyze_categories over a pool of each size. The large category is split
+into byte ranges of --range-mb, so it doesn't leave one process running long
+after the others. Every run must produce the same analysis JSON.
+
+JSON parsing is CPU-bound, so the speedup is bounded by the cores this
+machine has; workers beyond the core count only add overhead.
+
+    python benchmarks/bench_parallel_analysis.py --records 2000000 --workers 2 4 8 16
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import analyze_extracted_impact
+from bench_analyze_impact import write_impact_file
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=1_000_000, help="Records over all categories")
+    parser.add_argument("--categories", type=int, default=6, help="Categories, one of them half the records")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8], help="Pool sizes to time")
+    parser.add_argument("--range-mb", type=float, default=16, help="Byte range a large category is split into")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Parallel Impact Analysis Benchmark")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_dir = Path(tmp)
+        analyze_extracted_impact.INPUT_DIR = input_dir
+        categories = [f"Category{i}" for i in range(args.categories)]
+        sizes = [args.records // 2] + [args.records // 2 // (args.categories - 1)] * (args.categories - 1)
+        for seed, (category, records) in enumerate(zip(categories, sizes)):
+            write_impact_file(input_dir / f"{category}_impact.jsonl", records, seed)
+        total_mb = sum(path.stat().st_size for path in input_dir.glob("*.jsonl")) / 2**20
+        print(f"  {sum(sizes):,} records in {len(categories)} categories, {total_mb:,.0f} MB;"
+              f" CPU cores: {os.cpu_count()}")
+
+        range_bytes = int(args.range_mb * 2**20)
+        sequential, sequential_seconds = timed(lambda: [analyze_extracted_impact.analyze_category(category)
+                                                        for category in categories])
+        expected = json.dumps(sequential)
+        print(f"\n  {'Run':<22} {'Seconds':>8} {'Records/s':>12} {'Speedup':>8}  Identical")
+        print(f"  {'--workers 1':<22} {sequential_seconds:8.2f} {sum(sizes) / sequential_seconds:12,.0f}"
+              f" {1:7.2f}x")
+
+        for workers in args.workers:
+            analyses, seconds = timed(lambda: list(analyze_extracted_impact.analyze_categories(
+                categories, workers, range_bytes)))
+            identical = json.dumps(analyses) == expected
+            print(f"  {f'--workers {workers}':<22} {seconds:8.2f} {sum(sizes) / seconds:12,.0f}"
+                  f" {sequential_seconds / seconds:7.2f}x  {'yes' if identical else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
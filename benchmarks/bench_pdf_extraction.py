@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark PDF text extraction throughput against process pool size.
+
+Generates a set of multi-page PDFs, then extracts them all concurrently through
+PdfExtractor with 1..N worker processes. Also times a single long document, which
+the extractor splits into page ranges parsed in parallel.
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "backend"))
+
+from utils.text_extraction import PdfExtractor, extract_text_from_pdf
+from pdf_fixtures import build_paper_pdf
+
+# Configuration
+NUM_DOCUMENTS = 16
+PAGES_PER_DOCUMENT = 40
+LONG_DOCUMENT_PAGES = 160
+WORKER_COUNTS = sorted({1, 2, 4, 8, os.cpu_count() or 1})
+
+
+async def extract_all(extractor: PdfExtractor, documents) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(extractor.extract_text(doc) for doc in documents))
+    return time.perf_counter() - start
+
+
+async def run_with_workers(workers: int, documents, long_document):
+    extractor = PdfExtractor(max_workers=workers, max_pages=LONG_DOCUMENT_PAGES)
+    try:
+        # Warm the pool so process start-up is not counted
+        await extractor.extract_text(documents[0])
+        batch_time = await extract_all(extractor, documents)
+        long_time = await extract_all(extractor, [long_document])
+    finally:
+        extractor.shutdown()
+    return batch_time, long_time
+
+
+def main():
+    print("=" * 60)
+    print("PDF Extraction Throughput Benchmark")
+    print("=" * 60)
+    print(f"  CPU cores: {os.cpu_count()}")
+    print(f"  Documents: {NUM_DOCUMENTS} x {PAGES_PER_DOCUMENT} pages")
+    print(f"  Long document: {LONG_DOCUMENT_PAGES} pages")
+
+    documents = [build_paper_pdf(PAGES_PER_DOCUMENT, seed=i) for i in range(NUM_DOCUMENTS)]
+    long_document = build_paper_pdf(LONG_DOCUMENT_PAGES)
+
+    start = time.perf_counter()
+    for doc in documents:
+        extract_text_from_pdf(doc)
+    inline_time = time.perf_counter() - start
+    print(f"\n  Inline (event-loop thread): {NUM_DOCUMENTS / inline_time:6.1f} docs/s")
+
+    print(f"\n  {'Workers':>7}  {'docs/s':>8}  {'pages/s':>8}  {'long doc':>9}")
+    for workers in WORKER_COUNTS:
+        batch_time, long_time = asyncio.run(run_with_workers(workers, documents, long_document))
+        docs_per_sec = NUM_DOCUMENTS / batch_time
+        print(f"  {workers:>7}  {docs_per_sec:8.1f}  {docs_per_sec * PAGES_PER_DOCUMENT:8.0f}  {long_time:8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Recall and LLM time saved by the keyword pre-filter, on the labelled sample.
+
+The sample is data/ml_output and data/nonml_output: earlier LLM extractions,
+each with an ml_impact label. They hold the title, summary, methodology and
+outcomes rather than full text, so scores here run lower than on full papers
+and the thresholds err low. The labels are the LLM's own and are noisy; a
+share of the "minimal" ones are papers with no ML at all.
+
+"Saved" is the LLM time of the papers ruled out, at --llm-seconds per paper,
+less the time spent scoring every paper at full-text length.
+
+    python benchmarks/bench_prefilter.py --llm-seconds 6
+"""
+
+import argparse
+import json
+import sys
+import timeit
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from utils.insights import ml_prefilter_score
+
+SAMPLE_DIRS = [ROOT / "data" / "ml_output", ROOT / "data" / "nonml_output"]
+TEXT_FIELDS = ["title", "summary", "methodology", "statistics", "research_outcomes"]
+FULL_TEXT_CHARS = 40000  # Typical paper length, for timing the scorer
+
+
+def load_sample():
+    """(text, ml_impact) pairs from the labelled extractions."""
+    sample = []
+    for sample_dir in SAMPLE_DIRS:
+        for path in sorted(sample_dir.glob("*.jsonl")):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    text = " ".join(str(record.get(field) or "") for field in TEXT_FIELDS)
+                    sample.append((text, record.get("ml_impact", "none")))
+    return sample
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-seconds", type=float, default=6.0, help="LLM seconds per paper")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.125, 0.25, 0.5, 1.0])
+    args = parser.parse_args()
+
+    sample = load_sample()
+    scored = [(ml_prefilter_score(text), label) for text, label in sample]
+    totals = Counter(label for _, label in scored)
+    ml_papers = len(scored) - totals["none"]
+
+    long_text = " ".join(text for text, _ in sample)[:FULL_TEXT_CHARS]
+    score_seconds = min(timeit.repeat(lambda: ml_prefilter_score(long_text), number=20, repeat=5)) / 20
+
+    print("=" * 60)
+    print("Keyword Pre-filter Report")
+    print("=" * 60)
+    print(f"  Sample: {len(scored)} papers, {ml_papers} labelled with ML"
+          f" ({', '.join(f'{label}: {count}' for label, count in totals.most_common())})")
+    print(f"  Scoring: {score_seconds * 1e3:.2f} ms per {FULL_TEXT_CHARS:,}-char paper;"
+          f" LLM: {args.llm_seconds:.1f} s per paper")
+
+    print(f"\n  {'Threshold':>9}  {'Sent to LLM':>11}  {'ML recall':>9}  {'substantial':>11}  {'minimal':>7}  {'LLM time saved':>14}")
+    for threshold in args.thresholds:
+        routed = Counter(label for score, label in scored if score >= threshold)
+        sent = sum(routed.values())
+        recall = (sent - routed["none"]) / ml_papers
+        saved = (len(scored) - sent) * args.llm_seconds - len(scored) * score_seconds
+        print(f"  {threshold:>9.3f}  {sent / len(scored):>11.0%}  {recall:>9.0%}"
+              f"  {routed['substantial'] / totals['substantial']:>11.0%}"
+              f"  {routed['minimal'] / totals['minimal']:>7.0%}"
+              f"  {saved / (len(scored) * args.llm_seconds):>14.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Error report of the bounded-memory counters against exact counts.
+
+For each high-cardinality list field, counts every entry with an exact
+Counter and with a sketches.SketchCounter of each --capacity, as
+ImpactIndicatorsAccumulator and AdditionalInfoAccumulator do with a
+capacity. Reports, per field and capacity:
+
+  Distinct     exact distinct entries, and the HyperLogLog estimate's error
+  Top-k        share of the exact top --top entries the sketch returns
+  Count error  largest overestimate among those it returns, against the
+               Space-Saving bound of total / capacity
+  Kept         entries held by the sketch, against the exact Counter's
+
+Fields come from the labelled sample in data/ml_output and data/nonml_output
+(ml_frameworks, sources_of_inspiration), from impact files given with
+--input (real_world_applications, funding_sources, collaborations,
+keywords), and from a synthetic Zipf-distributed keyword stream of
+--synthetic entries.
+
+    python benchmarks/bench_sketches.py --input data/extracted_impact/*_impact.jsonl --capacity 100 1000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import sketches
+
+SAMPLE_DIRS = [ROOT / "data" / "ml_output", ROOT / "data" / "nonml_output"]
+SAMPLE_FIELDS = [("ml_frameworks",), ("sources_of_inspiration",)]
+IMPACT_FIELDS = [("impact_indicators", "real_world_applications"), ("additional_info", "funding_sources"),
+                 ("additional_info", "collaborations"), ("additional_info", "keywords")]
+
+
+def list_entries(paths, fields):
+    """Non-empty entries of each list field in the JSONL files, by field name."""
+    entries = {field[-1]: [] for field in fields}
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                for field in fields:
+                    value = record
+                    for key in field:
+                        value = value.get(key) if isinstance(value, dict) else None
+                    entries[field[-1]].extend(entry for entry in value or [] if entry)
+    return entries
+
+
+def zipf_keywords(count: int, vocabulary: int = 1_000_000, exponent: float = 1.1, seed: int = 0):
+    rng = random.Random(seed)
+    weights = [rank ** -exponent for rank in range(1, vocabulary + 1)]
+    return [f"keyword-{rank}" for rank in rng.choices(range(vocabulary), weights=weights, k=count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", type=Path, nargs="+", default=[], help="Impact files to take fields from")
+    parser.add_argument("--synthetic", type=int, default=1_000_000, help="Entries in the synthetic stream (0: none)")
+    parser.add_argument("--capacity", type=int, nargs="+", default=[50, sketches.SKETCH_CAPACITY],
+                        help="SketchCounter capacities to report")
+    parser.add_argument("--top", type=int, default=20, help="Top entries compared")
+    args = parser.parse_args()
+
+    streams = {}
+    sample_files = [path for sample_dir in SAMPLE_DIRS for path in sorted(sample_dir.glob("*_output.jsonl"))]
+    for field, entries in list_entries(sample_files, SAMPLE_FIELDS).items():
+        streams[f"sample {field}"] = entries
+    for field, entries in list_entries(args.input, IMPACT_FIELDS).items():
+        if entries:
+            streams[f"impact {field}"] = entries
+    if args.synthetic:
+        streams["synthetic keywords"] = zipf_keywords(args.synthetic)
+
+    print("=" * 60)
+    print("Sketch Error Report")
+    print("=" * 60)
+    print(f"  HyperLogLog: 2**{sketches.HLL_PRECISION} registers,"
+          f" standard error {sketches.HyperLogLog().standard_error():.2%}")
+    print(f"\n  {'Field':<32} {'Capacity':>8} {'Entries':>9} {'Distinct':>9} {'HLL err':>8}"
+          f" {f'Top-{args.top}':>7} {'Count err':>10} {'Kept':>13} {'Seconds':>8}")
+
+    for name, entries in streams.items():
+        exact = Counter(entries)
+        exact_top = exact.most_common(args.top)
+        for capacity in args.capacity:
+            start = time.perf_counter()
+            sketch = sketches.SketchCounter(capacity)
+            sketch.update(entries)
+            seconds = time.perf_counter() - start
+
+            distinct_error = (len(sketch) - len(exact)) / len(exact) if exact else 0
+            found = dict(sketch.most_common(args.top))
+            recall = sum(entry in found for entry, _ in exact_top) / len(exact_top) if exact_top else 1
+            count_error = max((count - exact[entry] for entry, count in found.items()), default=0)
+            bound = len(entries) // capacity
+            kept = len(sketch.heavy_hitters.counts)
+            print(f"  {name:<32} {capacity:>8,} {len(entries):>9,} {len(exact):>9,} {distinct_error:>+8.2%}"
+                  f" {recall:>7.0%} {f'{count_error:,}/{bound:,}':>10} {f'{kept:,}/{len(exact):,}':>13}"
+                  f" {seconds:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Context window use before and after sizing paper text to a token budget.
+
+"Before" cuts every paper to MAX_TEXT_LENGTH characters and leaves num_ctx
+to Ollama's default (--default-context), so a prompt longer than that is
+cut by Ollama without notice. "After" is extract_paper_info: it asks for
+CONTEXT_TOKENS and sizes the text with the field's characters-per-token rate,
+calibrated from the token counts of earlier requests.
+
+Context used is the prompt plus the answer, against the window; the answer
+the budget keeps room for (ANSWER_TOKENS) is mostly left unused by a typical
+answer. Requests go to the fake Ollama, whose tokens are whitespace-separated words.
+Its rates differ from a real tokenizer's, but the calibration follows them
+the same way. With --input, papers come from category files; otherwise from
+a prose field and a field dense with notation.
+
+    python benchmarks/bench_token_budget.py --input data/combined_compressed/Biology.jsonl.gz
+"""
+
+import argparse
+import contextlib
+import gzip
+import io
+import itertools
+import json
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "backend"))
+
+import extract_info
+from stub_servers import FakeOllamaServer
+
+# A full answer of about 400 tokens
+EXTRACTION = json.dumps({"ml_impact_quantification": {
+    "has_ml_usage": True, "ml_contribution_level": "moderate",
+    "attribution_scoring": {"ml_contribution_percent": 40, "domain_insight_percent": 60,
+                            "explanation": "The model ranks candidates that the authors then test. " * 40},
+}})
+# Formulas split into many short tokens, as they do in a real tokenizer
+SYNTHETIC_FIELDS = {
+    "Biology": ["Cells were cultured in growth medium and imaged after two days.",
+                "Expression of the marker gene rose sharply in treated samples."],
+    "Mathematics": ["Let f ( x ) = a_0 + a_1 x + a_2 x ^ 2 for x in [ 0 , 1 ] .",
+                    "Then | f | _ 2 <= C n ^ { 1 / 2 } by ( 3.1 ) ."],
+}
+
+
+def synthetic_papers(field: str, count: int, size: int = 60000):
+    rng = random.Random(field)
+    sentences = SYNTHETIC_FIELDS[field]
+    for i in range(count):
+        text = " ".join(rng.choice(sentences) for _ in range(size // 50))
+        yield {"id": f"{field}-{i}", "text": text, "metadata": {"year": 2021}}
+
+
+def category_papers(path: Path, count: int):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        yield from itertools.islice((json.loads(line) for line in f), count)
+
+
+def context_tokens(body: dict) -> int:
+    """The prompt tokens the fake Ollama counts, before any cache, plus the answer."""
+    return len((body.get("system", "") + "\n" + body["prompt"]).split()) + len(EXTRACTION.split())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", type=Path, nargs="+", help="Category files to take papers from")
+    parser.add_argument("--papers", type=int, default=20, help="Papers per field")
+    parser.add_argument("--default-context", type=int, default=2048, help="Ollama's num_ctx when none is sent")
+    args = parser.parse_args()
+
+    if args.input:
+        fields = {extract_info.category_name(path): list(category_papers(path, args.papers)) for path in args.input}
+    else:
+        fields = {field: list(synthetic_papers(field, args.papers)) for field in SYNTHETIC_FIELDS}
+
+    requests = []
+    with FakeOllamaServer(response=lambda body: requests.append(body) or EXTRACTION) as stub, \
+            contextlib.redirect_stdout(io.StringIO()):
+        extract_info.OLLAMA_BASE_URL = stub.base_url
+        for field, papers in fields.items():
+            for paper in papers:
+                # Before: fixed character limit, no num_ctx
+                user_prompt = extract_info.USER_PROMPT.format(
+                    paper_id=paper.get('id'), year=paper.get('metadata', {}).get('year'), field=field,
+                    text=extract_info.truncate_text(paper.get('text', ''), extract_info.MAX_TEXT_LENGTH))
+                requests.append({"field": field, "run": "before", "system": extract_info.SYSTEM_PROMPT,
+                                 "prompt": user_prompt, "options": {"num_ctx": args.default_context}})
+                extract_info.extract_paper_info(paper, field)
+                requests[-1].update(field=field, run="after")
+
+    print("=" * 60)
+    print("Token Budget Report")
+    print("=" * 60)
+    print(f"  {args.papers} papers per field; before: {extract_info.MAX_TEXT_LENGTH:,} chars,"
+          f" num_ctx {args.default_context:,}; after: num_ctx {extract_info.CONTEXT_TOKENS:,}")
+    print(f"\n  {'Field':<14} {'Run':<7} {'Prompt chars':>12} {'Context used':>13} {'Over window':>12}")
+    for field in fields:
+        for run in ("before", "after"):
+            bodies = [body for body in requests if body.get("field") == field and body.get("run") == run]
+            windows = [body["options"]["num_ctx"] for body in bodies]
+            demand = [context_tokens(body) for body in bodies]
+            used = sum(min(d, w) for d, w in zip(demand, windows)) / sum(windows)
+            over = sum(d > w for d, w in zip(demand, windows))
+            prompt_chars = sum(len(body["prompt"]) for body in bodies) / len(bodies)
+            print(f"  {field:<14} {run:<7} {prompt_chars:>12,.0f} {used:>13.0%} {over:>8}/{len(bodies)}")
+    print(f"\n  Calibrated chars per token: " + ", ".join(
+        f"{field} {extract_info.token_budget.chars_per_token(field):.2f}" for field in fields))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for extract_info.truncate_text on the largest papers.
+
+"Before" is the former truncate_text: it lowercased the whole paper, ran
+str.find once per marker, and concatenated a window after the first mention
+of each marker, overlaps included, then cut the result at MAX_TEXT_LENGTH.
+"After" splits the paper into lines a chunk at a time, matches only short
+lines against a heading pattern, stops once every part has a heading, and
+merges overlapping windows. "Section headings" counts the headings
+find_sections locates that made it into the output.
+
+With --input, the benchmark takes the largest papers from a category file;
+otherwise it builds synthetic papers of a few hundred KB up to 2 MB.
+
+    python benchmarks/bench_truncate_text.py --input data/combined_compressed/Biology.jsonl.gz
+"""
+
+import argparse
+import gzip
+import heapq
+import json
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import extract_info
+
+# Configuration
+SYNTHETIC_SIZES = [100_000, 400_000, 2_000_000]  # Characters
+HEADINGS = ["Abstract", "1. Introduction", "2. Related Work", "3. Materials and Methods",
+            "4. Experiments", "5. Results", "6. Discussion", "7. Conclusions", "References"]
+SENTENCES = [
+    "The model was fitted to the measurements from each site.",
+    "Our approach follows earlier field studies of the same region.",
+    "These results are consistent with the background rate of change.",
+    "An evaluation of the sampling method is given in the supplement.",
+    "Each experiment was repeated three times under the same conditions.",
+    "Further discussion of the algorithm appears in the appendix.",
+    "Samples were stored at four degrees before the assay.",
+]
+
+
+def build_paper(size: int, seed: int = 0) -> str:
+    """A paper with numbered section headings and markers mentioned throughout the body."""
+    rng = random.Random(seed)
+    section_size = size // len(HEADINGS)
+    parts = ["Synthetic Paper on Soil Microbiology"]
+    for heading in HEADINGS:
+        body = []
+        while sum(map(len, body)) < section_size:
+            body.append(" ".join(rng.choice(SENTENCES) for _ in range(6)))
+        parts.append(heading + "\n" + "\n\n".join(body))
+    return "\n\n".join(parts)
+
+
+def largest_papers(path: Path, count: int):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        texts = (json.loads(line).get('text', '') for line in f)
+        return heapq.nlargest(count, texts, key=len)
+
+
+def truncate_text_before(text: str, max_length: int = extract_info.MAX_TEXT_LENGTH) -> str:
+    if len(text) <= max_length:
+        return text
+    intro_markers = ['introduction', 'abstract', 'background']
+    method_markers = ['method', 'approach', 'algorithm', 'model']
+    result_markers = ['result', 'experiment', 'evaluation']
+    conclusion_markers = ['conclusion', 'discussion', 'future work']
+    text_lower = text.lower()
+    parts = []
+    for marker in intro_markers + method_markers + result_markers + conclusion_markers:
+        idx = text_lower.find(marker)
+        if idx != -1:
+            section_start = max(0, idx - 50)
+            section_end = min(len(text), idx + 1500)
+            parts.append(text[section_start:section_end])
+    if parts:
+        combined = "\n...\n".join(parts)
+        if len(combined) <= max_length:
+            return combined
+        return combined[:max_length] + "..."
+    chunk_size = max_length // 2
+    return text[:chunk_size] + "\n...\n" + text[-chunk_size:]
+
+
+def sections_kept(text: str, output: str) -> int:
+    """How many of the section headings in text made it into the output."""
+    starts = extract_info.find_sections(text).values()
+    return sum(text[start:text.find("\n", start)] in output for start in starts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", type=Path, help="Category file to take the largest papers from")
+    parser.add_argument("--largest", type=int, default=5, help="Papers to take with --input")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.input:
+        papers = largest_papers(args.input, args.largest)
+    else:
+        papers = [build_paper(size, seed) for seed, size in enumerate(SYNTHETIC_SIZES)]
+
+    print("=" * 60)
+    print("truncate_text Micro-benchmark")
+    print("=" * 60)
+    print(f"  {len(papers)} papers, max_length {extract_info.MAX_TEXT_LENGTH:,}, best of 5x{args.iterations}")
+
+    for text in papers:
+        print(f"\n  {len(text):,}-char paper:")
+        before_ms = None
+        for label, truncate in [("Before (find per marker)", truncate_text_before),
+                                ("After (heading lines)", extract_info.truncate_text)]:
+            ms = min(timeit.repeat(lambda: truncate(text), number=args.iterations, repeat=5)) / args.iterations * 1e3
+            before_ms = before_ms or ms
+            output = truncate(text)
+            print(f"    {label:<26} {ms:8.3f} ms  ({before_ms / ms:4.1f}x)"
+                  f"  {len(output):,} chars, {sections_kept(text, output)}/4 section headings")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,23 +10,50 @@ Extracts structured information from research papers for the AI Research Impact
 - Impact metrics (citations, media coverage, policy influence)
 """
 
+import argparse
 import json
-import gzip
+import os
+import re
+import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import requests
 from tqdm import tqdm
 
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from utils.insights import ml_prefilter_score
+
+import seekable_gzip
+
 # Configuration
 INPUT_DIR = Path("data/combined_compressed")
 OUTPUT_DIR = Path("data/extracted_impact")
 OLLAMA_BASE_URL = "http://localhost:11434"
 OLLAMA_MODEL = "llama3.1:8b"  # Can use llama3.1, mistral, or other models
-MAX_TEXT_LENGTH = 8000  # Limit text length for LLM processing
+MAX_TEXT_LENGTH = 8000  # Default text limit for truncate_text; requests size the text to CONTEXT_TOKENS
+CONTEXT_TOKENS = 8192  # Context window (num_ctx) of every request; prompt and answer must fit in it
+ANSWER_TOKENS = 2000  # Tokens kept free for the answer about one paper (num_predict)
+CHARS_PER_TOKEN = 3.0  # Estimate until Ollama's token counts calibrate it; low, so the first requests fit
+CONTEXT_MARGIN = 0.05  # Share of the context window left free for estimation error
 BATCH_SIZE = 10  # Process in batches
 SAVE_INTERVAL = 50  # Save progress every N papers
+JOURNAL_COMPACT_RATIO = 4  # Compact a progress journal once it holds this many entries per live one
+JOURNAL_COMPACT_MIN_ENTRIES = 100_000  # ...and more entries than this
+WORKERS = 4  # Concurrent Ollama requests; match OLLAMA_NUM_PARALLEL on the server
+PAPERS_PER_REQUEST = 1  # Papers packed into one Ollama request; 1 disables batching
+BATCH_TEXT_LENGTH = 2000  # Text limit per paper in a batched request
+MIN_TEXT_CHARS = 500  # Paper text a request must have room for; smaller --context-tokens are refused
+PREFILTER_THRESHOLD = None  # Papers with a keyword score below this skip the LLM; None sends every paper
+OLLAMA_ENDPOINTS = []  # (base URL, concurrent requests) per Ollama server; empty uses OLLAMA_BASE_URL with WORKERS
+HEALTH_CHECK_INTERVAL = 10  # Seconds between /api/tags checks of endpoints taken out of rotation
+ENDPOINT_MAX_WAIT = 300  # Seconds a request waits for an endpoint while all of them are down
+OLLAMA_KEEP_ALIVE = "30m"  # Keep the model, and its prompt cache, loaded between requests
 
 # System role definition
 SYSTEM_ROLE = """You are an expert academic analyst specializing in quantifying how machine learning (ML) contributes to scientific breakthroughs and discovery efficiency.
@@ -43,54 +70,92 @@ CRITICAL RULES:
 - If ML is mentioned but not central to outcomes, mark minimal impact
 - Use precise academic language based on what the paper explicitly demonstrates"""
 
-# User prompt template
-USER_PROMPT = """Analyze how machine learning contributed to this research paper's outcomes.
+# Output format for single-paper requests. It goes in the system prompt with
+# SYSTEM_ROLE, so every request starts with the same text, and Ollama can
+# reuse the cached prefix from the previous request instead of evaluating it
+# again
+EXTRACTION_FORMAT = """Extract the following information from the paper in valid JSON format:
 
-Paper ID: {paper_id}
-Year: {year}
-Field: {field}
-
-Paper Text (truncated if needed):
-{text}
-
-Extract the following information in valid JSON format:
-
-{{
-  "ml_impact_quantification": {{
+{
+  "ml_impact_quantification": {
     "has_ml_usage": true/false,
     "ml_contribution_level": "none|minimal|moderate|substantial|critical",
 
-    "attribution_scoring": {{
+    "attribution_scoring": {
       "ml_contribution_percent": 0-100,
       "domain_insight_percent": 0-100,
       "explanation": "Evidence-based explanation of ML vs domain contributions"
-    }},
+    },
 
-    "acceleration_metrics": {{
+    "acceleration_metrics": {
       "provides_acceleration": true/false,
       "estimated_speedup": "e.g., '6 months faster', '10x faster than traditional', 'enabled previously impossible task'",
       "comparison_baseline": "What method ML was compared against, if any",
       "evidence": "Specific claims from paper about speed/time improvements"
-    }},
+    },
 
-    "efficiency_measures": {{
+    "efficiency_measures": {
       "improves_efficiency": true/false,
       "cost_reduction": "e.g., '$100K saved', '50% less compute', 'reduced from 1000 to 100 experiments'",
       "resource_optimization": "Types of resources saved (compute, labor, materials, etc.)",
       "evidence": "Specific efficiency claims from paper"
-    }},
+    },
 
-    "breakthrough_analysis": {{
+    "breakthrough_analysis": {
       "enables_new_capability": true/false,
       "capability_description": "What became possible that wasn't before",
       "is_incremental_improvement": true/false,
       "impact_summary": "Overall assessment of ML's role in this research"
-    }}
-  }}
-}}
+    }
+  }
+}
+
+Return ONLY valid JSON. Use null for unavailable information. Be conservative in scoring - only high scores if paper provides explicit evidence."""
+
+SYSTEM_PROMPT = f"{SYSTEM_ROLE}\n\n{EXTRACTION_FORMAT}"
+
+# User prompt template: only what changes from paper to paper, placed last
+USER_PROMPT = """Analyze how machine learning contributed to this research paper's outcomes.
 
+Paper ID: {paper_id}
+Year: {year}
+Field: {field}
+
+Paper Text (truncated if needed):
+{text}"""
+
+# Batched requests: several papers per request, one entry per paper in the answer
+BATCH_FORMAT = """Return one JSON object with a "papers" array holding exactly one entry per paper you are given, each in this format:
+
+{
+  "paper_id": "The Paper ID exactly as given with the paper",
+  "ml_impact_quantification": {
+    "has_ml_usage": true/false,
+    "ml_contribution_level": "none|minimal|moderate|substantial|critical",
+    "attribution_scoring": {"ml_contribution_percent": 0-100, "domain_insight_percent": 0-100, "explanation": "..."},
+    "acceleration_metrics": {"provides_acceleration": true/false, "estimated_speedup": "...", "comparison_baseline": "...", "evidence": "..."},
+    "efficiency_measures": {"improves_efficiency": true/false, "cost_reduction": "...", "resource_optimization": "...", "evidence": "..."},
+    "breakthrough_analysis": {"enables_new_capability": true/false, "capability_description": "...", "is_incremental_improvement": true/false, "impact_summary": "..."}
+  }
+}
+
+Analyze each paper on its own text only. For papers without ML usage, set "has_ml_usage" to false, "ml_contribution_level" to "none" and leave out the other sections.
 Return ONLY valid JSON. Use null for unavailable information. Be conservative in scoring - only high scores if paper provides explicit evidence."""
 
+BATCH_SYSTEM_PROMPT = f"{SYSTEM_ROLE}\n\n{BATCH_FORMAT}"
+
+BATCH_PROMPT = """Analyze how machine learning contributed to the outcomes of each of these research papers.
+
+Field: {field}
+Papers: {count}
+
+{papers}"""
+
+BATCH_PAPER = """### Paper ID: {paper_id}
+Year: {year}
+
+{text}"""
+
 
 def setup_output_dir():
     """Create output directory structure."""
@@ -122,21 +187,314 @@ def check_ollama_available():
         return False
 
 
-def call_ollama(system_role: str, user_prompt: str, max_retries: int = 3) -> Optional[Dict]:
-    """Call Ollama API to extract information with system and user roles."""
+_thread_local = threading.local()
+
+
+def get_session() -> requests.Session:
+    """One HTTP session per worker thread, so connections to Ollama are reused."""
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = _thread_local.session = requests.Session()
+    return session
+
+
+def ollama_has_model(base_url: str) -> bool:
+    """Whether the Ollama server at base_url answers /api/tags and has OLLAMA_MODEL."""
+    try:
+        response = requests.get(f"{base_url}/api/tags", timeout=5)
+        if response.status_code != 200:
+            return False
+        return any(OLLAMA_MODEL in m['name'] for m in response.json().get('models', []))
+    except (requests.exceptions.RequestException, ValueError, KeyError):
+        return False
+
+
+class OllamaEndpoint:
+    """One Ollama server in an EndpointPool."""
+
+    def __init__(self, base_url: str, concurrency: int):
+        self.base_url = base_url.rstrip('/')
+        self.concurrency = concurrency
+        self.in_flight = 0
+        self.healthy = True
+        self.requests = 0
+        self.failures = 0
+
+
+class EndpointsUnavailable(RuntimeError):
+    """Every Ollama endpoint stayed down for ENDPOINT_MAX_WAIT seconds."""
+
+
+class EndpointPool:
+    """
+    Spreads Ollama requests over several servers.
+
+    Each request goes to the healthy endpoint with the most free slots, and
+    waits while every healthy endpoint is at its concurrency limit. An
+    endpoint that refuses a connection or times out is taken out of rotation,
+    and a background thread polls /api/tags on it until it answers with the
+    model available again.
+    """
+
+    def __init__(self, endpoints: List[Tuple[str, int]], health_check_interval: float = HEALTH_CHECK_INTERVAL,
+                 max_wait: float = ENDPOINT_MAX_WAIT):
+        self.endpoints = [OllamaEndpoint(base_url, concurrency) for base_url, concurrency in endpoints]
+        self.health_check_interval = health_check_interval
+        self.max_wait = max_wait
+        self._condition = threading.Condition()
+        self._closed = threading.Event()
+        self._health_thread = None
+
+    @property
+    def capacity(self) -> int:
+        """Concurrent requests across all endpoints."""
+        return sum(endpoint.concurrency for endpoint in self.endpoints)
+
+    @property
+    def healthy_capacity(self) -> int:
+        """Concurrent requests across the endpoints in rotation."""
+        with self._condition:
+            return sum(endpoint.concurrency for endpoint in self.endpoints if endpoint.healthy)
+
+    def check(self) -> List[OllamaEndpoint]:
+        """Check every endpoint now, and return the healthy ones."""
+        for endpoint in self.endpoints:
+            healthy = ollama_has_model(endpoint.base_url)
+            with self._condition:
+                endpoint.healthy = healthy
+                if not healthy:
+                    self._start_health_checks()
+                self._condition.notify_all()
+        return [endpoint for endpoint in self.endpoints if endpoint.healthy]
+
+    def acquire(self) -> OllamaEndpoint:
+        """Take a request slot on the least busy healthy endpoint, waiting for one if needed."""
+        deadline = time.monotonic() + self.max_wait
+        with self._condition:
+            while True:
+                free = [e for e in self.endpoints if e.healthy and e.in_flight < e.concurrency]
+                if free:
+                    endpoint = min(free, key=lambda e: e.in_flight / e.concurrency)
+                    endpoint.in_flight += 1
+                    endpoint.requests += 1
+                    return endpoint
+
+                if any(e.healthy for e in self.endpoints):
+                    # Busy, not down: wait for a slot as long as it takes
+                    deadline = time.monotonic() + self.max_wait
+                    self._condition.wait()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise EndpointsUnavailable(f"No Ollama endpoint available for {self.max_wait:.0f}s")
+                self._condition.wait(remaining)
+
+    def release(self, endpoint: OllamaEndpoint, failed: bool = False):
+        """Return a request slot; `failed` takes the endpoint out of rotation."""
+        with self._condition:
+            endpoint.in_flight -= 1
+            if failed and endpoint.healthy:
+                endpoint.healthy = False
+                endpoint.failures += 1
+                print(f"  ⚠️  Ollama endpoint {endpoint.base_url} is not responding; failing over")
+                self._start_health_checks()
+            self._condition.notify_all()
+
+    def _start_health_checks(self):
+        # Called with the condition held
+        if self._health_thread is None and not self._closed.is_set():
+            self._health_thread = threading.Thread(target=self._health_loop, daemon=True)
+            self._health_thread.start()
+
+    def _health_loop(self):
+        while not self._closed.wait(self.health_check_interval):
+            with self._condition:
+                down = [endpoint for endpoint in self.endpoints if not endpoint.healthy]
+                if not down:
+                    self._health_thread = None
+                    return
+            for endpoint in down:
+                if ollama_has_model(endpoint.base_url):
+                    with self._condition:
+                        endpoint.healthy = True
+                        self._condition.notify_all()
+                    print(f"  ✓ Ollama endpoint {endpoint.base_url} is back")
+
+    def close(self):
+        self._closed.set()
+
+
+# Set by main() when OLLAMA_ENDPOINTS lists servers; call_ollama uses OLLAMA_BASE_URL otherwise
+endpoint_pool: Optional[EndpointPool] = None
+
+
+class OllamaMetrics:
+    """
+    Token counts and timings from Ollama's response metadata.
+
+    Ollama reports how many prompt tokens it evaluated for each request
+    (prompt_eval_count) and how long that took, and the same for generated
+    tokens (eval_count). Prompt tokens it could take from the cached prefix
+    of the previous request are not evaluated again, so evaluated tokens per
+    1,000 prompt characters show how much of the prompt the cache covers.
+    Durations are in nanoseconds, as Ollama reports them. The context used
+    by a request is its estimated prompt tokens, cached or not, plus the
+    tokens generated, against the num_ctx it asked for.
+    """
+
+    FIELDS = ('prompt_eval_count', 'prompt_eval_duration', 'eval_count', 'eval_duration',
+              'load_duration', 'total_duration')
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self.requests = 0
+        self.prompt_chars = 0
+        self.totals = dict.fromkeys(self.FIELDS, 0)
+        self.context_tokens = 0
+        self.num_ctx = 0
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8') if path else None
+
+    def record(self, result: Dict, prompt_chars: int, prompt_tokens: float = 0, num_ctx: int = 0):
+        """Add one /api/generate response; with a path, also append it there as a JSON line."""
+        entry = {field: result.get(field) or 0 for field in self.FIELDS}
+        context = {'context_tokens': round(prompt_tokens) + entry['eval_count'], 'num_ctx': num_ctx}
+        with self._lock:
+            self.requests += 1
+            self.prompt_chars += prompt_chars
+            for field, value in entry.items():
+                self.totals[field] += value
+            self.context_tokens += context['context_tokens']
+            self.num_ctx += num_ctx
+            if self._file:
+                record = {'timestamp': datetime.utcnow().isoformat(), 'prompt_chars': prompt_chars,
+                          **entry, **context}
+                self._file.write(json.dumps(record) + '\n')
+                self._file.flush()
+
+    def summary(self) -> Dict:
+        """Per-request averages, with durations in milliseconds."""
+        requests = max(self.requests, 1)
+        return {
+            'requests': self.requests,
+            'prompt_chars': self.prompt_chars / requests,
+            'prompt_tokens_evaluated': self.totals['prompt_eval_count'] / requests,
+            'prompt_tokens_per_1k_chars': self.totals['prompt_eval_count'] / max(self.prompt_chars, 1) * 1000,
+            'prompt_eval_ms': self.totals['prompt_eval_duration'] / requests / 1e6,
+            'output_tokens': self.totals['eval_count'] / requests,
+            'eval_ms': self.totals['eval_duration'] / requests / 1e6,
+            'load_ms': self.totals['load_duration'] / requests / 1e6,
+            'context_tokens': self.context_tokens / requests,
+            'context_used': self.context_tokens / max(self.num_ctx, 1),
+        }
+
+    def print_summary(self):
+        summary = self.summary()
+        print(f"\n  Ollama metrics ({summary['requests']:,} requests, averages per request):")
+        print(f"    Prompt: {summary['prompt_chars']:,.0f} chars, {summary['prompt_tokens_evaluated']:,.1f} tokens"
+              f" evaluated ({summary['prompt_tokens_per_1k_chars']:.1f} per 1k chars) in {summary['prompt_eval_ms']:,.0f} ms")
+        print(f"    Output: {summary['output_tokens']:,.1f} tokens in {summary['eval_ms']:,.0f} ms")
+        print(f"    Model load: {summary['load_ms']:,.0f} ms")
+        print(f"    Context: {summary['context_tokens']:,.0f} tokens, {summary['context_used']:.0%} of num_ctx")
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+# Set by main() with --metrics-file
+ollama_metrics: Optional[OllamaMetrics] = None
+
+
+class TokenBudget:
+    """
+    How much paper text fits in the context window, per field.
+
+    Ollama reports how many prompt tokens each request took, which calibrates
+    a characters-per-token rate for the user prompt of each field (the
+    paper's category): text dense with notation, as in mathematics, takes
+    more tokens per character than prose. Until a field has been seen, the
+    rate is CHARS_PER_TOKEN, and that estimate keeps the weight of
+    `prior_tokens` tokens, so the first few requests cannot swing it far.
+    The system prompt is the same for every field and is estimated at
+    CHARS_PER_TOKEN.
+
+    When Ollama takes the shared system prompt from its cache, only the user
+    prompt is counted. A count is matched to the user prompt alone or to the
+    whole prompt, whichever the estimates predict more closely.
+    """
+
+    def __init__(self, context_tokens: int = CONTEXT_TOKENS, chars_per_token: float = CHARS_PER_TOKEN,
+                 margin: float = CONTEXT_MARGIN, prior_tokens: int = 500):
+        self.context_tokens = context_tokens
+        self.default_chars_per_token = chars_per_token
+        self.margin = margin
+        self.prior_tokens = prior_tokens
+        self._observed: Dict[str, List[int]] = {}  # field -> [characters, tokens]
+        self._lock = threading.Lock()
+
+    def chars_per_token(self, field: str) -> float:
+        chars, tokens = self._observed.get(field, (0, 0))
+        return (chars + self.default_chars_per_token * self.prior_tokens) / (tokens + self.prior_tokens)
+
+    def tokens(self, field: str, system_chars: int, prompt_chars: int) -> float:
+        """Estimated tokens in a request's system and user prompts."""
+        return system_chars / self.default_chars_per_token + prompt_chars / self.chars_per_token(field)
+
+    def record(self, field: str, system_chars: int, prompt_chars: int, prompt_eval_count: int):
+        """Calibrate the field's rate with the prompt tokens Ollama evaluated for one request."""
+        if prompt_eval_count <= 0:
+            return
+        with self._lock:
+            prompt_only = self.tokens(field, 0, prompt_chars)
+            whole = self.tokens(field, system_chars, prompt_chars)
+            if abs(prompt_eval_count - prompt_only) > abs(prompt_eval_count - whole):
+                prompt_eval_count -= whole - prompt_only
+            observed = self._observed.setdefault(field, [0, 0])
+            observed[0] += prompt_chars
+            observed[1] += max(prompt_eval_count, 1)
+
+    def text_chars(self, field: str, system_chars: int, prompt_chars: int, answer_tokens: int) -> int:
+        """Characters of paper text that fit beside the rest of the prompt and the answer."""
+        tokens = self.context_tokens * (1 - self.margin) - answer_tokens - self.tokens(field, system_chars, prompt_chars)
+        return max(0, int(tokens * self.chars_per_token(field)))
+
+
+# Replaced by main() with --context-tokens
+token_budget = TokenBudget()
+
+
+def call_ollama(system_role: str, user_prompt: str, max_retries: int = 3, num_predict: int = ANSWER_TOKENS,
+                field: Optional[str] = None) -> Optional[Dict]:
+    """
+    Call Ollama API to extract information with system and user roles.
+
+    Every request asks for a context window of token_budget.context_tokens.
+    With a field, the prompt token count in the answer calibrates that
+    field's characters-per-token rate.
+
+    With an endpoint pool, each attempt goes to the least busy healthy
+    endpoint, so an attempt that finds its endpoint down is retried on
+    another one.
+    """
     for attempt in range(max_retries):
+        endpoint = endpoint_pool.acquire() if endpoint_pool else None
+        endpoint_failed = False
         try:
-            response = requests.post(
-                f"{OLLAMA_BASE_URL}/api/generate",
+            response = get_session().post(
+                f"{endpoint.base_url if endpoint else OLLAMA_BASE_URL}/api/generate",
                 json={
                     "model": OLLAMA_MODEL,
                     "system": system_role,
                     "prompt": user_prompt,
                     "stream": False,
                     "format": "json",
+                    "keep_alive": OLLAMA_KEEP_ALIVE,
                     "options": {
                         "temperature": 0.1,  # Low temperature for more consistent extraction
-                        "num_predict": 2000  # Max tokens for response
+                        "num_predict": num_predict,  # Max tokens for response
+                        "num_ctx": token_budget.context_tokens
                     }
                 },
                 timeout=120
@@ -145,6 +503,12 @@ def call_ollama(system_role: str, user_prompt: str, max_retries: int = 3) -> Opt
             if response.status_code == 200:
                 result = response.json()
                 response_text = result.get('response', '{}')
+                if field:
+                    token_budget.record(field, len(system_role), len(user_prompt), result.get('prompt_eval_count') or 0)
+                if ollama_metrics:
+                    prompt_tokens = token_budget.tokens(field or '', len(system_role), len(user_prompt))
+                    ollama_metrics.record(result, len(system_role) + len(user_prompt),
+                                          prompt_tokens, token_budget.context_tokens)
 
                 # Try to parse JSON response
                 try:
@@ -153,7 +517,6 @@ def call_ollama(system_role: str, user_prompt: str, max_retries: int = 3) -> Opt
                 except json.JSONDecodeError as e:
                     print(f"  ⚠️  JSON parse error (attempt {attempt + 1}): {e}")
                     # Try to extract JSON from response
-                    import re
                     json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
                     if json_match:
                         try:
@@ -168,51 +531,129 @@ def call_ollama(system_role: str, user_prompt: str, max_retries: int = 3) -> Opt
                 print(f"  ⚠️  Ollama API error (attempt {attempt + 1}): {response.status_code}")
 
         except requests.exceptions.Timeout:
+            endpoint_failed = True
             print(f"  ⚠️  Timeout (attempt {attempt + 1})")
+        except requests.exceptions.ConnectionError as e:
+            endpoint_failed = True
+            print(f"  ⚠️  Connection error (attempt {attempt + 1}): {e}")
         except Exception as e:
             print(f"  ⚠️  Error (attempt {attempt + 1}): {e}")
+        finally:
+            if endpoint:
+                endpoint_pool.release(endpoint, failed=endpoint_failed)
 
-        if attempt < max_retries - 1:
+        # Failing over needs no backoff; acquire() waits while every endpoint is down
+        if attempt < max_retries - 1 and not (endpoint and endpoint_failed):
             time.sleep(2 ** attempt)  # Exponential backoff
 
     return None
 
 
+# Section markers, grouped by the part of the paper they start
+SECTION_MARKERS = {
+    'introduction': ['introduction', 'abstract', 'background'],
+    'methods': ['method', 'approach', 'algorithm', 'model'],
+    'results': ['result', 'experiment', 'evaluation'],
+    'conclusion': ['conclusion', 'discussion', 'future work'],
+}
+SECTION_CONTEXT = 50  # Characters kept from before a section start
+SECTION_SEPARATOR = "\n...\n"
+HEADING_MAX_LENGTH = 60  # Longer lines are running text
+HEADING_SCAN_CHUNK = 65536  # Characters split into lines at a time
+
+# A heading line: numbering ("3", "2.1.", "IV."), up to two words that are not
+# markers themselves ("Materials and Methods"), the marker, and up to three
+# more words ("Results and Discussion", which starts the results, not the
+# conclusion)
+_MARKER_GROUPS = {marker: group for group, markers in SECTION_MARKERS.items() for marker in markers}
+_MARKER_ALTERNATION = '|'.join(re.escape(m) for m in _MARKER_GROUPS)
+_HEADING_LINE = re.compile(
+    r'[ \t]*(?:(?:\d+(?:\.\d+)*|[ivx]+)\.?[ \t]+)?'
+    r'(?:(?!' + _MARKER_ALTERNATION + r')[a-z]+[ \t]+){0,2}'
+    r'(' + _MARKER_ALTERNATION + r')'
+    r'[a-z]*(?:[ \t]+[a-z]+){0,3}[ \t]*[:.]?[ \t]*',
+    re.IGNORECASE,
+)
+
+
+def find_sections(text: str) -> Dict[str, int]:
+    """
+    Start offset of each part of the paper in SECTION_MARKERS that can be found.
+
+    A part starts at the first heading line titled with one of its markers.
+    The text is split into lines a chunk at a time and only short lines are
+    matched, so the paper is read once, mentions of "model" in the body cost
+    nothing, and reading stops once every part has a heading, usually before
+    the references. A part without a heading, as in text that lost its line
+    breaks, falls back to the first mention of any of its markers.
+    """
+    starts = {}
+    chunk_start = 0
+    while chunk_start < len(text) and len(starts) < len(SECTION_MARKERS):
+        chunk_end = text.find('\n', chunk_start + HEADING_SCAN_CHUNK)
+        if chunk_end == -1:
+            chunk_end = len(text)
+        lines = text[chunk_start:chunk_end].split('\n')
+        for number, line in enumerate(lines):
+            if 0 < len(line) <= HEADING_MAX_LENGTH:
+                match = _HEADING_LINE.fullmatch(line)
+                group = match and _MARKER_GROUPS[match.group(1).lower()]
+                if group and group not in starts:
+                    starts[group] = chunk_start + sum(map(len, lines[:number])) + number
+        chunk_start = chunk_end + 1
+
+    if len(starts) < len(SECTION_MARKERS):
+        text_lower = text.lower()
+        for group, markers in SECTION_MARKERS.items():
+            if group not in starts:
+                mentions = [i for i in (text_lower.find(m) for m in markers) if i != -1]
+                if mentions:
+                    starts[group] = min(mentions)
+    return starts
+
+
 def truncate_text(text: str, max_length: int = MAX_TEXT_LENGTH) -> str:
-    """Truncate text to max length, trying to preserve important sections."""
+    """
+    Truncate text to max length, trying to preserve important sections.
+
+    Each section found gets an equal share of max_length, starting just
+    before its heading. Windows that overlap are merged, so no text is sent
+    twice, and the result keeps the paper's order. The result is never
+    longer than max_length; with no room, it is empty.
+    """
     if len(text) <= max_length:
         return text
-
-    # Try to get introduction, methods, and conclusion
-    sections = []
-
-    # Look for common section markers
-    intro_markers = ['introduction', 'abstract', 'background']
-    method_markers = ['method', 'approach', 'algorithm', 'model']
-    result_markers = ['result', 'experiment', 'evaluation']
-    conclusion_markers = ['conclusion', 'discussion', 'future work']
-
-    text_lower = text.lower()
-
-    # Try to find key sections
-    parts = []
-    for marker in intro_markers + method_markers + result_markers + conclusion_markers:
-        idx = text_lower.find(marker)
-        if idx != -1:
-            # Get section starting from marker
-            section_start = max(0, idx - 50)
-            section_end = min(len(text), idx + 1500)
-            parts.append(text[section_start:section_end])
-
-    if parts:
-        combined = "\n...\n".join(parts)
-        if len(combined) <= max_length:
-            return combined
-        return combined[:max_length] + "..."
+    if max_length <= 0:
+        return ''
+
+    starts = sorted(find_sections(text).values())
+    window = (max_length - len(SECTION_SEPARATOR) * (len(starts) - 1)) // len(starts) if starts else 0
+    if window > 0:
+        spans = []
+        for start in starts:
+            start = max(0, start - SECTION_CONTEXT)
+            end = min(len(text), start + window)
+            if spans and start <= spans[-1][1]:
+                spans[-1][1] = max(spans[-1][1], end)
+            else:
+                spans.append([start, end])
+        return SECTION_SEPARATOR.join(text[start:end] for start, end in spans)
 
     # Fallback: take beginning and end
-    chunk_size = max_length // 2
-    return text[:chunk_size] + "\n...\n" + text[-chunk_size:]
+    chunk_size = (max_length - len(SECTION_SEPARATOR)) // 2
+    if chunk_size <= 0:
+        return text[:max_length]
+    return text[:chunk_size] + SECTION_SEPARATOR + text[-chunk_size:]
+
+
+def annotate_extraction(extracted: Dict, paper: Dict, category: str) -> Dict:
+    """Add the paper's metadata to an extraction result."""
+    extracted['_paper_id'] = paper.get('id', 'unknown')
+    extracted['_year'] = paper.get('metadata', {}).get('year', 'unknown')
+    extracted['_category'] = category
+    extracted['_source_file'] = paper.get('_source_file', '')
+    extracted['_extraction_timestamp'] = datetime.utcnow().isoformat()
+    return extracted
 
 
 def extract_paper_info(paper: Dict, category: str) -> Optional[Dict]:
@@ -222,8 +663,9 @@ def extract_paper_info(paper: Dict, category: str) -> Optional[Dict]:
     metadata = paper.get('metadata', {})
     year = metadata.get('year', 'unknown')
 
-    # Truncate text if needed
-    truncated_text = truncate_text(text)
+    # Truncate text to what the context window has room for
+    prompt_chars = len(USER_PROMPT.format(paper_id=paper_id, year=year, field=category, text=''))
+    truncated_text = truncate_text(text, paper_text_length(token_budget, category, prompt_chars))
 
     # Build user prompt
     user_prompt = USER_PROMPT.format(
@@ -234,131 +676,518 @@ def extract_paper_info(paper: Dict, category: str) -> Optional[Dict]:
     )
 
     # Call Ollama with system role and user prompt
-    extracted = call_ollama(SYSTEM_ROLE, user_prompt)
+    extracted = call_ollama(SYSTEM_PROMPT, user_prompt, field=category)
 
     if extracted:
-        # Add metadata
-        extracted['_paper_id'] = paper_id
-        extracted['_year'] = year
-        extracted['_category'] = category
-        extracted['_source_file'] = paper.get('_source_file', '')
-        extracted['_extraction_timestamp'] = datetime.utcnow().isoformat()
-
-        return extracted
+        return annotate_extraction(extracted, paper, category)
 
     return None
 
 
-def process_category_file(category_file: Path, category: str):
-    """Process all papers in a category file."""
+def prefiltered_record(paper: Dict, category: str, score: float, threshold: float) -> Dict:
+    """The "none" record written for a paper the keyword pre-filter keeps away from the LLM."""
+    record = {
+        'ml_impact_quantification': {'has_ml_usage': False, 'ml_contribution_level': 'none'},
+        '_prefilter': {'score': score, 'threshold': threshold},
+    }
+    return annotate_extraction(record, paper, category)
+
+
+def paper_text_length(budget: TokenBudget, category: str, prompt_chars: int = len(USER_PROMPT)) -> int:
+    """Characters of text a request about one paper has room for."""
+    return budget.text_chars(category, len(SYSTEM_PROMPT), prompt_chars, ANSWER_TOKENS)
+
+
+def batch_text_length(budget: TokenBudget, category: str, count: int) -> Tuple[int, int]:
+    """The answer tokens (num_predict) of a request about count papers, and the characters of text each gets."""
+    num_predict = min(ANSWER_TOKENS * count, budget.context_tokens // 2)
+    prompt_chars = len(BATCH_PROMPT) + (len(BATCH_PAPER) + 2) * count
+    text_chars = budget.text_chars(category, len(BATCH_SYSTEM_PROMPT), prompt_chars, num_predict)
+    return num_predict, min(BATCH_TEXT_LENGTH, text_chars // count)
+
+
+def extract_batch_info(papers: List[Dict], category: str) -> List[Optional[Dict]]:
+    """
+    Extract impact information from several papers with one Ollama request.
+
+    Each paper's text is cut to BATCH_TEXT_LENGTH, or to its share of the
+    context window if that is smaller, and the model answers with a "papers"
+    array keyed by paper ID. Papers missing from the answer, or
+    whose entry is malformed, are extracted again one at a time. Returns one
+    result per paper, in input order.
+    """
+    if len(papers) == 1:
+        return [extract_paper_info(papers[0], category)]
+
+    num_predict, text_length = batch_text_length(token_budget, category, len(papers))
+    blocks = [
+        BATCH_PAPER.format(
+            paper_id=paper.get('id', 'unknown'),
+            year=paper.get('metadata', {}).get('year', 'unknown'),
+            text=truncate_text(paper.get('text', ''), text_length)
+        )
+        for paper in papers
+    ]
+    user_prompt = BATCH_PROMPT.format(count=len(papers), field=category, papers="\n\n".join(blocks))
+    response = call_ollama(BATCH_SYSTEM_PROMPT, user_prompt, num_predict=num_predict, field=category)
+
+    # Accept {"papers": [...]} or a bare array
+    entries = response.get('papers') if isinstance(response, dict) else response
+    by_id = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if isinstance(entry, dict) and isinstance(entry.get('ml_impact_quantification'), dict):
+            by_id.setdefault(str(entry.get('paper_id')), entry)
+
+    results = []
+    for paper in papers:
+        entry = by_id.get(str(paper.get('id', 'unknown')))
+        if entry is None:
+            results.append(extract_paper_info(paper, category))
+            continue
+        extracted = {'ml_impact_quantification': entry['ml_impact_quantification']}
+        results.append(annotate_extraction(extracted, paper, category))
+    return results
+
+
+class ProgressJournal:
+    """
+    Append-only log of processed papers.
+
+    Each line holds the paper's byte offset in the decompressed input file, a
+    tab, and its ID as a JSON string. Lines migrated from the old progress
+    format have the ID alone. Recording a paper is a single append, and a
+    crash can at worst leave a torn last line, which load() ignores and
+    open() cuts off before appending.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+        self.live = 0  # Entries the last load() returned
+        self.dead = 0  # Entries it skipped as before the resume offset
+
+    def load(self, min_offset: Optional[int] = None) -> Tuple[set, set]:
+        """
+        Return the (IDs, offsets) of the processed papers.
+
+        Given the resume offset, entries before it are skipped without being
+        decoded and later ones are returned by offset. Without it, for instance
+        when the input file has changed, every entry is returned by ID.
+        Entries without an offset are always returned by ID.
+        """
+        processed_ids, processed_offsets = set(), set()
+        self.live = self.dead = 0
+        if not self.path.exists():
+            return processed_ids, processed_offsets
+
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+
+                offset, tab, encoded_id = line.partition(b'\t')
+                if not tab:
+                    encoded_id, offset = offset, None
+                elif min_offset is not None:
+                    if int(offset) >= min_offset:
+                        processed_offsets.add(int(offset))
+                        self.live += 1
+                    else:
+                        self.dead += 1
+                    continue
+
+                try:
+                    processed_ids.add(json.loads(encoded_id))
+                    self.live += 1
+                except json.JSONDecodeError:
+                    continue
+
+        return processed_ids, processed_offsets
+
+    def _truncate_torn_line(self):
+        """Cut off a last line left incomplete by a crash."""
+        with open(self.path, 'r+b') as f:
+            size = end = f.seek(0, os.SEEK_END)
+            while end > 0:
+                start = max(0, end - 4096)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b'\n')
+                if newline != -1:
+                    end = start + newline + 1
+                    break
+                end = start
+            if end < size:
+                f.truncate(end)
+
+    def needs_compaction(self) -> bool:
+        """Whether the last load() skipped enough entries to be worth a compact()."""
+        entries = self.live + self.dead
+        return entries > JOURNAL_COMPACT_MIN_ENTRIES and entries > JOURNAL_COMPACT_RATIO * self.live
+
+    def compact(self, min_offset: int):
+        """
+        Fold the entries before min_offset into it: atomically rewrite the
+        log without them, as load() skips them anyway.
+
+        min_offset must be a resume offset already saved in the progress
+        file. Entries without an offset are kept. The log is streamed, so
+        memory doesn't grow with it.
+        """
+        tmp_file = self.path.with_suffix('.log.tmp')
+        with open(self.path, 'rb') as src, open(tmp_file, 'wb') as dst:
+            for line in src:
+                if not line.endswith(b'\n'):
+                    break
+                offset, tab, _ = line.partition(b'\t')
+                if not tab or int(offset) >= min_offset:
+                    dst.write(line)
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.replace(tmp_file, self.path)
+        self.dead = 0
+
+    def open(self):
+        if self.path.exists():
+            self._truncate_torn_line()
+        self._file = open(self.path, 'a', encoding='utf-8')
+        return self
+
+    def append(self, paper_id: str, offset: Optional[int] = None):
+        prefix = f"{offset}\t" if offset is not None else ''
+        self._file.write(prefix + json.dumps(paper_id) + '\n')
+        self._file.flush()
+
+    def sync(self):
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def load_progress(progress_file: Path, journal: ProgressJournal) -> Dict:
+    """
+    Read the progress file.
+
+    Progress files written before the journal existed hold a processed_ids
+    list; those IDs are moved into the journal and dropped from the file.
+    """
+    if not progress_file.exists():
+        return {}
+    with open(progress_file, 'r') as f:
+        progress = json.load(f)
+
+    if 'processed_ids' in progress:
+        with journal:
+            for paper_id in progress.pop('processed_ids'):
+                journal.append(paper_id)
+            journal.sync()
+        write_json_atomic(progress_file, progress)
+    return progress
+
+
+def write_json_atomic(path: Path, data: Dict):
+    """Replace a JSON file atomically, so a crash never leaves it half-written."""
+    tmp_file = path.with_suffix('.json.tmp')
+    with open(tmp_file, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_file, path)
+
+
+def save_progress(progress_file: Path, counts: Dict, position: Dict, completed: bool = False):
+    """Write the progress counters and resume position; the processed IDs live in the journal."""
+    progress = {**counts, **position, 'last_update': datetime.utcnow().isoformat()}
+    if completed:
+        progress['completed'] = True
+    write_json_atomic(progress_file, progress)
+
+
+def in_year_range(paper: Dict, years: Tuple[Optional[int], Optional[int]]) -> bool:
+    """Whether the paper's year is in the inclusive (first, last) range; either end may be None."""
+    try:
+        year = int(paper.get('metadata', {}).get('year'))
+    except (TypeError, ValueError):
+        return False
+    first, last = years
+    return (first is None or year >= first) and (last is None or year <= last)
+
+
+def input_signature(path: Path) -> Dict:
+    """Identify an input file version; offsets recorded for another version are void."""
+    stat = path.stat()
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def output_paper_ids(output_file: Path) -> set:
+    """IDs of the papers with a record in an impact file."""
+    paper_ids = set()
+    if output_file.exists():
+        with open(output_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    paper_ids.add(json.loads(line)['_paper_id'])
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    continue
+    return paper_ids
+
+
+def process_category_file(category_file: Path, category: str, workers: int = WORKERS,
+                          papers_per_request: int = PAPERS_PER_REQUEST,
+                          prefilter_threshold: Optional[float] = PREFILTER_THRESHOLD,
+                          shard_index: int = 0, shard_count: int = 1,
+                          years: Optional[Tuple[Optional[int], Optional[int]]] = None,
+                          max_papers: Optional[int] = None):
+    """
+    Process all papers in a category file.
+
+    With `shard_count` above 1, only every shard_count-th line starting at
+    `shard_index` is processed, and outputs and progress are named after the
+    shard. `years` is an inclusive (first, last) range, either end open;
+    papers without a year are left out when it is given. `max_papers` stops
+    the run after that many papers, leaving the category incomplete.
+
+    Up to `workers` requests are in flight at once, each carrying
+    `papers_per_request` papers. With an endpoint pool, that is further
+    limited to the slots of the endpoints in rotation, so papers aren't
+    handed out only to wait for an endpoint that is down. Results are written by this thread only, in
+    completion order, and a paper is marked processed only after its result
+    has been written, so a resumed run redoes whatever was still in flight.
+
+    With a `prefilter_threshold`, papers whose ml_prefilter_score falls below
+    it get a "none" record straight away instead of an LLM request.
+
+    Checkpoints record a resume position: the input offset before which every
+    paper is done. A restart seeks straight there, and skips papers finished
+    out of order past it by their offsets in the journal. Decompression
+    starts at the gzip member that holds the offset (see seekable_gzip), so
+    only a file written as one member is decompressed from its start.
+    Papers that fail, by raising or by extracting nothing, are not marked
+    processed and hold the resume position back, so a rerun retries them.
+    """
     print(f"\n{'='*60}")
     print(f"Processing: {category}")
     print(f"{'='*60}")
 
     # Output files
-    output_file = OUTPUT_DIR / f"{category}_impact.jsonl"
-    progress_file = OUTPUT_DIR / "progress" / f"{category}_progress.json"
-
-    # Load progress if exists
-    processed_ids = set()
-    if progress_file.exists():
-        with open(progress_file, 'r') as f:
-            progress_data = json.load(f)
-            processed_ids = set(progress_data.get('processed_ids', []))
-            print(f"  ✓ Resuming from {len(processed_ids)} processed papers")
-
-    # Count total papers
-    print(f"  Counting papers...")
-    total_papers = 0
-    with gzip.open(category_file, 'rt', encoding='utf-8') as f:
-        for _ in f:
-            total_papers += 1
+    name = category if shard_count == 1 else f"{category}.shard-{shard_index}-of-{shard_count}"
+    output_file = OUTPUT_DIR / f"{name}_impact.jsonl"
+    progress_file = OUTPUT_DIR / "progress" / f"{name}_progress.json"
+    journal = ProgressJournal(OUTPUT_DIR / "progress" / f"{name}_progress.log")
+
+    # Load progress if exists. Offsets and the cached line count only hold
+    # for the input file and paper selection they were recorded against
+    progress = load_progress(progress_file, journal)
+    signature = input_signature(category_file)
+    selection = {'shard': [shard_index, shard_count], 'years': list(years) if years else None}
+    same_input = (progress.get('input') == signature
+                  and progress.get('selection', {'shard': [0, 1], 'years': None}) == selection)
+    resume_offset = progress.get('resume_offset', 0) if same_input else 0
+    resume_line = progress.get('resume_line', 0) if same_input else 0
+    processed_ids, processed_offsets = journal.load(min_offset=resume_offset if same_input else None)
+
+    # Entries before the saved resume offset are only ever skipped, so once
+    # they make up most of the journal they are folded into that offset.
+    # The progress file notes it first, so a crash can't leave it unnoted
+    journal_folded = progress.get('journal_folded', False)
+    if same_input and journal.needs_compaction():
+        journal_folded = progress['journal_folded'] = True
+        write_json_atomic(progress_file, progress)
+        journal.compact(resume_offset)
+    elif journal_folded and not same_input:
+        # Folded papers are no longer in the journal to be matched by ID
+        processed_ids |= output_paper_ids(output_file)
+
+    # The gzip members are where a restart can start decompressing
+    if same_input and 'total_papers' in progress and 'members' in progress:
+        total_papers, members = progress['total_papers'], progress['members']
+    else:
+        print(f"  Counting papers...")
+        members, total_papers = seekable_gzip.scan(category_file)
 
+    if resume_line or processed_ids or processed_offsets:
+        print(f"  ✓ Resuming at paper {resume_line:,}"
+              f" ({len(processed_ids) + len(processed_offsets):,} more already processed)")
     print(f"  Total papers: {total_papers:,}")
-    print(f"  Remaining: {total_papers - len(processed_ids):,}")
+    print(f"  Remaining: {total_papers - resume_line - len(processed_offsets) - len(processed_ids):,}")
+
+    position = {'input': signature, 'selection': selection, 'total_papers': total_papers, 'members': members,
+                'resume_offset': resume_offset, 'resume_line': resume_line, 'journal_folded': journal_folded}
+    if progress.get('completed') and same_input and resume_line >= total_papers:
+        print(f"  ✓ Already complete")
+        return
+    if shard_count > 1:
+        print(f"  Shard: {shard_index} of {shard_count}")
+    if years:
+        print(f"  Years: {years[0] or 'any'} to {years[1] or 'any'}")
+    print(f"  Concurrent requests: {workers}")
+    if papers_per_request > 1:
+        print(f"  Papers per request: {papers_per_request}")
+    if prefilter_threshold is not None:
+        print(f"  Pre-filter threshold: {prefilter_threshold}")
 
     # Process papers
-    papers_processed = 0
-    papers_success = 0
-    papers_failed = 0
+    counts = {'papers_processed': 0, 'papers_success': 0, 'papers_failed': 0, 'papers_prefiltered': 0}
+    in_flight = {}  # Future -> [(paper ID, input offset)] of its batch
+    in_flight_ids = set()
+    batch = []  # Papers waiting to fill the next request
+    # Papers handed to workers and not yet recorded, in input order, as
+    # (offset, line number); the first one is the resume position
+    outstanding = deque()
+    finished_offsets = set()
+    cursor = {'offset': resume_offset, 'line': resume_line}
+    taken = 0  # Papers handed out or pre-filtered in this run, for max_papers
+    stopped_early = False
 
     # Open output file in append mode
     output_mode = 'a' if output_file.exists() else 'w'
 
-    with gzip.open(category_file, 'rt', encoding='utf-8') as f:
-        with open(output_file, output_mode, encoding='utf-8') as out_f:
+    def update_position():
+        while outstanding and outstanding[0][0] in finished_offsets:
+            finished_offsets.remove(outstanding.popleft()[0])
+        offset, line = outstanding[0] if outstanding else (cursor['offset'], cursor['line'])
+        position['resume_offset'], position['resume_line'] = offset, line
 
-            for line in tqdm(f, total=total_papers, desc=f"  {category}"):
-                try:
-                    paper = json.loads(line)
-                    paper_id = paper.get('id', 'unknown')
+    def record(future, out_f):
+        papers = in_flight.pop(future)
+        in_flight_ids.difference_update(paper_id for paper_id, _ in papers)
+        try:
+            results = future.result()
+        except Exception as e:
+            # Left outstanding, so a resumed run retries them
+            for paper_id, _ in papers:
+                print(f"  ✗ Error processing paper {paper_id}: {e}")
+            counts['papers_failed'] += len(papers)
+            return
 
-                    # Skip if already processed
-                    if paper_id in processed_ids:
+        for (paper_id, offset), extracted in zip(papers, results):
+            if not extracted:
+                # Left outstanding and out of the journal, so a resumed run retries it
+                counts['papers_failed'] += 1
+                continue
+            counts['papers_success'] += 1
+            finished_offsets.add(offset)
+            write_record(paper_id, offset, extracted, out_f)
+
+    def write_record(paper_id, offset, record, out_f):
+        # Write to output
+        out_f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        out_f.flush()
+
+        # Mark as processed, after the result is written
+        journal.append(paper_id, offset)
+        counts['papers_processed'] += 1
+
+        # Save progress periodically
+        if counts['papers_processed'] % SAVE_INTERVAL == 0:
+            os.fsync(out_f.fileno())
+            journal.sync()
+            update_position()
+            save_progress(progress_file, counts, position)
+
+    def slots():
+        if endpoint_pool is None:
+            return workers
+        return min(workers, max(1, endpoint_pool.healthy_capacity))
+
+    # Rechecks the slots while waiting, to notice an endpoint coming back
+    slot_wait = endpoint_pool.health_check_interval if endpoint_pool else None
+
+    def submit(out_f):
+        # Wait for a free slot, then hand the batch to a worker
+        while len(in_flight) >= slots():
+            done, _ = wait(in_flight, timeout=slot_wait, return_when=FIRST_COMPLETED)
+            for future in done:
+                record(future, out_f)
+        papers = [paper for paper, _ in batch]
+        in_flight[executor.submit(extract_batch_info, papers, category)] = [
+            (paper.get('id', 'unknown'), offset) for paper, offset in batch
+        ]
+        batch.clear()
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        # Decompresses from the gzip member the resume offset is in, without parsing any JSON
+        with seekable_gzip.open_at(category_file, resume_offset, members) as f:
+            with open(output_file, output_mode, encoding='utf-8') as out_f, journal:
+                for line in tqdm(f, total=total_papers, initial=resume_line, desc=f"  {category}"):
+                    offset, line_number = cursor['offset'], cursor['line']
+                    cursor['offset'] += len(line)
+                    cursor['line'] += 1
+
+                    # Skip other shards' lines unparsed, and papers finished
+                    # past the resume position
+                    if line_number % shard_count != shard_index or offset in processed_offsets:
+                        continue
+                    try:
+                        paper = json.loads(line)
+                    except json.JSONDecodeError:
                         continue
+                    paper_id = paper.get('id', 'unknown')
 
-                    # Extract information
-                    extracted = extract_paper_info(paper, category)
+                    # Skip if outside the year range, already processed or being processed
+                    if years and not in_year_range(paper, years):
+                        continue
+                    if paper_id in processed_ids or paper_id in in_flight_ids:
+                        continue
 
-                    if extracted:
-                        # Write to output
-                        out_f.write(json.dumps(extracted, ensure_ascii=False) + '\n')
-                        out_f.flush()
-                        papers_success += 1
-                    else:
-                        papers_failed += 1
-
-                    # Mark as processed
-                    processed_ids.add(paper_id)
-                    papers_processed += 1
-
-                    # Save progress periodically
-                    if papers_processed % SAVE_INTERVAL == 0:
-                        with open(progress_file, 'w') as pf:
-                            json.dump({
-                                'processed_ids': list(processed_ids),
-                                'papers_processed': papers_processed,
-                                'papers_success': papers_success,
-                                'papers_failed': papers_failed,
-                                'last_update': datetime.utcnow().isoformat()
-                            }, pf)
-
-                    # Small delay to avoid overwhelming Ollama
-                    time.sleep(0.1)
+                    if max_papers is not None and taken >= max_papers:
+                        # This paper is the next one to do
+                        cursor['offset'], cursor['line'] = offset, line_number
+                        stopped_early = True
+                        break
+                    taken += 1
+
+                    # Papers the pre-filter rules out are recorded without an LLM request
+                    if prefilter_threshold is not None:
+                        score = ml_prefilter_score(paper.get('text', ''))
+                        if score < prefilter_threshold:
+                            counts['papers_prefiltered'] += 1
+                            none_record = prefiltered_record(paper, category, score, prefilter_threshold)
+                            write_record(paper_id, offset, none_record, out_f)
+                            continue
+
+                    batch.append((paper, offset))
+                    in_flight_ids.add(paper_id)
+                    outstanding.append((offset, cursor['line'] - 1))
+                    if len(batch) >= papers_per_request:
+                        submit(out_f)
+
+                if batch:
+                    submit(out_f)
+                while in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        record(future, out_f)
 
-                except json.JSONDecodeError:
-                    continue
-                except KeyboardInterrupt:
-                    print(f"\n\n⚠️  Interrupted by user")
-                    # Save progress
-                    with open(progress_file, 'w') as pf:
-                        json.dump({
-                            'processed_ids': list(processed_ids),
-                            'papers_processed': papers_processed,
-                            'papers_success': papers_success,
-                            'papers_failed': papers_failed,
-                            'last_update': datetime.utcnow().isoformat()
-                        }, pf)
-                    raise
-                except Exception as e:
-                    print(f"  ✗ Error processing paper {paper_id}: {e}")
-                    papers_failed += 1
+    except KeyboardInterrupt:
+        print(f"\n\n⚠️  Interrupted by user")
+        # Papers still in flight are redone on resume
+        update_position()
+        save_progress(progress_file, counts, position)
+        raise
+    finally:
+        # Drop queued work; requests already sent finish in the background
+        executor.shutdown(wait=False, cancel_futures=True)
 
     # Final progress save
-    with open(progress_file, 'w') as pf:
-        json.dump({
-            'processed_ids': list(processed_ids),
-            'papers_processed': papers_processed,
-            'papers_success': papers_success,
-            'papers_failed': papers_failed,
-            'last_update': datetime.utcnow().isoformat(),
-            'completed': True
-        }, pf)
+    update_position()
+    save_progress(progress_file, counts, position, completed=not stopped_early)
 
     # Print summary
     print(f"\n  Summary for {category}:")
-    print(f"    ✓ Successfully extracted: {papers_success:,}")
-    print(f"    ✗ Failed: {papers_failed:,}")
+    print(f"    ✓ Successfully extracted: {counts['papers_success']:,}")
+    print(f"    ✗ Failed: {counts['papers_failed']:,}")
+    if prefilter_threshold is not None:
+        print(f"    − Ruled out by pre-filter: {counts['papers_prefiltered']:,}")
+    if stopped_early:
+        print(f"    ⏸ Stopped after {max_papers:,} papers; run again to continue")
     print(f"    → Output: {output_file}")
 
 
@@ -381,6 +1210,7 @@ def generate_extraction_summary():
                 'papers_processed': progress.get('papers_processed', 0),
                 'papers_success': progress.get('papers_success', 0),
                 'papers_failed': progress.get('papers_failed', 0),
+                'papers_prefiltered': progress.get('papers_prefiltered', 0),
                 'completed': progress.get('completed', False)
             }
             summary['total_papers_extracted'] += progress.get('papers_success', 0)
@@ -392,7 +1222,117 @@ def generate_extraction_summary():
     return summary
 
 
-def main():
+def check_ollama_endpoints() -> Optional[EndpointPool]:
+    """Build a pool over OLLAMA_ENDPOINTS; None unless at least one endpoint has the model."""
+    pool = EndpointPool(OLLAMA_ENDPOINTS)
+    healthy = pool.check()
+    for endpoint in pool.endpoints:
+        mark = '✓' if endpoint in healthy else '✗'
+        print(f"{mark} Ollama endpoint {endpoint.base_url} ({endpoint.concurrency} concurrent requests)")
+    if not healthy:
+        pool.close()
+        return None
+    return pool
+
+
+def parse_endpoint(value: str) -> Tuple[str, int]:
+    """Parse URL[=N] into (base URL, concurrent requests); N defaults to WORKERS."""
+    base_url, sep, concurrency = value.rpartition('=')
+    if not sep:
+        return value, WORKERS
+    if not concurrency.isdigit() or int(concurrency) < 1:
+        raise argparse.ArgumentTypeError(f"bad concurrency in {value!r}; expected URL=N")
+    return base_url, int(concurrency)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Extract ML impact information from research papers with Ollama.",
+        epilog="Without --categories, the categories are chosen interactively.",
+    )
+    parser.add_argument('--categories', nargs='+', metavar='NAME',
+                        help="Categories to process, by name (e.g. Biology) or 'all'")
+    parser.add_argument('--shard-index', type=int, default=0, help="Shard to process (default: 0)")
+    parser.add_argument('--shard-count', type=int, default=1,
+                        help="Split every category into this many shards by line (default: 1)")
+    parser.add_argument('--year-from', type=int, help="First publication year to include")
+    parser.add_argument('--year-to', type=int, help="Last publication year to include")
+    parser.add_argument('--workers', type=int, default=WORKERS,
+                        help=f"Concurrent Ollama requests (default: {WORKERS}); ignored with --endpoint")
+    parser.add_argument('--model', default=OLLAMA_MODEL, help=f"Ollama model (default: {OLLAMA_MODEL})")
+    parser.add_argument('--max-papers', type=int, help="Stop each category after this many papers")
+    parser.add_argument('--input-dir', type=Path, default=INPUT_DIR, help=f"Category files (default: {INPUT_DIR})")
+    parser.add_argument('--output-dir', type=Path, default=OUTPUT_DIR, help=f"Results (default: {OUTPUT_DIR})")
+    parser.add_argument('--endpoint', dest='endpoints', action='append', type=parse_endpoint, metavar='URL[=N]',
+                        help="Ollama server taking N concurrent requests; repeat for several servers")
+    parser.add_argument('--papers-per-request', type=int, default=PAPERS_PER_REQUEST,
+                        help=f"Papers batched into one request (default: {PAPERS_PER_REQUEST})")
+    parser.add_argument('--prefilter-threshold', type=float, default=PREFILTER_THRESHOLD,
+                        help="Keyword score below which papers skip the LLM (default: off)")
+    parser.add_argument('--context-tokens', type=int, default=CONTEXT_TOKENS,
+                        help=f"Context window (num_ctx) each request fills (default: {CONTEXT_TOKENS})")
+    parser.add_argument('--metrics-file', type=Path,
+                        help="Append Ollama's token counts and timings for every request to this JSONL file")
+    args = parser.parse_args(argv)
+
+    if not 0 <= args.shard_index < args.shard_count:
+        parser.error("--shard-index must be at least 0 and below --shard-count")
+    for option in ('workers', 'max_papers', 'papers_per_request', 'context_tokens'):
+        value = getattr(args, option)
+        if value is not None and value < 1:
+            parser.error(f"--{option.replace('_', '-')} must be at least 1")
+
+    # At the uncalibrated rate, which is low, so text only gains room as Ollama's counts come in
+    budget = TokenBudget(args.context_tokens)
+    if args.papers_per_request > 1:
+        _, room = batch_text_length(budget, '', args.papers_per_request)
+    else:
+        room = paper_text_length(budget, '')
+    if room < MIN_TEXT_CHARS:
+        parser.error(f"--context-tokens {args.context_tokens} leaves room for {room} characters of paper text "
+                     f"per paper, below {MIN_TEXT_CHARS}; raise --context-tokens or lower --papers-per-request")
+    return args
+
+
+def category_name(category_file: Path) -> str:
+    """Biology for Biology.jsonl.gz."""
+    return category_file.name.split('.', 1)[0]
+
+
+def choose_categories(category_files: List[Path]) -> Optional[List[Path]]:
+    """Ask which categories to process; None to quit."""
+    print("\nCategories:")
+    for i, f in enumerate(category_files, 1):
+        print(f"  {i}. {f.stem}")
+
+    print("\nOptions:")
+    print("  - Enter numbers (e.g., '1,2,3') to process specific categories")
+    print("  - Enter 'all' to process all categories")
+    print("  - Enter 'q' to quit")
+
+    choice = input("\nYour choice: ").strip()
+
+    if choice.lower() == 'q':
+        return None
+
+    if choice.lower() == 'all':
+        return category_files
+    try:
+        indices = [int(x.strip()) - 1 for x in choice.split(',')]
+    except ValueError:
+        print("Invalid input")
+        return None
+    return [category_files[i] for i in indices if 0 <= i < len(category_files)]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    global endpoint_pool, ollama_metrics, token_budget, INPUT_DIR, OUTPUT_DIR, OLLAMA_MODEL, OLLAMA_ENDPOINTS
+
+    args = parse_args(argv)
+    INPUT_DIR, OUTPUT_DIR, OLLAMA_MODEL = args.input_dir, args.output_dir, args.model
+    OLLAMA_ENDPOINTS = args.endpoints or OLLAMA_ENDPOINTS
+    token_budget = TokenBudget(args.context_tokens)
+
     print("=" * 60)
     print("Research Impact Information Extraction")
     print("=" * 60)
@@ -401,51 +1341,48 @@ def main():
     setup_output_dir()
 
     # Check Ollama
-    if not check_ollama_available():
+    workers = args.workers
+    if OLLAMA_ENDPOINTS:
+        endpoint_pool = check_ollama_endpoints()
+        if endpoint_pool is None:
+            print("\n❌ No Ollama endpoint is reachable with the model available")
+            print(f"   Pull the model on each server: ollama pull {OLLAMA_MODEL}")
+            return 1
+        workers = endpoint_pool.capacity
+    elif not check_ollama_available():
         print("\n❌ Please start Ollama and ensure the model is available")
         print(f"   1. Start Ollama: ollama serve")
         print(f"   2. Pull model: ollama pull {OLLAMA_MODEL}")
-        return
+        return 1
 
     # Find category files
-    category_files = list(INPUT_DIR.glob("*.jsonl.gz"))
+    category_files = sorted(INPUT_DIR.glob("*.jsonl.gz"))
 
     if not category_files:
         print(f"\n✗ No category files found in {INPUT_DIR}")
         print(f"  Run combine_categories.py first")
-        return
+        return 1
 
     print(f"\n✓ Found {len(category_files)} category files")
 
-    # Ask which categories to process
-    print("\nCategories:")
-    for i, f in enumerate(category_files, 1):
-        print(f"  {i}. {f.stem}")
-
-    print("\nOptions:")
-    print("  - Enter numbers (e.g., '1,2,3') to process specific categories")
-    print("  - Enter 'all' to process all categories")
-    print("  - Enter 'q' to quit")
-
-    choice = input("\nYour choice: ").strip()
-
-    if choice.lower() == 'q':
-        return
-
-    selected_files = []
-    if choice.lower() == 'all':
+    if args.categories is None:
+        selected_files = choose_categories(category_files)
+        if selected_files is None:
+            return 0
+    elif [name.lower() for name in args.categories] == ['all']:
         selected_files = category_files
     else:
-        try:
-            indices = [int(x.strip()) - 1 for x in choice.split(',')]
-            selected_files = [category_files[i] for i in indices if 0 <= i < len(category_files)]
-        except:
-            print("Invalid input")
-            return
+        by_name = {category_name(f).lower(): f for f in category_files}
+        unknown = [name for name in args.categories if name.lower() not in by_name]
+        if unknown:
+            print(f"\n✗ Unknown categories: {', '.join(unknown)}")
+            print(f"  Available: {', '.join(category_name(f) for f in category_files)}")
+            return 1
+        selected_files = [by_name[name.lower()] for name in args.categories]
 
     if not selected_files:
         print("No files selected")
-        return
+        return 0
 
     # Process each category
     print(f"\n{'='*60}")
@@ -453,13 +1390,29 @@ def main():
     print(f"{'='*60}")
 
     start_time = time.time()
+    years = (args.year_from, args.year_to) if args.year_from is not None or args.year_to is not None else None
+    interrupted = False
+    if args.metrics_file:
+        ollama_metrics = OllamaMetrics(args.metrics_file)
 
     try:
         for category_file in selected_files:
             category = category_file.stem
-            process_category_file(category_file, category)
+            process_category_file(
+                category_file, category, workers=workers,
+                papers_per_request=args.papers_per_request,
+                prefilter_threshold=args.prefilter_threshold,
+                shard_index=args.shard_index, shard_count=args.shard_count,
+                years=years, max_papers=args.max_papers,
+            )
     except KeyboardInterrupt:
         print("\n\n⚠️  Extraction interrupted by user")
+        interrupted = True
+    finally:
+        if endpoint_pool:
+            endpoint_pool.close()
+        if ollama_metrics:
+            ollama_metrics.close()
 
     # Generate summary
     summary = generate_extraction_summary()
@@ -472,8 +1425,12 @@ def main():
     print(f"  Total papers extracted: {summary['total_papers_extracted']:,}")
     print(f"  Time elapsed: {elapsed/60:.1f} minutes")
     print(f"  Output directory: {OUTPUT_DIR}")
+    if ollama_metrics:
+        ollama_metrics.print_summary()
+        print(f"    Per request: {args.metrics_file}")
     print(f"{'='*60}")
+    return 130 if interrupted else 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Columnar store of extracted impact records.
+
+Flattens the nested ml_impact_quantification, reproducibility,
+research_outcomes and impact_indicators structures of every
+<category>_impact.jsonl into typed Parquet files, partitioned by category and
+year:
+
+    data/impact_store/impact/category=Biology/year=2021/part-0.parquet
+
+analyze_extracted_impact.py --store reads only the columns an analysis needs
+and aggregates them with pandas, instead of parsing every JSON line again.
+With --sample, the labelled extractions in data/ml_output and
+data/nonml_output go to data/impact_store/sample, partitioned by source,
+field and year.
+
+Needs pyarrow, and pandas to analyze: pip install -r requirements-store.txt
+
+    python3 impact_store.py
+    python3 impact_store.py --categories Biology Physics --sample
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+# Configuration
+INPUT_DIR = Path("data/extracted_impact")
+STORE_DIR = Path("data/impact_store")
+SAMPLE_DIRS = [Path("data/ml_output"), Path("data/nonml_output")]
+BATCH_ROWS = 100_000  # Records flattened and written at a time
+
+FLAG = pa.bool_()  # Whether the value is truthy, as the JSON analysis tests it
+TEXT = pa.string()
+NUMBER = pa.float64()
+TEXT_LIST = pa.list_(pa.string())
+
+# (column, path to the value in a record, type); a missing or null section
+# counts as empty. `row` is the record's line number in its file, so
+# aggregations can keep the file's order
+IMPACT_COLUMNS = [
+    ('row', None, pa.int64()),
+    ('paper_id', ('_paper_id',), TEXT),
+    ('source_file', ('_source_file',), TEXT),
+    ('extraction_timestamp', ('_extraction_timestamp',), TEXT),
+    ('prefiltered', ('_prefilter',), FLAG),
+    ('has_ml_usage', ('ml_impact_quantification', 'has_ml_usage'), FLAG),
+    ('ml_contribution_level', ('ml_impact_quantification', 'ml_contribution_level'), TEXT),
+    ('ml_contribution_percent', ('ml_impact_quantification', 'attribution_scoring', 'ml_contribution_percent'), NUMBER),
+    ('domain_insight_percent', ('ml_impact_quantification', 'attribution_scoring', 'domain_insight_percent'), NUMBER),
+    ('provides_acceleration', ('ml_impact_quantification', 'acceleration_metrics', 'provides_acceleration'), FLAG),
+    ('estimated_speedup', ('ml_impact_quantification', 'acceleration_metrics', 'estimated_speedup'), TEXT),
+    ('improves_efficiency', ('ml_impact_quantification', 'efficiency_measures', 'improves_efficiency'), FLAG),
+    ('cost_reduction', ('ml_impact_quantification', 'efficiency_measures', 'cost_reduction'), TEXT),
+    ('enables_new_capability', ('ml_impact_quantification', 'breakthrough_analysis', 'enables_new_capability'), FLAG),
+    ('is_incremental_improvement', ('ml_impact_quantification', 'breakthrough_analysis', 'is_incremental_improvement'), FLAG),
+    ('code_available', ('reproducibility', 'code_available'), FLAG),
+    ('code_url', ('reproducibility', 'code_url'), TEXT),
+    ('data_available', ('reproducibility', 'data_available'), FLAG),
+    ('data_url', ('reproducibility', 'data_url'), TEXT),
+    ('has_supplementary', ('reproducibility', 'has_supplementary'), FLAG),
+    ('mentions_replication', ('reproducibility', 'mentions_replication'), FLAG),
+    ('has_clinical_trial', ('research_outcomes', 'has_clinical_trial'), FLAG),
+    ('clinical_trial_ids', ('research_outcomes', 'clinical_trial_ids'), TEXT_LIST),
+    ('has_patent', ('research_outcomes', 'has_patent'), FLAG),
+    ('patent_numbers', ('research_outcomes', 'patent_numbers'), TEXT_LIST),
+    ('mentions_retraction', ('research_outcomes', 'mentions_retraction'), FLAG),
+    ('mentions_correction', ('research_outcomes', 'mentions_correction'), FLAG),
+    ('mentions_media_coverage', ('impact_indicators', 'mentions_media_coverage'), FLAG),
+    ('mentions_policy_influence', ('impact_indicators', 'mentions_policy_influence'), FLAG),
+    ('mentions_industry_adoption', ('impact_indicators', 'mentions_industry_adoption'), FLAG),
+    ('real_world_applications', ('impact_indicators', 'real_world_applications'), TEXT_LIST),
+]
+IMPACT_YEAR = ('_year',)
+# Values of absent keys, as the JSON analysis defaults them
+IMPACT_DEFAULTS = {'ml_contribution_level': 'none'}
+
+SAMPLE_COLUMNS = [
+    ('row', None, pa.int64()),
+    ('title', ('title',), TEXT),
+    ('ml_impact', ('ml_impact',), TEXT),
+    ('code_availability', ('code_availability',), FLAG),
+    ('ml_frameworks', ('ml_frameworks',), TEXT_LIST),
+    ('summary', ('summary',), TEXT),
+    ('methodology', ('methodology',), TEXT),
+    ('statistics', ('statistics',), TEXT),
+    ('research_outcomes', ('research_outcomes',), TEXT),
+    ('sources_of_inspiration', ('sources_of_inspiration',), TEXT_LIST),
+]
+SAMPLE_YEAR = ('year',)
+
+
+def section(record: Dict, path) -> Dict:
+    """The dict at path in a nested record; empty if a key is absent or a section is null."""
+    value = record
+    for key in path:
+        value = value.get(key) if isinstance(value, dict) else None
+    return value if isinstance(value, dict) else {}
+
+
+def to_number(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_text(value) -> Optional[str]:
+    return value if value is None or isinstance(value, str) else json.dumps(value)
+
+
+def to_text_list(value) -> Optional[List[str]]:
+    return [str(item) for item in value if item] if isinstance(value, list) else None
+
+
+def parse_year(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+CONVERTERS = {FLAG: bool, TEXT: to_text, NUMBER: to_number, TEXT_LIST: to_text_list}
+
+
+def schema(columns) -> pa.Schema:
+    return pa.schema([(name, column_type) for name, _, column_type in columns] + [('year', pa.int32())])
+
+
+def record_batches(path: Path, columns, year_path, defaults: Optional[Dict] = None) -> Iterator[pa.RecordBatch]:
+    """
+    Flatten a JSONL file into record batches of BATCH_ROWS rows.
+
+    Each column's section, key and converter are worked out once, and each
+    section of a record is looked up once for all of its columns.
+    """
+    defaults = defaults or {}
+    batch_schema = schema(columns)
+    sections = sorted({record_path[:-1] for _, record_path, _ in columns if record_path} | {year_path[:-1]})
+    plan = [(name, sections.index(record_path[:-1]), record_path[-1], CONVERTERS[column_type],
+             defaults.get(name, False if column_type == FLAG else None))
+            for name, record_path, column_type in columns if record_path]
+    year_plan = (sections.index(year_path[:-1]), year_path[-1])
+
+    def empty():
+        return {name: [] for name in batch_schema.names}
+
+    values = empty()
+    with open(path, 'r', encoding='utf-8') as f:
+        for row, line in enumerate(f):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            found = [section(record, section_path) for section_path in sections]
+            for name, index, key, convert, default in plan:
+                values[name].append(convert(found[index].get(key, default)))
+            values['row'].append(row)
+            values['year'].append(parse_year(found[year_plan[0]].get(year_plan[1])))
+            if len(values['row']) == BATCH_ROWS:
+                yield pa.RecordBatch.from_pydict(values, schema=batch_schema)
+                values = empty()
+    if values['row']:
+        yield pa.RecordBatch.from_pydict(values, schema=batch_schema)
+
+
+def write_partition(batches: Iterator[pa.RecordBatch], batch_schema: pa.Schema, target: Path) -> int:
+    """
+    Write batches under target, partitioned by year, replacing what was there.
+
+    The files are written next to target and swapped in afterwards, so a
+    reader never sees a partly written partition. Returns the rows written.
+    """
+    rows = 0
+
+    def counted():
+        nonlocal rows
+        for batch in batches:
+            rows += batch.num_rows
+            yield batch
+
+    tmp_dir = target.with_name(f".tmp-{target.name}")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    ds.write_dataset(
+        counted(), tmp_dir, schema=batch_schema, format='parquet',
+        partitioning=ds.partitioning(pa.schema([('year', pa.int32())]), flavor='hive'),
+        existing_data_behavior='overwrite_or_ignore',
+    )
+    tmp_dir.mkdir(parents=True, exist_ok=True)  # Nothing is written for an empty file
+    if target.exists():
+        old_dir = target.with_name(f".old-{target.name}")
+        os.replace(target, old_dir)
+        os.replace(tmp_dir, target)
+        shutil.rmtree(old_dir)
+    else:
+        tmp_dir.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_dir, target)
+    return rows
+
+
+def convert_category(category: str, input_dir: Path = INPUT_DIR, store_dir: Path = STORE_DIR) -> int:
+    """Convert <category>_impact.jsonl into the store; returns the records written."""
+    batches = record_batches(input_dir / f"{category}_impact.jsonl", IMPACT_COLUMNS, IMPACT_YEAR,
+                             defaults=IMPACT_DEFAULTS)
+    return write_partition(batches, schema(IMPACT_COLUMNS), store_dir / "impact" / f"category={category}")
+
+
+def convert_sample(sample_dirs: List[Path] = SAMPLE_DIRS, store_dir: Path = STORE_DIR) -> int:
+    """Convert the labelled <field>_output.jsonl extractions into the store; returns the records written."""
+    rows = 0
+    for sample_dir in sample_dirs:
+        for path in sorted(sample_dir.glob("*_output.jsonl")):
+            field = path.name[:-len("_output.jsonl")]
+            batches = record_batches(path, SAMPLE_COLUMNS, SAMPLE_YEAR)
+            target = store_dir / "sample" / f"source={sample_dir.name}" / f"field={field}"
+            rows += write_partition(batches, schema(SAMPLE_COLUMNS), target)
+    return rows
+
+
+def store_categories(store_dir: Path = STORE_DIR) -> List[str]:
+    """Categories in the store."""
+    return sorted(path.name.split('=', 1)[1] for path in (store_dir / "impact").glob("category=*"))
+
+
+def read_category(category: str, columns: List[str], store_dir: Path = STORE_DIR):
+    """A pandas DataFrame with the given columns of a category's records, in file order."""
+    dataset = ds.dataset(store_dir / "impact" / f"category={category}", format='parquet',
+                         partitioning=ds.partitioning(pa.schema([('year', pa.int32())]), flavor='hive'))
+    frame = dataset.to_table(columns=list(dict.fromkeys(['row', *columns]))).to_pandas()
+    return frame.sort_values('row', kind='stable', ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert extracted impact records into a columnar Parquet store.")
+    parser.add_argument('--categories', nargs='+', metavar='NAME', help="Categories to convert (default: all)")
+    parser.add_argument('--input-dir', type=Path, default=INPUT_DIR, help=f"Impact files (default: {INPUT_DIR})")
+    parser.add_argument('--store-dir', type=Path, default=STORE_DIR, help=f"Columnar store (default: {STORE_DIR})")
+    parser.add_argument('--sample', action='store_true', help="Also convert data/ml_output and data/nonml_output")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Impact Columnar Store")
+    print("=" * 60)
+
+    categories = args.categories or sorted(p.name[:-len("_impact.jsonl")] for p in args.input_dir.glob("*_impact.jsonl"))
+    if not categories:
+        print(f"\n✗ No extracted impact files found in {args.input_dir}")
+        return
+
+    start = time.time()
+    for category in categories:
+        rows = convert_category(category, args.input_dir, args.store_dir)
+        print(f"  ✓ {category}: {rows:,} records")
+    if args.sample:
+        rows = convert_sample(store_dir=args.store_dir)
+        print(f"  ✓ Labelled sample: {rows:,} records")
+
+    print(f"\n✓ Store written to {args.store_dir} in {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
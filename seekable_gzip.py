@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Random access into gzip files by decompressed offset.
+
+A gzip file can hold several members back to back, which gzip readers
+decompress as one stream. Each member starts a fresh deflate stream, so
+decompression can start at any member. scan() records where each member
+starts, in the file and in the decompressed stream, and open_at() starts
+at the last member before an offset, decompressing only the part of that
+member before it.
+
+A file written by gzip is a single member, and then the only seek point is
+the start: everything before the offset is decompressed, as GzipFile.seek
+does. repack() rewrites a file as members of MEMBER_BYTES decompressed
+bytes each, split at line ends. Gzip readers read it exactly as before.
+
+    python seekable_gzip.py data/combined/*.jsonl.gz
+"""
+
+import argparse
+import bisect
+import gzip
+import os
+import sys
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator, List, Tuple
+
+# Configuration
+MEMBER_BYTES = 16 * 2**20  # Decompressed bytes per member written by repack(); the most a resume decompresses
+COMPRESS_LEVEL = 6  # gzip's own default; 9 is far slower for a little less size
+READ_BYTES = 2**20
+
+# (offset in the file, offset in the decompressed stream) where a member starts
+Member = Tuple[int, int]
+
+
+def scan(path: Path) -> Tuple[List[Member], int]:
+    """The members of a gzip file, and its number of lines, in one decompressing pass."""
+    members = []
+    next_member = (0, 0)  # Where the next member starts, once it turns out to have data
+    decompressor = zlib.decompressobj(wbits=31)
+    stream_offset = lines = 0
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(READ_BYTES)
+            if not data:
+                return members or [(0, 0)], lines
+            while data:
+                if next_member:
+                    if not data.strip(b'\0'):
+                        break  # Zero padding after the last member
+                    members.append(next_member)
+                    next_member = None
+                chunk = decompressor.decompress(data)
+                stream_offset += len(chunk)
+                lines += chunk.count(b'\n')
+                if not decompressor.eof:
+                    break
+                # The member ended inside data; the rest starts the next one
+                data = decompressor.unused_data
+                next_member = (f.tell() - len(data), stream_offset)
+                decompressor = zlib.decompressobj(wbits=31)
+
+
+@contextmanager
+def open_at(path: Path, offset: int, members: List[Member] = ((0, 0),)) -> Iterator[IO[bytes]]:
+    """The decompressed stream of a gzip file, positioned at offset, starting from the nearest member."""
+    member = bisect.bisect_right([stream_offset for _, stream_offset in members], offset) - 1
+    file_offset, stream_offset = members[max(member, 0)]
+    with open(path, 'rb') as raw:
+        raw.seek(file_offset)
+        with gzip.GzipFile(fileobj=raw, mode='rb') as f:
+            f.seek(offset - stream_offset)
+            yield f
+
+
+def repack(path: Path, member_bytes: int = MEMBER_BYTES) -> int:
+    """Rewrite a gzip file as members of about member_bytes, split at line ends; returns the member count."""
+    tmp_path = path.with_name(path.name + '.tmp')
+    members = 0
+    with gzip.open(path, 'rb') as src, open(tmp_path, 'wb') as dst:
+        while True:
+            data = src.read(member_bytes)
+            if not data:
+                break
+            if not data.endswith(b'\n'):
+                data += src.readline()
+            dst.write(gzip.compress(data, compresslevel=COMPRESS_LEVEL, mtime=0))
+            members += 1
+        dst.flush()
+        os.fsync(dst.fileno())
+    os.replace(tmp_path, path)
+    return members
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('files', type=Path, nargs='+', help="Gzip files to rewrite in place")
+    parser.add_argument('--member-mb', type=float, default=MEMBER_BYTES / 2**20,
+                        help=f"Decompressed megabytes per member (default: {MEMBER_BYTES // 2**20})")
+    args = parser.parse_args(argv)
+
+    for path in args.files:
+        members = repack(path, int(args.member_mb * 2**20))
+        print(f"✓ {path}: {members:,} members")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+Bounded-memory summaries of high-cardinality string counts.
+
+SpaceSaving keeps approximate counts of the most frequent items, and
+HyperLogLog estimates how many distinct items there are. SketchCounter puts
+the two behind the part of the Counter interface the impact analyses use
+(update, most_common, len), so an accumulator can count with either.
+
+All three merge with update(), as a Counter does, so partial summaries from
+several processes or from an earlier run combine.
+"""
+
+import hashlib
+import heapq
+import math
+from collections import Counter
+from typing import Dict, Hashable, List, Optional, Tuple
+
+# Configuration
+SKETCH_CAPACITY = 1000  # Items SpaceSaving counts; counts are off by at most total / capacity
+HLL_PRECISION = 14  # 2**14 registers: about 0.8% standard error on distinct counts
+
+
+class SpaceSaving:
+    """
+    The Space-Saving heavy-hitter summary (Metwally et al., 2005).
+
+    Counts at most `capacity` items. An item that isn't counted yet replaces
+    the one with the smallest count and takes over that count, plus one. A
+    count is then never below the item's true count, and exceeds it by at
+    most the count it took over (its error), which is at most
+    total / capacity. Any item whose true count is above that is counted.
+    """
+
+    def __init__(self, capacity: int = SKETCH_CAPACITY):
+        self.capacity = capacity
+        self.total = 0
+        self.counts: Dict[Hashable, int] = {}
+        self.errors: Dict[Hashable, int] = {}
+        # (count, sequence, item) of every counted item; a count falls behind
+        # as the item is counted and is brought up to date when it surfaces
+        self._heap: List[Tuple[int, int, Hashable]] = []
+        self._sequence = 0
+
+    def add(self, item: Hashable):
+        self.total += 1
+        counts = self.counts
+        if item in counts:
+            counts[item] += 1
+        elif len(counts) < self.capacity:
+            self._push(item, 1, 0)
+        else:
+            heap = self._heap
+            while counts[heap[0][2]] != heap[0][0]:
+                _, sequence, stale = heap[0]
+                heapq.heapreplace(heap, (counts[stale], sequence, stale))
+            smallest, _, evicted = heapq.heappop(heap)
+            del counts[evicted], self.errors[evicted]
+            self._push(item, smallest + 1, smallest)
+
+    def _push(self, item: Hashable, count: int, error: int):
+        self.counts[item] = count
+        self.errors[item] = error
+        self._sequence += 1
+        heapq.heappush(self._heap, (count, self._sequence, item))
+
+    def update(self, items):
+        """Count each of items, or merge in another SpaceSaving."""
+        if isinstance(items, SpaceSaving):
+            self.merge(items)
+        else:
+            for item in items:
+                self.add(item)
+
+    def floor(self) -> int:
+        """An upper bound on the true count of any item that isn't counted."""
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def merge(self, other: 'SpaceSaving'):
+        """
+        Add other's counts (Agarwal et al., 2012).
+
+        An item one summary doesn't count gets that summary's floor, so
+        counts stay upper bounds; then only the `capacity` largest are kept.
+        """
+        own_floor, other_floor = self.floor(), other.floor()
+        counts, errors = {}, {}
+        for item in {**self.counts, **other.counts}:
+            counts[item] = self.counts.get(item, own_floor) + other.counts.get(item, other_floor)
+            errors[item] = self.errors.get(item, own_floor) + other.errors.get(item, other_floor)
+        kept = sorted(counts, key=counts.get, reverse=True)[:self.capacity]
+
+        self.total += other.total
+        self.counts, self.errors, self._heap = {}, {}, []
+        for item in kept:
+            self._push(item, counts[item], errors[item])
+
+    def most_common(self, n: Optional[int] = None) -> List[Tuple[Hashable, int]]:
+        """The n items with the largest counts, largest first, as Counter.most_common returns them."""
+        return sorted(self.counts.items(), key=lambda entry: entry[1], reverse=True)[:n]
+
+
+class HyperLogLog:
+    """
+    Distinct count estimate (Flajolet et al., 2007) in 2**precision bytes.
+
+    Items are hashed with BLAKE2b of their str(), not hash(), so estimates
+    from different processes and runs merge.
+    """
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, item: Hashable):
+        x = int.from_bytes(hashlib.blake2b(str(item).encode('utf-8'), digest_size=8).digest(), 'big')
+        bits = 64 - self.precision
+        index = x >> bits
+        rank = bits - (x & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, items):
+        """Add each of items, or merge in another HyperLogLog of the same precision."""
+        if isinstance(items, HyperLogLog):
+            self.registers = bytearray(map(max, self.registers, items.registers))
+        else:
+            for item in items:
+                self.add(item)
+
+    def standard_error(self) -> float:
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def __len__(self) -> int:
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # Linear counting is more accurate while registers are empty
+        return round(estimate)
+
+
+class SketchCounter:
+    """
+    Counter stand-in of bounded size: most_common() from a SpaceSaving
+    summary, and len() from a HyperLogLog estimate of the distinct items.
+    """
+
+    def __init__(self, capacity: int = SKETCH_CAPACITY, precision: int = HLL_PRECISION):
+        self.heavy_hitters = SpaceSaving(capacity)
+        self.distinct = HyperLogLog(precision)
+
+    def update(self, items):
+        """Count each of items, or merge in another SketchCounter."""
+        if isinstance(items, SketchCounter):
+            self.heavy_hitters.merge(items.heavy_hitters)
+            self.distinct.update(items.distinct)
+            return
+        for item in items:
+            self.heavy_hitters.add(item)
+            self.distinct.add(item)
+
+    def most_common(self, n: Optional[int] = None) -> List[Tuple[Hashable, int]]:
+        return self.heavy_hitters.most_common(n)
+
+    def __len__(self) -> int:
+        return len(self.distinct)
+
+
+def new_counter(capacity: Optional[int] = None):
+    """An exact Counter, or with a capacity, a SketchCounter."""
+    return Counter() if capacity is None else SketchCounter(capacity)
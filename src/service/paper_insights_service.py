@@ -1,16 +1,25 @@
 import os
 import sys
-import tempfile
 from fastapi import FastAPI, File, UploadFile, Form
 from fastapi.responses import JSONResponse
 
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, ROOT)
 
-from utils.text_extraction import extract_text_from_upload
+from utils.text_extraction import PdfExtractor
+from utils.uploads import UploadLimitMiddleware, upload_source
 from utils.insights import analyze_text
 
 app = FastAPI(title="Paper Insights Service")
+app.add_middleware(UploadLimitMiddleware, paths=["/predict"])
+
+# PDF parsing is CPU-bound, so it runs in a bounded process pool
+pdf_extractor = PdfExtractor()
+
+
+@app.on_event("shutdown")
+def shutdown_pdf_extractor():
+    pdf_extractor.shutdown()
 
 
 @app.get("/health")
@@ -20,27 +29,16 @@ def health():
 
 @app.post("/predict")
 async def predict(file: UploadFile = File(...), use_graph: bool = Form(False)):
-    suffix = os.path.splitext(file.filename or '')[1].lower()
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix or '.pdf') as tmp:
-        content = await file.read()
-        tmp.write(content)
-        tmp_path = tmp.name
-
-    try:
-        text = extract_text_from_upload(tmp_path, file.content_type)
-        graph_path = None
-        if use_graph:
-            candidate = os.path.join(os.path.dirname(ROOT), 'data', 'graph.json')
-            if os.path.exists(candidate):
-                graph_path = candidate
+    suffix = os.path.splitext(file.filename or '')[1].lower() or '.pdf'
+    text = await pdf_extractor.extract_text_from_upload(upload_source(file), file.content_type, suffix=suffix)
+    graph_path = None
+    if use_graph:
+        candidate = os.path.join(os.path.dirname(ROOT), 'data', 'graph.json')
+        if os.path.exists(candidate):
+            graph_path = candidate
 
-        insights = analyze_text(text, graph_path=graph_path)
-        return JSONResponse(content=insights)
-    finally:
-        try:
-            os.remove(tmp_path)
-        except Exception:
-            pass
+    insights = analyze_text(text, graph_path=graph_path)
+    return JSONResponse(content=insights)
 
 
 @app.get("/ml_categories")
@@ -10,6 +10,35 @@ ML_KEYWORDS = [
 
 DATASET_KEYWORDS = ['imagenet', 'coco', 'mnist', 'glue', 'squad', 'wikitext']
 
+# Pre-filter terms and weights. Terms that only ever mean ML score 1; terms
+# that also turn up in non-ML statistics or prose score less
+PREFILTER_TERMS = {
+    **dict.fromkeys([
+        'machine learning', 'deep learning', 'neural network', 'neural net', 'artificial intelligence',
+        'reinforcement learning', 'transfer learning', 'supervised learning', 'unsupervised',
+        'semi-supervised', 'convolutional', 'transformer model', 'lstm', 'bert', 'gpt',
+        'large language model', 'llm', 'autoencoder', 'generative adversarial', 'pretrained',
+        'pre-trained', 'random forest', 'support vector', 'svm', 'gradient boosting', 'xgboost',
+        'decision tree', 'k-nearest', 'naive bayes', 'gaussian process', 'word2vec', 'word embedding',
+        'tensorflow', 'pytorch', 'keras', 'scikit-learn', 'sklearn', 'natural language processing',
+        'computer vision', 'sentiment analysis', 'data mining', 'text mining', 'deepfake',
+    ], 1.0),
+    **dict.fromkeys([
+        'ai', 'neural', 'autonomous', 'classifier', 'clustering', 'k-means', 'embedding',
+        'feature selection', 'cross-validation', 'training set', 'test set', 'predictive model',
+        'prediction model', 'attention mechanism', 'discriminant analysis', 'image processing',
+        'pattern recognition',
+    ], 0.5),
+    **dict.fromkeys([
+        'state-of-the-art', 'algorithm', 'automated', 'classification', 'prediction', 'predicting',
+        'optimization', 'big data',
+    ], 0.25),
+}
+# One pass over the text for all terms; word boundaries keep 'bert' out of 'albert'
+_PREFILTER_PATTERN = re.compile(
+    r'\b(?:' + '|'.join(re.escape(term) for term in sorted(PREFILTER_TERMS, key=len, reverse=True)) + r')s?\b'
+)
+
 
 def _score_ml_impact(text: str) -> Dict[str, Any]:
     t = text.lower()
@@ -27,6 +56,19 @@ def _score_ml_impact(text: str) -> Dict[str, Any]:
     return {'score': round(score, 3), 'reasons': reasons}
 
 
+def ml_prefilter_score(text: str) -> float:
+    """
+    Cheap estimate, from 0 to 1, of how likely a paper is to use ML.
+
+    Sums the weights of the distinct PREFILTER_TERMS in the text; two strong
+    terms reach 1. Meant for routing papers before LLM extraction, so it errs
+    towards recall.
+    """
+    # A match may carry a plural 's' the term doesn't
+    found = {match if match in PREFILTER_TERMS else match[:-1] for match in _PREFILTER_PATTERN.findall(text.lower())}
+    return round(min(1.0, sum(PREFILTER_TERMS.get(term, 0.0) for term in found) / 2), 3)
+
+
 def _score_reproducibility(text: str) -> Dict[str, Any]:
     t = text.lower()
     repo_present = 'github.com' in t or 'gitlab.com' in t
@@ -1,13 +1,66 @@
+import asyncio
+import io
+import mmap
 import os
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import List, Optional, Tuple, Union
 from PyPDF2 import PdfReader
 
+# A PDF is either a path on disk or the raw file bytes
+PdfSource = Union[str, bytes]
 
-def extract_text_from_pdf(path: str) -> str:
+PDF_WORKERS = int(os.getenv('PDF_WORKERS', str(min(4, os.cpu_count() or 1))))
+PDF_MAX_PAGES = int(os.getenv('PDF_MAX_PAGES', '200'))
+PDF_PAGES_PER_TASK = int(os.getenv('PDF_PAGES_PER_TASK', '16'))
+PDF_EXTRACTION_TIMEOUT = float(os.getenv('PDF_EXTRACTION_TIMEOUT', '60'))
+
+
+class PdfExtractionTimeout(Exception):
+    """Raised when a document takes longer than the extraction timeout."""
+
+
+class PdfWorkerCrashed(Exception):
+    """Raised when a document kills the worker process parsing it."""
+
+
+@contextmanager
+def _open_reader(source: PdfSource):
+    if isinstance(source, (bytes, bytearray)):
+        yield PdfReader(io.BytesIO(source))
+        return
+
+    # PdfReader copies a file given by path into memory; a read-only map lets
+    # it parse straight from the page cache instead
+    with open(source, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield PdfReader(f)
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield PdfReader(mapped)
+
+
+def extract_pdf_pages(source: PdfSource, start: int, stop: int) -> List[str]:
+    """Extract the text of pages [start, stop) of a PDF."""
+    with _open_reader(source) as reader:
+        stop = min(stop, len(reader.pages))
+        return [reader.pages[i].extract_text() or '' for i in range(start, stop)]
+
+
+def _extract_first_pages(source: PdfSource, stop: int) -> Tuple[int, List[str]]:
+    """Return the page count and the text of the first pages, in one parse."""
+    with _open_reader(source) as reader:
+        page_count = len(reader.pages)
+        stop = min(stop, page_count)
+        return page_count, [reader.pages[i].extract_text() or '' for i in range(stop)]
+
+
+def extract_text_from_pdf(source: PdfSource, max_pages: Optional[int] = None) -> str:
     text_chunks = []
-    with open(path, 'rb') as f:
-        reader = PdfReader(f)
-        for page in reader.pages:
+    with _open_reader(source) as reader:
+        pages = reader.pages if max_pages is None else reader.pages[:max_pages]
+        for page in pages:
             page_text = page.extract_text()
             if page_text:
                 text_chunks.append(page_text)
@@ -23,3 +76,113 @@ def extract_text_from_upload(path: str, content_type: Optional[str] = None) -> s
             return f.read().decode('utf-8', errors='ignore')
         except Exception:
             return ''
+
+
+class PdfExtractor:
+    """
+    Run PDF text extraction in a bounded process pool, off the event loop.
+
+    PyPDF2 is pure Python and CPU-bound, so parsing happens in worker
+    processes. Only the first max_pages pages are read. Documents longer than
+    pages_per_task pages are split into page ranges that are parsed in
+    parallel. If a document exceeds the timeout, its queued page ranges are
+    cancelled; a range that is already running finishes in the background,
+    bounded by the page limit.
+
+    A worker that dies (a crash, or the OOM killer) breaks the whole pool and
+    every document in flight on it. The pool is replaced, and each of those
+    documents is retried alone in a single-worker pool, so only the one that
+    kills a worker again fails, with PdfWorkerCrashed.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = PDF_WORKERS,
+        max_pages: int = PDF_MAX_PAGES,
+        pages_per_task: int = PDF_PAGES_PER_TASK,
+        timeout: float = PDF_EXTRACTION_TIMEOUT,
+    ):
+        self.max_workers = max_workers
+        self.max_pages = max_pages
+        self.pages_per_task = pages_per_task
+        self.timeout = timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def _replace_pool(self, broken: ProcessPoolExecutor):
+        # Every request in flight sees the pool break; only the first replaces it
+        if self._pool is broken:
+            self._pool = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def extract_pages(self, source: PdfSource) -> List[str]:
+        """Return the text of each page, up to max_pages pages."""
+        try:
+            return await asyncio.wait_for(self._extract_pages(source), self.timeout)
+        except asyncio.TimeoutError:
+            raise PdfExtractionTimeout(f'PDF text extraction exceeded {self.timeout:.0f}s')
+
+    async def _extract_pages(self, source: PdfSource) -> List[str]:
+        pool = self._get_pool()
+        try:
+            return await self._extract_pages_in(pool, source)
+        except BrokenProcessPool:
+            self._replace_pool(pool)
+
+        isolated = ProcessPoolExecutor(max_workers=1)
+        try:
+            return await self._extract_pages_in(isolated, source)
+        except BrokenProcessPool:
+            raise PdfWorkerCrashed('PDF text extraction crashed the worker process')
+        finally:
+            isolated.shutdown(wait=False, cancel_futures=True)
+
+    async def _extract_pages_in(self, pool: ProcessPoolExecutor, source: PdfSource) -> List[str]:
+        loop = asyncio.get_running_loop()
+
+        # The first task also reports the page count, so short documents
+        # need a single round trip to the pool
+        first_stop = min(self.pages_per_task, self.max_pages)
+        page_count, pages = await loop.run_in_executor(pool, _extract_first_pages, source, first_stop)
+
+        last_page = min(page_count, self.max_pages)
+        futures = [
+            loop.run_in_executor(pool, extract_pdf_pages, source, start, min(start + self.pages_per_task, last_page))
+            for start in range(first_stop, last_page, self.pages_per_task)
+        ]
+        # Cancelling the gather (on timeout) cancels the queued page ranges
+        for chunk in await asyncio.gather(*futures):
+            pages.extend(chunk)
+        return pages
+
+    async def extract_text(self, source: PdfSource) -> str:
+        """Async counterpart of extract_text_from_pdf."""
+        return '\n'.join(page for page in await self.extract_pages(source) if page)
+
+    async def extract_text_from_upload(
+        self,
+        source: PdfSource,
+        content_type: Optional[str] = None,
+        suffix: str = '',
+    ) -> str:
+        """
+        Async counterpart of extract_text_from_upload.
+
+        Also accepts the bytes of an upload held in memory. The file type
+        comes from suffix if given, else from the path.
+        """
+        ext = suffix.lower() or (os.path.splitext(source)[1].lower() if isinstance(source, str) else '')
+        if ext == '.pdf' or (content_type and 'pdf' in content_type.lower()):
+            return await self.extract_text(source)
+        if isinstance(source, str):
+            return extract_text_from_upload(source, content_type)
+        return bytes(source).decode('utf-8', errors='ignore')
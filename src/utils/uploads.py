@@ -0,0 +1,107 @@
+import hashlib
+import os
+from typing import Iterable, Union
+
+from starlette.responses import JSONResponse
+
+UPLOAD_MAX_BYTES = int(float(os.getenv('UPLOAD_MAX_MB', '50')) * 1024 * 1024)
+UPLOAD_FORM_OVERHEAD = 64 * 1024  # Multipart boundaries, part headers and small form fields
+UPLOAD_CHUNK_BYTES = 256 * 1024
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds the configured maximum size."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f'Upload exceeds the {max_bytes / (1024 * 1024):.0f} MB limit')
+        self.max_bytes = max_bytes
+
+
+class UploadLimitMiddleware:
+    """
+    Reject request bodies over max_bytes on the given paths with a 413,
+    before they are parsed.
+
+    Starlette parses a multipart body, spooling its files to disk, before the
+    endpoint runs, so a limit checked in the endpoint comes too late. A
+    Content-Length over the limit is refused without reading the body; a
+    body without one is counted as it arrives and cut off once it passes the
+    limit.
+    """
+
+    def __init__(self, app, paths: Iterable[str], max_bytes: int = UPLOAD_MAX_BYTES):
+        self.app = app
+        self.paths = set(paths)
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        max_body = self.max_bytes + UPLOAD_FORM_OVERHEAD
+        too_large = JSONResponse({'detail': str(UploadTooLarge(self.max_bytes))}, status_code=413)
+        length = dict(scope['headers']).get(b'content-length')
+        if length is not None and length.isdigit() and int(length) > max_body:
+            await too_large(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > max_body:
+                    exceeded = True
+                    raise UploadTooLarge(self.max_bytes)
+            return message
+
+        async def guarded_send(message):
+            # The app answers a body it couldn't read with an error of its own
+            if not exceeded:
+                await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except UploadTooLarge:
+            if not exceeded:
+                raise
+        if exceeded:
+            await too_large(scope, receive, send)
+
+
+async def upload_sha256(file, chunk_size: int = UPLOAD_CHUNK_BYTES) -> str:
+    """Hash an UploadFile in chunks, leaving it at the start."""
+    sha256 = hashlib.sha256()
+    await file.seek(0)
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        sha256.update(chunk)
+    await file.seek(0)
+    return sha256.hexdigest()
+
+
+def upload_source(file) -> Union[str, bytes]:
+    """
+    The UploadFile's contents for the PDF extractor, without copying them to
+    another file.
+
+    Starlette keeps a small upload in memory, whose bytes are returned. A
+    larger one is rolled over to an unnamed temporary file; worker processes
+    are handed a /proc path to that same file, or its bytes where there is no
+    /proc.
+    """
+    spooled = file.file
+    if getattr(spooled, '_rolled', True):
+        path = f'/proc/{os.getpid()}/fd/{spooled.fileno()}'
+        if os.path.exists(path):
+            return path
+    spooled.seek(0)
+    data = spooled.read()
+    spooled.seek(0)
+    return data
@@ -0,0 +1,331 @@
+"""
+Tests for analyze_extracted_impact.py on small impact files.
+"""
+
+import json
+
+import pytest
+
+import analyze_extracted_impact as analyze
+
+RECORDS = [
+    {"ml_impact_quantification": {
+        "has_ml_usage": True, "ml_contribution_level": "substantial",
+        "attribution_scoring": {"ml_contribution_percent": 70},
+        "acceleration_metrics": {"provides_acceleration": True},
+        "efficiency_measures": {"improves_efficiency": False},
+        "breakthrough_analysis": {"enables_new_capability": True},
+    }, "reproducibility": {"code_available": True, "code_url": "https://example.org/code"}, "_year": 2021},
+    {"ml_impact_quantification": {
+        "has_ml_usage": True, "ml_contribution_level": "minimal",
+        "attribution_scoring": {"ml_contribution_percent": 15.5},
+        "acceleration_metrics": None, "efficiency_measures": {"improves_efficiency": True},
+        "breakthrough_analysis": None,
+    }, "_year": 2020},
+    # Pre-filtered and batched records leave the sections out
+    {"ml_impact_quantification": {"has_ml_usage": False, "ml_contribution_level": "none"}, "_year": 2021},
+    {"ml_impact_quantification": None, "_year": "unknown"},
+]
+
+
+def write_impact_file(tmp_path, monkeypatch, category: str, records):
+    monkeypatch.setattr(analyze, "INPUT_DIR", tmp_path)
+    with open(tmp_path / f"{category}_impact.jsonl", "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+        f.write("{not json\n\n")
+
+
+def test_category_is_analyzed_in_one_streaming_pass(tmp_path, monkeypatch):
+    write_impact_file(tmp_path, monkeypatch, "Biology", RECORDS)
+
+    def no_list(category):
+        raise AssertionError("analyze_category must not load the whole file")
+
+    monkeypatch.setattr(analyze, "load_extracted_data", no_list)
+    analysis = analyze.analyze_category("Biology")
+
+    assert analysis == {
+        "category": "Biology",
+        "total_papers": 4,
+        "ml_impact_quantification": {
+            "total_papers": 4,
+            "papers_with_ml_usage": 2,
+            "ml_usage_rate": 0.5,
+            "contribution_level_distribution": {"substantial": 1, "minimal": 1, "none": 2},
+            "papers_with_acceleration": 1,
+            "acceleration_rate": 0.25,
+            "papers_with_efficiency": 1,
+            "efficiency_rate": 0.25,
+            "papers_with_new_capability": 1,
+            "new_capability_rate": 0.25,
+            "average_ml_attribution": 42.75,
+            "attribution_scores_count": 2,
+        },
+    }
+    assert analyze.analyze_category("Physics") is None
+
+
+def test_fractional_scores_are_averaged_exactly(tmp_path, monkeypatch):
+    # Added left to right, these come to 14.499999999999996; the exact total is 14.5
+    scores = ["12.5", "n/a", float("nan"), True] + [0.1] * 10
+    records = [{"ml_impact_quantification": {"attribution_scoring": {"ml_contribution_percent": score}}}
+               for score in scores]
+    write_impact_file(tmp_path, monkeypatch, "Biology", records)
+
+    ml_quant = analyze.analyze_category("Biology")["ml_impact_quantification"]
+    assert sum([12.5, 1.0] + [0.1] * 10) != 14.5
+    assert ml_quant["average_ml_attribution"] == 14.5 / 12
+    assert ml_quant["attribution_scores_count"] == 12
+
+    pytest.importorskip("pyarrow")
+    pytest.importorskip("pandas")
+    import impact_store
+
+    store_dir = tmp_path / "store"
+    impact_store.convert_category("Biology", tmp_path, store_dir)
+    assert analyze.analyze_category_store("Biology", store_dir)["ml_impact_quantification"] == ml_quant
+
+
+# Sections the list analyses read; empty and falsy entries are not counted
+SECTION_RECORDS = [
+    {"reproducibility": {"code_available": True, "code_url": "https://example.org/code",
+                         "data_available": True, "data_url": "", "has_supplementary": True},
+     "research_outcomes": {"has_clinical_trial": True, "clinical_trial_ids": ["NCT01", "", "NCT02"],
+                           "has_patent": False, "patent_numbers": ["EP9"]},
+     "impact_indicators": {"mentions_media_coverage": True, "real_world_applications": ["diagnosis", "triage", ""]},
+     "additional_info": {"funding_sources": ["NIH", "NSF"], "keywords": ["imaging", "ml"]},
+     "ml_adoption": {"frameworks": ["pytorch"]}, "_year": 2021},
+    {"reproducibility": {"code_available": False, "code_url": "https://example.org/unused",
+                         "data_available": True, "data_url": "https://example.org/data",
+                         "mentions_replication": True},
+     "research_outcomes": {"has_patent": True, "patent_numbers": ["US1", None], "mentions_correction": True},
+     "impact_indicators": {"mentions_policy_influence": True, "mentions_industry_adoption": True,
+                           "real_world_applications": ["diagnosis"]},
+     "additional_info": {"funding_sources": ["NIH"], "collaborations": ["CERN"], "keywords": ["ml", ""]},
+     "ml_adoption": {"frameworks": []}, "_year": 2020},
+    {"reproducibility": None, "research_outcomes": {"mentions_retraction": True}, "impact_indicators": None,
+     "_year": 2021},
+    {"reproducibility": {"code_available": True}, "_year": "unknown"},
+]
+
+
+def test_list_analyses_give_hand_counted_results(tmp_path, monkeypatch):
+    write_impact_file(tmp_path, monkeypatch, "Biology", SECTION_RECORDS)
+    papers = analyze.load_extracted_data("Biology")
+    assert len(papers) == 4
+
+    assert analyze.analyze_reproducibility(papers) == {
+        "code_availability_rate": 0.5, "data_availability_rate": 0.5,
+        "supplementary_rate": 0.25, "replication_mention_rate": 0.25,
+        "papers_with_code": 2, "papers_with_data": 2,
+        "papers_with_supplementary": 1, "papers_mentioning_replication": 1,
+        "total_papers": 4,
+        # A URL only counts alongside its availability flag, and an empty one not at all
+        "code_urls_found": 1, "data_urls_found": 1,
+    }
+    assert analyze.analyze_research_outcomes(papers) == {
+        "clinical_trial_rate": 0.25, "patent_rate": 0.25, "retraction_rate": 0.25, "correction_rate": 0.25,
+        "papers_with_clinical_trials": 1, "papers_with_patents": 1,
+        "papers_with_retractions": 1, "papers_with_corrections": 1,
+        "total_papers": 4,
+        "clinical_trial_ids_found": 2, "patent_numbers_found": 1,
+    }
+
+    impact = analyze.analyze_impact_indicators(papers)
+    assert impact == {
+        "media_coverage_rate": 0.25, "policy_influence_rate": 0.25, "industry_adoption_rate": 0.25,
+        "papers_with_media_coverage": 1, "papers_with_policy_influence": 1, "papers_with_industry_adoption": 1,
+        "top_real_world_applications": {"diagnosis": 2, "triage": 1},
+        "total_papers": 4,
+    }
+    assert list(impact["top_real_world_applications"]) == ["diagnosis", "triage"]
+
+    additional = analyze.analyze_additional_info(papers)
+    assert additional == {
+        "top_funding_sources": {"NIH": 2, "NSF": 1},
+        "top_collaborations": {"CERN": 1},
+        "top_keywords": {"ml": 2, "imaging": 1},
+        "total_papers": 4,
+    }
+    assert list(additional["top_keywords"]) == ["ml", "imaging"]
+
+    temporal = analyze.analyze_temporal_trends(papers)
+    assert temporal == {
+        2020: {"count": 1, "code_available": 0, "data_available": 1, "ml_adoption": 0,
+               "clinical_trials": 0, "patents": 1},
+        2021: {"count": 2, "code_available": 1, "data_available": 1, "ml_adoption": 1,
+               "clinical_trials": 1, "patents": 0},
+    }
+    assert list(temporal) == [2020, 2021]
+
+    # The streaming pass over the file gives the same sections
+    sections = analyze.accumulate(analyze.iter_extracted_data("Biology"), {
+        "reproducibility": analyze.ReproducibilityAccumulator(),
+        "temporal": analyze.TemporalTrendsAccumulator(),
+    })
+    assert sections == {"reproducibility": analyze.analyze_reproducibility(papers), "temporal": temporal}
+
+
+def test_columnar_store_gives_the_same_analysis(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    pytest.importorskip("pandas")
+    import impact_store
+
+    # Ties in the level counts must keep the file's order across year partitions
+    records = RECORDS + [dict(RECORDS[1], _year=1999), dict(RECORDS[0], _year=2024)]
+    write_impact_file(tmp_path, monkeypatch, "Biology", records)
+    store_dir = tmp_path / "store"
+
+    assert impact_store.convert_category("Biology", tmp_path, store_dir) == 6
+    assert impact_store.store_categories(store_dir) == ["Biology"]
+    assert analyze.analyze_category_store("Biology", store_dir) == analyze.analyze_category("Biology")
+
+    frame = impact_store.read_category("Biology", ["code_url", "year"], store_dir)
+    assert frame["code_url"].notna().tolist() == [True, False, False, False, False, True]
+    assert sorted(frame["year"].dropna().unique().tolist()) == [1999, 2020, 2021, 2024]
+
+    # Converting again replaces the category
+    write_impact_file(tmp_path, monkeypatch, "Biology", records[:2])
+    assert impact_store.convert_category("Biology", tmp_path, store_dir) == 2
+    assert analyze.analyze_category_store("Biology", store_dir)["total_papers"] == 2
+
+
+def test_byte_ranges_merge_into_the_one_pass_analysis(tmp_path, monkeypatch):
+    # Scores whose naive float sum depends on the order they are added in
+    records = [dict(record, reproducibility={"code_available": True}, _year=2000 + i % 3,
+                    impact_indicators={"real_world_applications": [f"app-{i % 4}", f"app-{i % 7}"]},
+                    additional_info={"keywords": [f"kw-{i % 5}"], "funding_sources": ["NSF"]})
+               for i, record in enumerate(RECORDS * 6)]
+    for i, record in enumerate(records):
+        record["ml_impact_quantification"] = dict(record["ml_impact_quantification"] or {},
+                                                  attribution_scoring={"ml_contribution_percent": [0.1, 1e16, 70, -1e16][i % 4]})
+    write_impact_file(tmp_path, monkeypatch, "Biology", records)
+    input_file = tmp_path / "Biology_impact.jsonl"
+
+    classes = [analyze.MLImpactAccumulator, analyze.ReproducibilityAccumulator, analyze.ResearchOutcomesAccumulator,
+               analyze.ImpactIndicatorsAccumulator, analyze.AdditionalInfoAccumulator, analyze.TemporalTrendsAccumulator]
+    one_pass = analyze.accumulate(analyze.iter_extracted_data("Biology"), {cls.__name__: cls() for cls in classes})
+
+    ranges = analyze.byte_ranges(0, input_file.stat().st_size, range_bytes=97)
+    assert len(ranges) > len(records) / 2
+    merged = {cls.__name__: cls() for cls in classes}
+    for start, end in ranges:
+        part = {cls.__name__: cls() for cls in classes}
+        analyze.feed(analyze.iter_impact_records(input_file, start, end), part)
+        for name, accumulator in part.items():
+            merged[name].merge(accumulator)
+
+    assert {name: accumulator.result() for name, accumulator in merged.items()} == one_pass
+    assert one_pass["MLImpactAccumulator"]["average_ml_attribution"] == (6 * 0.1 + 6 * 70) / len(records)
+    assert one_pass["MLImpactAccumulator"]["attribution_scores_count"] == len(records)
+
+    analyses = list(analyze.analyze_categories(["Biology", "Physics"], workers=2, range_bytes=97))
+    assert json.dumps(analyses) == json.dumps([analyze.analyze_category("Biology"), None])
+
+
+def test_rerun_reads_only_appended_records(tmp_path, monkeypatch):
+    write_impact_file(tmp_path, monkeypatch, "Biology", RECORDS)
+    monkeypatch.setattr(analyze, "OUTPUT_DIR", tmp_path / "analysis")
+    input_file = tmp_path / "Biology_impact.jsonl"
+    starts = []
+    iter_impact_records = analyze.iter_impact_records
+
+    def spy(path, start=0, end=None):
+        starts.append(start)
+        return iter_impact_records(path, start, end)
+
+    monkeypatch.setattr(analyze, "iter_impact_records", spy)
+    analyze.main([])
+    report = tmp_path / "analysis" / "Biology_report.md"
+    assert "Total Papers Analyzed: 4" in report.read_text()
+    report.write_text("stale")
+
+    # Nothing new: nothing is read and the report is left alone
+    analyze.main([])
+    assert starts == [0] and report.read_text() == "stale"
+
+    # Appended records, the last one still being written
+    length = input_file.stat().st_size
+    with open(input_file, "a", encoding="utf-8") as f:
+        f.write(json.dumps(RECORDS[0]) + "\n" + json.dumps(RECORDS[1])[:20])
+    analyze.main([])
+    assert starts == [0, length]
+    assert "Total Papers Analyzed: 5" in report.read_text()
+    assert (json.loads((tmp_path / "analysis" / "Biology_analysis.json").read_text())
+            == analyze.analyze_category("Biology"))
+
+    with open(input_file, "a", encoding="utf-8") as f:
+        f.write(json.dumps(RECORDS[1])[20:] + "\n")
+    state_dir = tmp_path / "analysis" / "state"
+    [(analysis, changed)] = analyze.update_categories(["Biology"], state_dir=state_dir)
+    assert changed and analysis == analyze.analyze_category("Biology")
+    assert analysis["total_papers"] == 6
+
+    # A replaced file is analyzed from the start
+    write_impact_file(tmp_path, monkeypatch, "Biology", RECORDS[1:2] * 20)
+    [(analysis, changed)] = analyze.update_categories(["Biology"], state_dir=state_dir)
+    assert starts[-1] == 0 and analysis == analyze.analyze_category("Biology")
+    [(analysis, changed)] = analyze.update_categories(["Biology"], workers=2, state_dir=state_dir, full=True,
+                                                      range_bytes=97)
+    assert changed and analysis["total_papers"] == 20
+
+
+def test_bounded_counts_keep_the_heavy_hitters():
+    # Ten frequent applications among a thousand that appear once
+    papers = [{"impact_indicators": {"real_world_applications": [f"app-{i % 10}", f"rare-{i}"]},
+               "additional_info": {"keywords": [f"kw-{i % 7}"] * (i % 7 + 1)}} for i in range(1000)]
+    # Exact counts keep the keys they had before sketches; only bounded ones estimate distinct entries
+    exact = analyze.analyze_impact_indicators(papers)
+    assert "distinct_real_world_applications" not in exact
+    assert not any(key.startswith("distinct_") for key in analyze.analyze_additional_info(papers))
+
+    parts = [analyze.ImpactIndicatorsAccumulator(capacity=50) for _ in range(2)]
+    analyze.feed(papers[:600], {"part": parts[0]})
+    analyze.feed(papers[600:], {"part": parts[1]})
+    parts[0].merge(parts[1])
+    for bounded in analyze.analyze_impact_indicators(papers, capacity=50), parts[0].result():
+        top = bounded["top_real_world_applications"]
+        assert set(list(top)[:10]) == {f"app-{i}" for i in range(10)}
+        # Counts are upper bounds, off by at most total / capacity
+        assert all(100 <= top[f"app-{i}"] <= 100 + 2000 // 50 for i in range(10))
+        assert abs(bounded["distinct_real_world_applications"] - 1010) < 1010 * 0.05
+    assert len(parts[0].real_world_apps.heavy_hitters.counts) == 50
+
+    bounded = analyze.analyze_additional_info(papers, capacity=50)
+    assert bounded["top_keywords"] == analyze.analyze_additional_info(papers)["top_keywords"]
+    assert bounded["distinct_keywords"] == 7
+
+
+def test_exact_and_bounded_counts_do_not_mix(tmp_path, monkeypatch):
+    papers = [{"impact_indicators": {"real_world_applications": ["diagnosis"]},
+               "additional_info": {"keywords": ["ml"]}}] * 3
+    for accumulator in analyze.ImpactIndicatorsAccumulator, analyze.AdditionalInfoAccumulator:
+        exact, bounded = accumulator(), accumulator(capacity=50)
+        analyze.feed(papers, {"exact": exact, "bounded": bounded})
+        with pytest.raises(ValueError, match="counted with capacity 50 into one counted exactly"):
+            exact.merge(bounded)
+        with pytest.raises(ValueError, match="counted exactly into one counted with capacity 50"):
+            bounded.merge(exact)
+        assert exact.total == bounded.total == 3
+
+    # Saved state counted with another capacity is analyzed again from the start
+    write_impact_file(tmp_path, monkeypatch, "Biology", papers)
+    input_file = tmp_path / "Biology_impact.jsonl"
+    state_file = tmp_path / "state" / "Biology_state.pickle"
+
+    def analyses(capacity):
+        return {"impact_indicators": lambda: analyze.ImpactIndicatorsAccumulator(capacity)}
+
+    monkeypatch.setattr(analyze, "CATEGORY_ANALYSES", analyses(50))
+    saved = analyze.new_accumulators()
+    analyze.feed(analyze.iter_impact_records(input_file), saved)
+    analyze.save_state(state_file, input_file, saved, input_file.stat().st_size)
+    accumulators, offset = analyze.load_state(state_file, input_file)
+    assert offset == input_file.stat().st_size and accumulators["impact_indicators"].total == 3
+
+    for capacity in None, 100:
+        monkeypatch.setattr(analyze, "CATEGORY_ANALYSES", analyses(capacity))
+        accumulators, offset = analyze.load_state(state_file, input_file)
+        assert offset == 0 and accumulators["impact_indicators"].total == 0
+        assert accumulators["impact_indicators"].capacity == capacity
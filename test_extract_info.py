@@ -0,0 +1,508 @@
+"""
+Tests for the extraction pipeline in extract_info.py, run against a local
+Ollama stub instead of a real server.
+"""
+
+import gzip
+import json
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+import extract_info
+import seekable_gzip
+from stub_servers import FakeOllamaServer
+
+EXTRACTION = json.dumps({"ml_impact_quantification": {"has_ml_usage": True, "ml_contribution_level": "moderate"}})
+
+
+def write_category_file(path: Path, num_papers: int):
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for i in range(num_papers):
+            paper = {"id": f"paper-{i}", "text": f"Abstract. We train a model on dataset {i}.", "metadata": {"year": 2020}}
+            f.write(json.dumps(paper) + '\n')
+
+
+def use_stub(monkeypatch, tmp_path: Path, stub: FakeOllamaServer):
+    monkeypatch.setattr(extract_info, "OLLAMA_BASE_URL", stub.base_url)
+    monkeypatch.setattr(extract_info, "OUTPUT_DIR", tmp_path / "out")
+    extract_info.setup_output_dir()
+
+
+def test_papers_are_extracted_concurrently(tmp_path, monkeypatch):
+    category_file = tmp_path / "Biology.jsonl.gz"
+    write_category_file(category_file, 24)
+
+    with FakeOllamaServer(delay=0.2, response=EXTRACTION) as stub:
+        use_stub(monkeypatch, tmp_path, stub)
+        start = time.perf_counter()
+        extract_info.process_category_file(category_file, "Biology", workers=6)
+        elapsed = time.perf_counter() - start
+
+    # 24 sequential requests would take 4.8 s
+    assert elapsed < 2.0
+    assert stub.request_count == 24
+
+    lines = (tmp_path / "out" / "Biology_impact.jsonl").read_text().splitlines()
+    assert sorted(json.loads(line)["_paper_id"] for line in lines) == sorted(f"paper-{i}" for i in range(24))
+
+    progress = json.loads((tmp_path / "out" / "progress" / "Biology_progress.json").read_text())
+    assert progress["completed"] is True
+    assert progress["papers_success"] == 24
+    assert progress["resume_line"] == progress["total_papers"] == 24
+    journal = extract_info.ProgressJournal(tmp_path / "out" / "progress" / "Biology_progress.log")
+    assert journal.load()[0] == {f"paper-{i}" for i in range(24)}
+
+
+def test_resume_skips_processed_papers(tmp_path, monkeypatch):
+    category_file = tmp_path / "Physics.jsonl.gz"
+    write_category_file(category_file, 10)
+
+    with FakeOllamaServer(response=EXTRACTION) as stub:
+        use_stub(monkeypatch, tmp_path, stub)
+        with extract_info.ProgressJournal(tmp_path / "out" / "progress" / "Physics_progress.log") as journal:
+            for i in range(4):
+                journal.append(f"paper-{i}")
+        extract_info.process_category_file(category_file, "Physics", workers=3)
+
+    assert stub.request_count == 6
+    lines = (tmp_path / "out" / "Physics_impact.jsonl").read_text().splitlines()
+    assert sorted(json.loads(line)["_paper_id"] for line in lines) == sorted(f"paper-{i}" for i in range(4, 10))
+
+
+def test_restart_seeks_to_first_unfinished_paper(tmp_path, monkeypatch):
+    category_file = tmp_path / "Medicine.jsonl.gz"
+    write_category_file(category_file, 10)
+    extract_paper_info = extract_info.extract_paper_info
+
+    def failing_on_papers_3_and_5(paper, category):
+        if paper["id"] == "paper-3":
+            raise RuntimeError("worker crashed")
+        if paper["id"] == "paper-5":
+            return None  # The model never answered with valid JSON
+        return extract_paper_info(paper, category)
+
+    with FakeOllamaServer(response=EXTRACTION) as stub:
+        use_stub(monkeypatch, tmp_path, stub)
+        monkeypatch.setattr(extract_info, "extract_paper_info", failing_on_papers_3_and_5)
+        extract_info.process_category_file(category_file, "Medicine", workers=3)
+        assert stub.request_count == 8
+
+        progress = json.loads((tmp_path / "out" / "progress" / "Medicine_progress.json").read_text())
+        assert progress["resume_line"] == 3
+        assert progress["papers_failed"] == 2 and progress["papers_processed"] == 8
+        journal = (tmp_path / "out" / "progress" / "Medicine_progress.log").read_text()
+        assert '"paper-3"' not in journal and '"paper-5"' not in journal
+
+        # The restart neither rescans nor re-reads the papers before paper-3,
+        # and retries paper-5 but skips the others finished after it
+        monkeypatch.setattr(extract_info, "extract_paper_info", extract_paper_info)
+        monkeypatch.setattr(extract_info.seekable_gzip, "scan", None)
+        parsed = []
+        real_loads = json.loads
+        monkeypatch.setattr(extract_info.json, "loads", lambda s, **kw: parsed.append(s) or real_loads(s, **kw))
+        extract_info.process_category_file(category_file, "Medicine", workers=3)
+        monkeypatch.undo()
+
+    assert stub.request_count == 10
+    # The stub shares json.loads, so count only input lines
+    assert len([line for line in parsed if isinstance(line, bytes) and line.startswith(b'{"id"')]) == 2
+    lines = (tmp_path / "out" / "Medicine_impact.jsonl").read_text().splitlines()
+    assert sorted(json.loads(line)["_paper_id"] for line in lines) == sorted(f"paper-{i}" for i in range(10))
+
+
+def test_resume_decompresses_from_the_member_holding_the_offset(tmp_path, monkeypatch):
+    category_file = tmp_path / "Medicine.jsonl.gz"
+    write_category_file(category_file, 60)
+    content = gzip.decompress(category_file.read_bytes())
+    assert seekable_gzip.scan(category_file) == ([(0, 0)], 60)
+    assert seekable_gzip.repack(category_file, member_bytes=500) > 10
+    members, lines = seekable_gzip.scan(category_file)
+    assert len(members) > 10 and lines == 60
+    assert gzip.decompress(category_file.read_bytes()) == content
+
+    extract_paper_info = extract_info.extract_paper_info
+
+    def failing_on_paper_40(paper, category):
+        if paper["id"] == "paper-40":
+            raise RuntimeError("worker crashed")
+        return extract_paper_info(paper, category)
+
+    skipped = []
+    seek = gzip.GzipFile.seek
+
+    def spy_seek(self, offset, whence=0):
+        skipped.append(offset)
+        return seek(self, offset, whence)
+
+    with FakeOllamaServer(response=EXTRACTION) as stub:
+        use_stub(monkeypatch, tmp_path, stub)
+        monkeypatch.setattr(extract_info, "extract_paper_info", failing_on_paper_40)
+        extract_info.process_category_file(category_file, "Medicine", workers=1)
+        progress = json.loads((tmp_path / "out" / "progress" / "Medicine_progress.json").read_text())
+        assert progress["resume_line"] == 40 and progress["members"] == [list(m) for m in members]
+
+        monkeypatch.setattr(extract_info, "extract_paper_info", extract_paper_info)
+        monkeypatch.setattr(gzip.GzipFile, "seek", spy_seek)
+        extract_info.process_category_file(category_file, "Medicine", workers=1)
+
+    # Only the part of one member before the offset was decompressed to skip it
+    assert progress["resume_offset"] > 500 and skipped == [progress["resume_offset"] - max(
+        start for _, start in members if start <= progress["resume_offset"])]
+    assert skipped[0] < 500
+    assert stub.request_count == 60
+
+
+def test_journal_recovers_from_torn_writes_and_migrates_old_progress(tmp_path):
+    journal_path = tmp_path / "Chemistry_progress.log"
+    # Offset entries, a migrated ID-only entry and a last line cut off mid-write
+    journal_path.write_text('0\t"a"\n120\t"b"\n"m"\n240\t"c"\n360\t"d')
+    progress_file = tmp_path / "Chemistry_progress.json"
+    progress_file.write_text(json.dumps({"processed_ids": ["x"], "papers_processed": 1}))
+
+    journal = extract_info.ProgressJournal(journal_path)
+    assert extract_info.load_progress(progress_file, journal) == {"papers_processed": 1}
+    assert journal_path.read_text() == '0\t"a"\n120\t"b"\n"m"\n240\t"c"\n"x"\n'
+
+    # Past the resume offset entries come back by offset; without one, by ID
+    assert journal.load(min_offset=120) == ({"m", "x"}, {120, 240})
+    assert journal.load() == ({"a", "b", "c", "m", "x"}, set())
+
+
+def test_journal_is_folded_into_the_saved_resume_offset(tmp_path, monkeypatch):
+    category_file = tmp_path / "Geology.jsonl.gz"
+    write_category_file(category_file, 10)
+    journal_path = tmp_path / "out" / "progress" / "Geology_progress.log"
+
+    with FakeOllamaServer(response=EXTRACTION) as stub:
+        use_stub(monkeypatch, tmp_path, stub)
+        extract_info.process_category_file(category_file, "Geology", workers=2)
+        # A finished run leaves the journal alone; the next load folds it
+        assert len(journal_path.read_text().splitlines()) == 10
+
+        monkeypatch.setattr(extract_info, "JOURNAL_COMPACT_MIN_ENTRIES", 5)
+        with open(journal_path, "a") as f:
+            f.write('"migrated"\n')
+        extract_info.process_category_file(category_file, "Geology", workers=2)
+        assert journal_path.read_text() == '"migrated"\n'
+        assert not journal_path.with_suffix(".log.tmp").exists()
+        progress = json.loads((tmp_path / "out" / "progress" / "Geology_progress.json").read_text())
+        assert progress["journal_folded"] is True
+
+        # Once the input changes, folded papers are matched by their output records
+        write_category_file(category_file, 12)
+        extract_info.process_category_file(category_file, "Geology", workers=2)
+
+    assert stub.request_count == 12
+    lines = (tmp_path / "out" / "Geology_impact.jsonl").read_text().splitlines()
+    assert sorted(json.loads(line)["_paper_id"] for line in lines) == sorted(f"paper-{i}" for i in range(12))
+
+
+def test_batched_requests_fall_back_to_single_papers(tmp_path, monkeypatch):
+    category_file = tmp_path / "Geology.jsonl.gz"
+    write_category_file(category_file, 10)
+    impact = json.loads(EXTRACTION)["ml_impact_quantification"]
+
+    def answer(body):
+        ids = re.findall(r"### Paper ID: (\S+)", body["prompt"])
+        if not ids:
+            return EXTRACTION
+        # The model drops paper-1 and garbles paper-2
+        entries = [{"paper_id": i, "ml_impact_quantification": impact} for i in ids if i != "paper-1"]
+        entries = [{"paper_id": e["paper_id"]} if e["paper_id"] == "paper-2" else e for e in entries]
+        return json.dumps({"papers": entries})
+
+    with FakeOllamaServer(response=answer) as stub:
+        use_stub(monkeypatch, tmp_path, stub)
+        extract_info.process_category_file(category_file, "Geology", workers=2, papers_per_request=4)
+
+    # Batches of 4, 4 and 2, then paper-1 and paper-2 on their own
+    assert stub.request_count == 5
+    lines = (tmp_path / "out" / "Geology_impact.jsonl").read_text().splitlines()
+    records = {json.loads(line)["_paper_id"]: json.loads(line) for line in lines}
+    assert sorted(records) == sorted(f"paper-{i}" for i in range(10))
+    assert all(record["_category"] == "Geology" and record["_year"] == 2020 for record in records.values())
+    assert records["paper-5"]["ml_impact_quantification"] == impact
+
+
+def test_prefilter_keeps_non_ml_papers_from_the_llm(tmp_path, monkeypatch):
+    category_file = tmp_path / "Economics.jsonl.gz"
+    texts = [
+        "We forecast demand with a random forest and an LSTM.",
+        "A survey of household savings in rural districts.",
+        "Deep learning models trained on satellite imagery predict yields.",
+        "Albert Roberts reviews monetary policy since 1990.",
+    ]
+    with gzip.open(category_file, 'wt', encoding='utf-8') as f:
+        for i, text in enumerate(texts):
+            f.write(json.dumps({"id": f"paper-{i}", "text": text, "metadata": {"year": 2019}}) + '\n')
+
+    with FakeOllamaServer(response=EXTRACTION) as stub:
+        use_stub(monkeypatch, tmp_path, stub)
+        extract_info.process_category_file(category_file, "Economics", workers=2, prefilter_threshold=0.5)
+
+    assert stub.request_count == 2
+    lines = (tmp_path / "out" / "Economics_impact.jsonl").read_text().splitlines()
+    records = {json.loads(line)["_paper_id"]: json.loads(line) for line in lines}
+    assert sorted(records) == ["paper-0", "paper-1", "paper-2", "paper-3"]
+    for paper_id in ("paper-1", "paper-3"):
+        assert records[paper_id]["ml_impact_quantification"]["ml_contribution_level"] == "none"
+        assert records[paper_id]["_prefilter"] == {"score": 0.0, "threshold": 0.5}
+        assert records[paper_id]["_year"] == 2019
+    assert "_prefilter" not in records["paper-0"]
+
+    progress = json.loads((tmp_path / "out" / "progress" / "Economics_progress.json").read_text())
+    assert progress["papers_prefiltered"] == 2
+    assert progress["papers_processed"] == 4
+    assert progress["resume_line"] == 4
+
+
+def run_with_pool(monkeypatch, category_file: Path, category: str, endpoints, **pool_options):
+    pool = extract_info.EndpointPool(endpoints, **pool_options)
+    monkeypatch.setattr(extract_info, "endpoint_pool", pool)
+    try:
+        extract_info.process_category_file(category_file, category, workers=pool.capacity)
+        return pool
+    finally:
+        pool.close()
+
+
+def test_endpoint_pool_scales_across_servers(tmp_path, monkeypatch):
+    category_file = tmp_path / "Engineering.jsonl.gz"
+    write_category_file(category_file, 18)
+
+    stubs = [FakeOllamaServer(delay=0.2, response=EXTRACTION).start() for _ in range(3)]
+    try:
+        use_stub(monkeypatch, tmp_path, stubs[0])
+        run_with_pool(monkeypatch, category_file, "Engineering", [(stubs[0].base_url, 2)])
+        assert stubs[0].max_in_flight == 2
+
+        stubs[0].max_in_flight = 0
+        monkeypatch.setattr(extract_info, "OUTPUT_DIR", tmp_path / "out-3")
+        extract_info.setup_output_dir()
+        pool = run_with_pool(monkeypatch, category_file, "Engineering", [(s.base_url, 2) for s in stubs])
+    finally:
+        for stub in stubs:
+            stub.stop()
+
+    # Every server gets its share, and no more requests at once than its slots;
+    # the wall-clock speedup is measured by bench_extraction_throughput.py --servers
+    assert [endpoint.requests for endpoint in pool.endpoints] == [6, 6, 6]
+    assert [stub.max_in_flight for stub in stubs] == [2, 2, 2]
+    lines = (tmp_path / "out-3" / "Engineering_impact.jsonl").read_text().splitlines()
+    assert len(lines) == 18
+
+
+def test_endpoint_pool_fails_over_and_recovers(tmp_path, monkeypatch):
+    category_file = tmp_path / "Mathematics.jsonl.gz"
+    write_category_file(category_file, 12)
+    # A port nothing listens on any more
+    dead = FakeOllamaServer().start()
+    dead_url = dead.base_url
+    dead.stop()
+
+    with FakeOllamaServer(response=EXTRACTION) as first, FakeOllamaServer(response=EXTRACTION) as second:
+        use_stub(monkeypatch, tmp_path, first)
+        pool = run_with_pool(monkeypatch, category_file, "Mathematics",
+                                [(dead_url, 2), (first.base_url, 2), (second.base_url, 2)],
+                                health_check_interval=0.05)
+
+        dead_endpoint = pool.endpoints[0]
+        assert not dead_endpoint.healthy and dead_endpoint.failures == 1
+        assert first.request_count + second.request_count == 12
+        lines = (tmp_path / "out" / "Mathematics_impact.jsonl").read_text().splitlines()
+        assert len(lines) == 12
+
+        # A live endpoint taken out of rotation comes back after a health check
+        pool = extract_info.EndpointPool([(first.base_url, 1)], health_check_interval=0.05)
+        try:
+            pool.release(pool.acquire(), failed=True)
+            assert not pool.endpoints[0].healthy
+            assert pool.acquire() is pool.endpoints[0]
+        finally:
+            pool.close()
+
+
+def test_in_flight_requests_follow_healthy_capacity(tmp_path, monkeypatch):
+    category_file = tmp_path / "Physics.jsonl.gz"
+    write_category_file(category_file, 8)
+    dead = FakeOllamaServer().start()
+    dead_url = dead.base_url
+    dead.stop()
+
+    active, peak = [0], [0]
+    lock = threading.Lock()
+    extract_batch_info = extract_info.extract_batch_info
+
+    def counting_extract_batch_info(*args):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        try:
+            return extract_batch_info(*args)
+        finally:
+            with lock:
+                active[0] -= 1
+
+    monkeypatch.setattr(extract_info, "extract_batch_info", counting_extract_batch_info)
+    with FakeOllamaServer(delay=0.1, response=EXTRACTION) as live:
+        use_stub(monkeypatch, tmp_path, live)
+        pool = extract_info.EndpointPool([(dead_url, 4), (live.base_url, 2)], health_check_interval=0.05)
+        monkeypatch.setattr(extract_info, "endpoint_pool", pool)
+        try:
+            assert [endpoint.base_url for endpoint in pool.check()] == [live.base_url]
+            assert pool.healthy_capacity == 2
+            extract_info.process_category_file(category_file, "Physics", workers=pool.capacity)
+        finally:
+            pool.close()
+
+    # Without the limit, all six workers would be busy, four of them waiting on the dead endpoint
+    assert peak[0] == 2
+    assert live.request_count == 8
+
+
+def test_cli_selects_shard_years_and_paper_limit(tmp_path, monkeypatch, capsys):
+    input_dir = tmp_path / "in"
+    input_dir.mkdir()
+    write_category_file(input_dir / "Chemistry.jsonl.gz", 4)
+    with gzip.open(input_dir / "Biology.jsonl.gz", 'wt', encoding='utf-8') as f:
+        for i in range(12):
+            paper = {"id": f"paper-{i}", "text": "Abstract.", "metadata": {"year": 2018 if i % 4 == 1 else 2021}}
+            f.write(json.dumps(paper) + '\n')
+
+    # main() sets these module globals; register them so they are restored
+    for name in ("INPUT_DIR", "OUTPUT_DIR", "OLLAMA_MODEL", "OLLAMA_ENDPOINTS", "endpoint_pool"):
+        monkeypatch.setattr(extract_info, name, getattr(extract_info, name))
+    argv = ["--input-dir", str(input_dir), "--output-dir", str(tmp_path / "out"), "--categories", "biology",
+            "--shard-index", "1", "--shard-count", "2", "--year-from", "2020", "--max-papers", "2"]
+
+    with FakeOllamaServer(response=EXTRACTION) as stub:
+        argv += ["--endpoint", f"{stub.base_url}=2"]
+        assert extract_info.main(argv) == 0
+        output_file = tmp_path / "out" / "Biology.jsonl.shard-1-of-2_impact.jsonl"
+        progress_file = tmp_path / "out" / "progress" / "Biology.jsonl.shard-1-of-2_progress.json"
+        ids = [json.loads(line)["_paper_id"] for line in output_file.read_text().splitlines()]
+        # Odd lines only, without the 2018 papers, and stopped after two
+        assert sorted(ids) == ["paper-3", "paper-7"]
+        assert "completed" not in json.loads(progress_file.read_text())
+
+        assert extract_info.main(argv) == 0
+        ids = [json.loads(line)["_paper_id"] for line in output_file.read_text().splitlines()]
+        assert sorted(ids) == ["paper-11", "paper-3", "paper-7"]
+        assert json.loads(progress_file.read_text())["completed"] is True
+        assert stub.request_count == 3
+
+        assert extract_info.main(argv + ["--categories", "Botany"]) == 1
+        assert "Unknown categories: Botany" in capsys.readouterr().out
+    assert not (tmp_path / "out" / "Chemistry.jsonl_impact.jsonl").exists()
+
+
+def test_shared_prompt_prefix_is_reused_and_measured(tmp_path, monkeypatch):
+    category_file = tmp_path / "Psychology.jsonl.gz"
+    write_category_file(category_file, 5)
+    bodies = []
+
+    def answer(body):
+        bodies.append(body)
+        return EXTRACTION
+
+    metrics = extract_info.OllamaMetrics(tmp_path / "metrics.jsonl")
+    monkeypatch.setattr(extract_info, "ollama_metrics", metrics)
+    with FakeOllamaServer(response=answer) as stub:
+        use_stub(monkeypatch, tmp_path, stub)
+        # One worker, so each request follows the previous one on the stub's single slot
+        extract_info.process_category_file(category_file, "Psychology", workers=1)
+    metrics.close()
+
+    assert all(body["system"] == extract_info.SYSTEM_PROMPT for body in bodies)
+    assert all(body["keep_alive"] == extract_info.OLLAMA_KEEP_ALIVE for body in bodies)
+    # The paper comes last, after the fixed instructions
+    assert bodies[0]["prompt"].endswith("Abstract. We train a model on dataset 0.")
+
+    entries = [json.loads(line) for line in (tmp_path / "metrics.jsonl").read_text().splitlines()]
+    assert len(entries) == metrics.requests == 5
+    prompt_words = len((bodies[0]["system"] + "\n" + bodies[0]["prompt"]).split())
+    assert entries[0]["prompt_eval_count"] == prompt_words
+    # Later requests only evaluate what follows the shared prefix
+    assert all(entry["prompt_eval_count"] < len(bodies[0]["prompt"].split()) for entry in entries[1:])
+    assert metrics.summary()["output_tokens"] == len(EXTRACTION.split())
+
+
+def test_truncation_keeps_section_headings_once():
+    body = "The model was fitted and the results are discussed below. " * 100
+    text = (f"Deep Soil Survey\nAbstract\n{body}\n1. Introduction\n{body}\n2 Materials and Methods\n{body}\n"
+            f"3. Results and Discussion\n{body}\nIV. CONCLUSIONS\n{body}\nReferences\n{body}")
+
+    sections = extract_info.find_sections(text)
+    assert {group: text[start:text.find("\n", start)] for group, start in sections.items()} == {
+        'introduction': "Abstract",
+        'methods': "2 Materials and Methods",
+        'results': "3. Results and Discussion",
+        'conclusion': "IV. CONCLUSIONS",
+    }
+
+    truncated = extract_info.truncate_text(text, max_length=4000)
+    assert len(truncated) <= 4000
+    for heading in ["Abstract", "Materials and Methods", "Results and Discussion", "CONCLUSIONS"]:
+        assert truncated.count(heading) == 1
+
+    # Without line breaks there are no headings, only first mentions
+    flat = text.replace("\n", " ")
+    assert extract_info.find_sections(flat)['methods'] == flat.find("model")
+
+
+def test_no_room_for_text_never_sends_the_whole_paper(capsys):
+    flat = "z" * 5000
+    sectioned = "\n".join(["Abstract", "x" * 2000, "Methods", "y" * 2000, "Results", "w" * 2000, "Conclusion", "v"])
+    for text in flat, sectioned:
+        assert extract_info.truncate_text(text, 0) == ""
+        for max_length in 1, 5, 12, 40, 400:
+            assert len(extract_info.truncate_text(text, max_length)) <= max_length
+    assert extract_info.truncate_text(flat, 3) == "zzz"
+
+    # Ollama's default num_ctx leaves no room beside the prompt and the answer
+    budget = extract_info.TokenBudget(context_tokens=2048)
+    assert extract_info.paper_text_length(budget, "Biology") == 0
+    for argv in ["--context-tokens", "2048"], ["--context-tokens", "4096", "--papers-per-request", "8"]:
+        with pytest.raises(SystemExit):
+            extract_info.parse_args(argv)
+        assert "leaves room for" in capsys.readouterr().err
+    assert extract_info.parse_args(["--context-tokens", "4096"]).context_tokens == 4096
+
+
+def test_text_fills_the_context_window_per_field(monkeypatch):
+    prompts = []
+
+    def answer(body):
+        prompts.append(body)
+        return EXTRACTION
+
+    budget = extract_info.TokenBudget(context_tokens=4096)
+    monkeypatch.setattr(extract_info, "token_budget", budget)
+    # Words stand in for tokens: about 6 characters each in prose, 2.5 in equations
+    texts = {"Biology": "Cells were cultured in the growth medium overnight. " * 3000,
+             "Mathematics": "x + y_1 = z ; " * 12000}
+
+    with FakeOllamaServer(response=answer) as stub:
+        monkeypatch.setattr(extract_info, "OLLAMA_BASE_URL", stub.base_url)
+        for i in range(6):
+            for field, text in texts.items():
+                assert extract_info.extract_paper_info({"id": f"{field}-{i}", "text": text}, field)
+
+    def used(body):
+        return len((body["system"] + "\n" + body["prompt"]).split()) + body["options"]["num_predict"]
+
+    assert all(body["options"]["num_ctx"] == 4096 and used(body) <= 4096 for body in prompts)
+    # Prose gets more text as its rate is calibrated; the system prompt's long
+    # words keep the stub from counting as many tokens as the default rate expects
+    first, last = prompts[:2], prompts[-2:]
+    assert used(first[0]) < used(last[0])
+    assert all(used(body) >= 0.75 * 4096 for body in last)
+    assert budget.chars_per_token("Biology") > 2 * budget.chars_per_token("Mathematics")
+    assert len(last[0]["prompt"]) > 2 * len(last[1]["prompt"])
@@ -17,6 +17,7 @@ export function ChatInterface() {
   const [messages, setMessages] = useState<Message[]>([]);
   const [input, setInput] = useState("");
   const [isLoading, setIsLoading] = useState(false);
+  const [streamingMessageId, setStreamingMessageId] = useState<string | null>(null);
   const [uploadingPaper, setUploadingPaper] = useState(false);
   const messagesEndRef = useRef<HTMLDivElement>(null);
   const fileInputRef = useRef<HTMLInputElement>(null);
@@ -46,7 +47,7 @@ export function ChatInterface() {
     setIsLoading(true);
 
     try {
-      const response = await fetch("http://localhost:8000/api/chat", {
+      const response = await fetch("http://localhost:8000/api/chat/stream", {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
@@ -57,20 +58,62 @@ export function ChatInterface() {
         }),
       });
 
-      if (!response.ok) {
+      if (!response.ok || !response.body) {
         throw new Error(`API error: ${response.statusText}`);
       }
 
-      const data = await response.json();
-
-      const assistantMessage: Message = {
-        id: (Date.now() + 1).toString(),
-        role: "assistant",
-        content: data.response || "I couldn't generate a response.",
-        timestamp: new Date(),
+      // The backend streams newline-delimited JSON events:
+      // {"token": "..."} per chunk, then {"done": true} or {"error": "..."}
+      const assistantId = (Date.now() + 1).toString();
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffered = "";
+      let content = "";
+
+      const applyEvent = (line: string) => {
+        if (!line.trim()) return;
+        const event = JSON.parse(line);
+        if (event.error) {
+          throw new Error(event.error);
+        }
+        if (!event.token) return;
+
+        content += event.token;
+        if (content === event.token) {
+          setStreamingMessageId(assistantId);
+          setMessages((prev) => [
+            ...prev,
+            { id: assistantId, role: "assistant", content, timestamp: new Date() },
+          ]);
+        } else {
+          const updated = content;
+          setMessages((prev) =>
+            prev.map((m) => (m.id === assistantId ? { ...m, content: updated } : m))
+          );
+        }
       };
 
-      setMessages((prev) => [...prev, assistantMessage]);
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffered += decoder.decode(value, { stream: true });
+        const lines = buffered.split("\n");
+        buffered = lines.pop() ?? "";
+        lines.forEach(applyEvent);
+      }
+      applyEvent(buffered);
+
+      if (!content) {
+        setMessages((prev) => [
+          ...prev,
+          {
+            id: assistantId,
+            role: "assistant",
+            content: "I couldn't generate a response.",
+            timestamp: new Date(),
+          },
+        ]);
+      }
     } catch (error) {
       console.error("Error calling API:", error);
       const errorMessage: Message = {
@@ -84,6 +127,7 @@ export function ChatInterface() {
       setMessages((prev) => [...prev, errorMessage]);
     } finally {
       setIsLoading(false);
+      setStreamingMessageId(null);
     }
   };
 
@@ -263,7 +307,7 @@ export function ChatInterface() {
               </div>
             ))}
 
-            {(isLoading || uploadingPaper) && (
+            {((isLoading && !streamingMessageId) || uploadingPaper) && (
               <div className="flex justify-start">
                 <div
                   className="bg-white/5 text-white/90 border border-white/10 rounded-3xl px-5 py-3.5 backdrop-blur-xl flex items-center gap-3"